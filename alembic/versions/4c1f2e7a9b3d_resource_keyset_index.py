@@ -0,0 +1,28 @@
+"""Add keyset pagination index on learning_resource
+
+Revision ID: 4c1f2e7a9b3d
+Revises: 903b82bb826c
+Create Date: 2026-10-17 10:12:31.482913
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '4c1f2e7a9b3d'
+down_revision: Union[str, Sequence[str], None] = '903b82bb826c'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index('ix_learning_resource_created_at_id', 'learning_resource', ['created_at', 'id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_learning_resource_created_at_id', table_name='learning_resource')
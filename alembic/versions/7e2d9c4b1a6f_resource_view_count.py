@@ -0,0 +1,35 @@
+"""Add resource_view_count table
+
+Revision ID: 7e2d9c4b1a6f
+Revises: 4c1f2e7a9b3d
+Create Date: 2026-10-17 14:03:52.117402
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '7e2d9c4b1a6f'
+down_revision: Union[str, Sequence[str], None] = '4c1f2e7a9b3d'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('resource_view_count',
+    sa.Column('resource_id', sa.Integer(), nullable=False),
+    sa.Column('view_count', sa.BigInteger(), nullable=False),
+    sa.ForeignKeyConstraint(['resource_id'], ['learning_resource.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('resource_id')
+    )
+    op.create_index('ix_resource_view_count_view_count', 'resource_view_count', ['view_count'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_resource_view_count_view_count', table_name='resource_view_count')
+    op.drop_table('resource_view_count')
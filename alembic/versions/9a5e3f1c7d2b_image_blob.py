@@ -0,0 +1,37 @@
+"""Add image_blob table for content addressed resource images
+
+Revision ID: 9a5e3f1c7d2b
+Revises: 7e2d9c4b1a6f
+Create Date: 2026-10-17 16:41:09.553817
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9a5e3f1c7d2b'
+down_revision: Union[str, Sequence[str], None] = '7e2d9c4b1a6f'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('image_blob',
+    sa.Column('sha256', sa.String(length=64), nullable=False),
+    sa.Column('url', sa.String(), nullable=False),
+    sa.Column('content_type', sa.String(), nullable=False),
+    sa.Column('size', sa.BigInteger(), nullable=False),
+    sa.Column('ref_count', sa.Integer(), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.PrimaryKeyConstraint('sha256'),
+    sa.UniqueConstraint('url')
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('image_blob')
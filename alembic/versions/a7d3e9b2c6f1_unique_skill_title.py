@@ -0,0 +1,52 @@
+"""Make skill titles unique so skills can be upserted by title
+
+Revision ID: a7d3e9b2c6f1
+Revises: f3c7a9e2b5d4
+Create Date: 2026-10-18 09:41:27.318604
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a7d3e9b2c6f1'
+down_revision: Union[str, Sequence[str], None] = 'f3c7a9e2b5d4'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# every skill mapped to the oldest skill of the same title, which the duplicates are merged into
+KEPT_SKILLS = "SELECT id, (SELECT MIN(kept.id) FROM skills kept WHERE kept.title = skills.title) AS kept_id FROM skills"
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.execute(sa.text(f"""
+        INSERT INTO learning_resource_skill_association (learning_resource_id, skill_id)
+        SELECT DISTINCT association.learning_resource_id, duplicate.kept_id
+        FROM learning_resource_skill_association association
+        JOIN ({KEPT_SKILLS}) duplicate ON duplicate.id = association.skill_id
+        WHERE duplicate.id <> duplicate.kept_id
+        AND NOT EXISTS (
+            SELECT 1 FROM learning_resource_skill_association existing
+            WHERE existing.learning_resource_id = association.learning_resource_id AND existing.skill_id = duplicate.kept_id
+        )
+    """))
+    op.execute(sa.text(f"""
+        DELETE FROM learning_resource_skill_association
+        WHERE skill_id IN (SELECT id FROM ({KEPT_SKILLS}) duplicate WHERE duplicate.id <> duplicate.kept_id)
+    """))
+    op.execute(sa.text(f"""
+        DELETE FROM skills
+        WHERE id IN (SELECT id FROM ({KEPT_SKILLS}) duplicate WHERE duplicate.id <> duplicate.kept_id)
+    """))
+    op.drop_index(op.f('ix_skills_title'), table_name='skills')
+    op.create_index(op.f('ix_skills_title'), 'skills', ['title'], unique=True)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_skills_title'), table_name='skills')
+    op.create_index(op.f('ix_skills_title'), 'skills', ['title'], unique=False)
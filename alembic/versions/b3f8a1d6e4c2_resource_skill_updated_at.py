@@ -0,0 +1,35 @@
+"""Add updated_at to learning_resource and skills
+
+Revision ID: b3f8a1d6e4c2
+Revises: 9a5e3f1c7d2b
+Create Date: 2026-10-17 18:22:47.901336
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b3f8a1d6e4c2'
+down_revision: Union[str, Sequence[str], None] = '9a5e3f1c7d2b'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # existing rows start out with their creation time
+    op.add_column('learning_resource', sa.Column('updated_at', sa.DateTime(), nullable=True))
+    op.execute("UPDATE learning_resource SET updated_at = created_at")
+    op.alter_column('learning_resource', 'updated_at', nullable=False)
+    op.add_column('skills', sa.Column('updated_at', sa.DateTime(), nullable=True))
+    op.execute("UPDATE skills SET updated_at = created_at")
+    op.alter_column('skills', 'updated_at', nullable=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('skills', 'updated_at')
+    op.drop_column('learning_resource', 'updated_at')
@@ -0,0 +1,72 @@
+"""Add full-text search index over learning_resource title and description
+
+Revision ID: d6a2c8e5f1b7
+Revises: b3f8a1d6e4c2
+Create Date: 2026-10-17 20:41:05.318224
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd6a2c8e5f1b7'
+down_revision: Union[str, Sequence[str], None] = 'b3f8a1d6e4c2'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    if op.get_bind().dialect.name == "postgresql":
+        # the generated column is computed for existing rows while the table is rewritten
+        op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+        op.execute("""
+            ALTER TABLE learning_resource ADD COLUMN search_vector tsvector
+            GENERATED ALWAYS AS (
+                setweight(to_tsvector('english', coalesce(title, '')), 'A') ||
+                setweight(to_tsvector('english', coalesce(description, '')), 'B')
+            ) STORED
+        """)
+        op.execute("CREATE INDEX ix_learning_resource_search_vector ON learning_resource USING gin (search_vector)")
+        op.execute("CREATE INDEX ix_learning_resource_title_trgm ON learning_resource USING gin (title gin_trgm_ops)")
+        return
+
+    op.execute("""
+        CREATE VIRTUAL TABLE learning_resource_fts USING fts5(
+            title, description, content='learning_resource', content_rowid='id', tokenize='porter unicode61'
+        )
+    """)
+    op.execute("""
+        CREATE TRIGGER learning_resource_fts_insert AFTER INSERT ON learning_resource BEGIN
+            INSERT INTO learning_resource_fts(rowid, title, description) VALUES (new.id, new.title, new.description);
+        END
+    """)
+    op.execute("""
+        CREATE TRIGGER learning_resource_fts_delete AFTER DELETE ON learning_resource BEGIN
+            INSERT INTO learning_resource_fts(learning_resource_fts, rowid, title, description) VALUES ('delete', old.id, old.title, old.description);
+        END
+    """)
+    op.execute("""
+        CREATE TRIGGER learning_resource_fts_update AFTER UPDATE OF title, description ON learning_resource BEGIN
+            INSERT INTO learning_resource_fts(learning_resource_fts, rowid, title, description) VALUES ('delete', old.id, old.title, old.description);
+            INSERT INTO learning_resource_fts(rowid, title, description) VALUES (new.id, new.title, new.description);
+        END
+    """)
+    # index the rows that exist already
+    op.execute("INSERT INTO learning_resource_fts(learning_resource_fts) VALUES ('rebuild')")
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    if op.get_bind().dialect.name == "postgresql":
+        op.execute("DROP INDEX IF EXISTS ix_learning_resource_title_trgm")
+        op.execute("DROP INDEX IF EXISTS ix_learning_resource_search_vector")
+        op.execute("ALTER TABLE learning_resource DROP COLUMN IF EXISTS search_vector")
+        return
+
+    op.execute("DROP TRIGGER IF EXISTS learning_resource_fts_update")
+    op.execute("DROP TRIGGER IF EXISTS learning_resource_fts_delete")
+    op.execute("DROP TRIGGER IF EXISTS learning_resource_fts_insert")
+    op.execute("DROP TABLE IF EXISTS learning_resource_fts")
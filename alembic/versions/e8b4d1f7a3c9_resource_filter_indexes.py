@@ -0,0 +1,32 @@
+"""Add composite indexes for filtered and sorted resource listings
+
+Revision ID: e8b4d1f7a3c9
+Revises: d6a2c8e5f1b7
+Create Date: 2026-10-17 22:07:19.640582
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e8b4d1f7a3c9'
+down_revision: Union[str, Sequence[str], None] = 'd6a2c8e5f1b7'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index('ix_learning_resource_resource_type_created_at_id', 'learning_resource', ['resource_type', 'created_at', 'id'], unique=False)
+    op.create_index('ix_learning_resource_difficulty_created_at_id', 'learning_resource', ['difficulty', 'created_at', 'id'], unique=False)
+    op.create_index('ix_learning_resource_user_id_created_at_id', 'learning_resource', ['user_id', 'created_at', 'id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_learning_resource_user_id_created_at_id', table_name='learning_resource')
+    op.drop_index('ix_learning_resource_difficulty_created_at_id', table_name='learning_resource')
+    op.drop_index('ix_learning_resource_resource_type_created_at_id', table_name='learning_resource')
@@ -0,0 +1,28 @@
+"""Add reverse index on learning_resource_skill_association for skill to resource lookups
+
+Revision ID: f3c7a9e2b5d4
+Revises: e8b4d1f7a3c9
+Create Date: 2026-10-17 23:12:46.905137
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f3c7a9e2b5d4'
+down_revision: Union[str, Sequence[str], None] = 'e8b4d1f7a3c9'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index('ix_learning_resource_skill_association_skill_id_resource_id', 'learning_resource_skill_association', ['skill_id', 'learning_resource_id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_learning_resource_skill_association_skill_id_resource_id', table_name='learning_resource_skill_association')
@@ -0,0 +1,60 @@
+"""
+Planning cost of a learning path over a large resource graph
+
+Builds a LearningPathGraph of random resources, each teaching a few of the skills, and times
+LearningPathGraph.plan for random users and targets. Only the in-memory scoring is measured,
+loading the graph and fetching the chosen resources are one query each.
+
+Usage: python -m benchmarks.bench_learning_path --resources 100000 --skills 2000 --repeat 50
+"""
+import argparse
+import random
+import statistics
+import time
+
+import numpy as np
+
+from src.backend.learning_path import LearningPathGraph
+
+
+def build_graph(resources: int, skills: int, skills_per_resource: int, seed: int) -> LearningPathGraph:
+    rng = np.random.default_rng(seed)
+    graph = LearningPathGraph()
+    ids = np.arange(1, resources + 1, dtype=np.int64)
+    graph._install(
+        ids,
+        rng.integers(1, 6, size=resources),
+        np.repeat(ids, skills_per_resource),
+        rng.integers(1, skills + 1, size=resources * skills_per_resource),
+    )
+    graph.loaded = True
+    return graph
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--resources", type=int, default=100_000)
+    parser.add_argument("--skills", type=int, default=2000)
+    parser.add_argument("--skills-per-resource", type=int, default=3)
+    parser.add_argument("--known", type=int, default=20, help="skills the user already has")
+    parser.add_argument("--targets", type=int, default=10, help="skills the user wants to learn")
+    parser.add_argument("--repeat", type=int, default=50)
+    args = parser.parse_args()
+
+    graph = build_graph(args.resources, args.skills, args.skills_per_resource, seed=1)
+    rng = random.Random(1)
+    timings, lengths = [], []
+    for _ in range(args.repeat):
+        known = set(rng.sample(range(1, args.skills + 1), args.known))
+        targets = set(rng.sample(range(1, args.skills + 1), args.targets))
+        start = time.perf_counter()
+        steps, _ = graph.plan(known, targets, max_steps=20)
+        timings.append((time.perf_counter() - start) * 1000)
+        lengths.append(len(steps))
+
+    print(f"{args.resources} resources, {args.resources * args.skills_per_resource} associations, {args.targets} targets")
+    print(f"plan: median {statistics.median(timings):.2f} ms, p95 {sorted(timings)[int(len(timings) * 0.95)]:.2f} ms, {statistics.mean(lengths):.1f} steps")
+
+
+if __name__ == "__main__":
+    main()
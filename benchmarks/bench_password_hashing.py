@@ -0,0 +1,71 @@
+"""
+Event loop responsiveness while bcrypt logins are in flight
+
+Fires a burst of concurrent password verifications and, at the same time, runs a
+heartbeat coroutine that asks to wake up every few milliseconds. The heartbeat's
+oversleep is how long any other request would have been stalled.
+
+Usage: python -m benchmarks.bench_password_hashing --logins 32 --interval-ms 5
+"""
+import argparse
+import asyncio
+import statistics
+import time
+
+from src.utils.auth_utils import PasswordHashingPool, _verify, pwd_context
+
+
+async def heartbeat(interval: float, stop: asyncio.Event, lags: list[float]):
+    while not stop.is_set():
+        expected = time.perf_counter() + interval
+        await asyncio.sleep(interval)
+        lags.append(max(0.0, time.perf_counter() - expected) * 1000)
+
+
+async def inline_verify(plain_password: str, hashed_password: str):
+    # what auth_utils did before: bcrypt directly on the event loop
+    return _verify(plain_password, hashed_password)
+
+
+async def run_burst(name: str, verify, logins: int, interval: float, hashed: str):
+    stop = asyncio.Event()
+    lags: list[float] = []
+    beat = asyncio.create_task(heartbeat(interval, stop, lags))
+    await asyncio.sleep(interval * 2)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(verify("correct horse battery staple", hashed) for _ in range(logins)))
+    elapsed = time.perf_counter() - started
+
+    stop.set()
+    await beat
+    lags.sort()
+    p99 = lags[min(len(lags) - 1, int(len(lags) * 0.99))] if lags else 0.0
+    print(
+        f"{name:<10} logins={logins} total={elapsed:.2f}s "
+        f"loop_lag_p50={statistics.median(lags) if lags else 0.0:.1f}ms "
+        f"p99={p99:.1f}ms max={max(lags, default=0.0):.1f}ms"
+    )
+
+
+async def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--logins", type=int, default=32)
+    parser.add_argument("--interval-ms", type=float, default=5.0)
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--executor", choices=["thread", "process"], default="thread")
+    args = parser.parse_args()
+
+    hashed = pwd_context.hash("correct horse battery staple")
+    interval = args.interval_ms / 1000
+
+    await run_burst("inline", inline_verify, args.logins, interval, hashed)
+
+    pool = PasswordHashingPool(max_workers=args.workers, max_queue=args.logins, kind=args.executor)
+    await run_burst(args.executor, lambda p, h: pool.run(_verify, p, h), args.logins, interval, hashed)
+    print(f"pool stats: {pool.stats()}")
+    pool.shutdown()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
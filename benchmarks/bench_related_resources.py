@@ -0,0 +1,37 @@
+"""
+Precomputation cost of the related resources
+
+Times related_top_k, the step RelatedResources runs on its process pool, over random
+associations: every resource teaches a few of the skills.
+
+Usage: python -m benchmarks.bench_related_resources --resources 100000 --skills 2000 --k 20
+"""
+import argparse
+import time
+
+import numpy as np
+
+from src.utils.similarity_utils import related_top_k
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--resources", type=int, default=100_000)
+    parser.add_argument("--skills", type=int, default=2000)
+    parser.add_argument("--skills-per-resource", type=int, default=3)
+    parser.add_argument("--k", type=int, default=20)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(1)
+    resource_ids = np.repeat(np.arange(1, args.resources + 1), args.skills_per_resource)
+    skill_ids = rng.integers(1, args.skills + 1, size=len(resource_ids))
+
+    start = time.perf_counter()
+    ids, neighbours, _ = related_top_k(resource_ids, skill_ids, args.k)
+    elapsed = time.perf_counter() - start
+    print(f"{len(ids)} resources, {len(resource_ids)} associations, k={args.k}")
+    print(f"related_top_k: {elapsed:.2f} s, {(neighbours >= 0).sum(axis=1).mean():.1f} neighbours per resource")
+
+
+if __name__ == "__main__":
+    main()
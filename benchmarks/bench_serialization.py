@@ -0,0 +1,102 @@
+"""
+Serialization cost of a large resource listing
+
+Builds one page of learning resources with their skills and serves it through small FastAPI
+apps that only differ in how the body is produced:
+
+- stdlib: response_class=JSONResponse, validation + jsonable_encoder + json.dumps
+- orjson: ORJSONResponse, the app's default response class
+- cached hit: @cached entry already in the cache, the stored bytes are sent as they are
+
+Requests run in process through ASGITransport, so the timings are the server side cost of
+turning the endpoint result into a response, plus a constant ASGI overhead.
+
+Usage: python -m benchmarks.bench_serialization --items 10000 --repeat 20
+"""
+import argparse
+import asyncio
+import statistics
+import time
+from datetime import datetime
+
+from fastapi import FastAPI
+from fastapi.responses import JSONResponse
+from fastapi_cache import FastAPICache
+from fastapi_cache.backends.inmemory import InMemoryBackend
+from httpx import ASGITransport, AsyncClient
+
+from src.backend.cache import cached
+from src.backend.responses import ORJSONResponse
+from src.schemas.learning_resource_schema import LearningResource as ILearningResource, LearningResourcePage
+from src.schemas.skills_schema import Skill
+
+
+def build_page(items: int, skills_per_resource: int) -> LearningResourcePage:
+    now = datetime.now()
+    skills = [Skill(id=i, title=f"Skill {i}", created_at=now, updated_at=now) for i in range(1, 501)]
+    return LearningResourcePage(items=[
+        ILearningResource(
+            id=i,
+            title=f"Resource {i}",
+            description="Benchmark resource " * 4,
+            url=f"http://example.com/{i}",
+            resource_type="article",
+            difficulty=i % 5 + 1,
+            created_at=now,
+            updated_at=now,
+            skills=[skills[(i + offset) % len(skills)] for offset in range(skills_per_resource)],
+            image_path=f"/static/resource_images/{i:064x}.png",
+        )
+        for i in range(items)
+    ])
+
+
+def build_app(page: LearningResourcePage) -> FastAPI:
+    app = FastAPI()
+
+    @app.get("/stdlib", response_class=JSONResponse)
+    async def stdlib() -> LearningResourcePage:
+        return page
+
+    @app.get("/orjson", response_class=ORJSONResponse)
+    async def orjson() -> LearningResourcePage:
+        return page
+
+    @app.get("/cached")
+    @cached(expire=3600, key_builder=lambda kwargs: "bench:page")
+    async def cached_page() -> LearningResourcePage:
+        return page
+
+    return app
+
+
+async def time_requests(client: AsyncClient, path: str, repeat: int) -> tuple[list[float], int]:
+    await client.get(path) # warm up, fills the cache for /cached
+    timings = []
+    size = 0
+    for _ in range(repeat):
+        start = time.perf_counter()
+        response = await client.get(path)
+        timings.append((time.perf_counter() - start) * 1000)
+        size = len(response.content)
+    return timings, size
+
+
+async def main(items: int, skills_per_resource: int, repeat: int):
+    FastAPICache.init(InMemoryBackend(), prefix="bench")
+    app = build_app(build_page(items, skills_per_resource))
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://bench") as client:
+        print(f"{items} resources, {skills_per_resource} skills each, {repeat} requests per variant")
+        print(f"{'variant':<12}{'median ms':>12}{'min ms':>10}{'bytes':>12}")
+        for name, path in [("stdlib", "/stdlib"), ("orjson", "/orjson"), ("cached hit", "/cached")]:
+            timings, size = await time_requests(client, path, repeat)
+            print(f"{name:<12}{statistics.median(timings):>12.1f}{min(timings):>10.1f}{size:>12}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--items", type=int, default=10_000)
+    parser.add_argument("--skills", type=int, default=5)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+    asyncio.run(main(args.items, args.skills, args.repeat))
@@ -0,0 +1,93 @@
+"""
+Static file serving: plain StaticFiles against CachedStaticFiles
+
+Serves a resource image and a stylesheet from a temporary directory through both apps and
+reports, per scenario, requests per second and the bytes a client has to download:
+
+- full: first download of each file, the stylesheet from its .br sibling where precompressed
+- range: 64 KiB slice of the image, as sent to a resuming or seeking client
+- revisit: a browser coming back within max-age, which CachedStaticFiles lets skip the request
+  entirely for content hashed files, and StaticFiles makes revalidate (304)
+
+Requests run in process through ASGITransport, so the numbers compare the Python side of both
+apps. The zero-copy send of FileResponse (http.response.pathsend) only shows under a server
+offering it, e.g. granian or a uvicorn build with the extension.
+
+Usage: python -m benchmarks.bench_static_files --requests 2000 --image-kb 512
+"""
+import argparse
+import asyncio
+import hashlib
+import os
+import tempfile
+import time
+from pathlib import Path
+
+from httpx import ASGITransport, AsyncClient
+from starlette.applications import Starlette
+from starlette.routing import Mount
+from starlette.staticfiles import StaticFiles
+
+from src.backend.static_files import CachedStaticFiles, precompress_directory
+
+
+def seed(directory: Path, image_kb: int) -> tuple[str, str]:
+    image = os.urandom(image_kb * 1024)
+    image_name = f"{hashlib.sha256(image).hexdigest()}.png"
+    (directory / image_name).write_bytes(image)
+    (directory / "site.css").write_bytes(b".resource-card { display: flex; gap: 1rem; padding: 0.5rem; }\n" * 2000)
+    precompress_directory(directory)
+    return image_name, "site.css"
+
+
+def is_fresh(cache_control: str | None) -> bool:
+    # a browser skips the request while an immutable response is cached
+    return cache_control is not None and "immutable" in cache_control
+
+
+async def run_scenario(client: AsyncClient, requests: int, path: str, headers: dict, revisit: bool) -> tuple[float, int]:
+    first = await client.get(path, headers=headers)
+    if revisit:
+        if is_fresh(first.headers.get("cache-control")):
+            return float("inf"), 0
+        headers = {**headers, "If-None-Match": first.headers["etag"]}
+
+    transferred = 0
+    start = time.perf_counter()
+    for _ in range(requests):
+        response = await client.get(path, headers=headers)
+        # bytes on the wire, before httpx decodes a compressed body
+        transferred += int(response.headers.get("content-length", 0))
+    elapsed = time.perf_counter() - start
+    return requests / elapsed, transferred // requests
+
+
+async def main(requests: int, image_kb: int):
+    with tempfile.TemporaryDirectory() as directory:
+        image_name, stylesheet_name = seed(Path(directory), image_kb)
+        apps = {
+            "StaticFiles": Starlette(routes=[Mount("/static", StaticFiles(directory=directory))]),
+            "CachedStaticFiles": Starlette(routes=[Mount("/static", CachedStaticFiles(directory=directory))]),
+        }
+        scenarios = [
+            ("full image", f"/static/{image_name}", {}, False),
+            ("full stylesheet", f"/static/{stylesheet_name}", {"Accept-Encoding": "br, gzip"}, False),
+            ("range 64 KiB", f"/static/{image_name}", {"Range": "bytes=0-65535"}, False),
+            ("revisit image", f"/static/{image_name}", {}, True),
+        ]
+
+        print(f"{'scenario':<18}{'app':<20}{'req/s':>10}{'bytes/req':>12}")
+        for scenario, path, headers, revisit in scenarios:
+            for name, app in apps.items():
+                async with AsyncClient(transport=ASGITransport(app=app), base_url="http://bench") as client:
+                    rps, transferred = await run_scenario(client, requests, path, headers, revisit)
+                rate = "no request" if rps == float("inf") else f"{rps:.0f}"
+                print(f"{scenario:<18}{name:<20}{rate:>10}{transferred:>12}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--image-kb", type=int, default=512)
+    args = parser.parse_args()
+    asyncio.run(main(args.requests, args.image_kb))
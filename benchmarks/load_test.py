@@ -0,0 +1,262 @@
+"""
+Load test for the Learning Path API
+
+Boots src.main.app in-process against a temporary SQLite file (or the database in DB_URL) and
+an in-memory, fake or real Redis cache, seeds users, skills and resources, then drives the resource,
+skill, auth and user routers with a fixed number of concurrent clients.
+
+Per endpoint it reports req/s and p50/p95/p99 latency, and writes the results to a JSON file
+that can be compared with the run of another commit:
+
+    python -m benchmarks.load_test --concurrency 32 --duration 20 --output bench/HEAD.json
+    python -m benchmarks.load_test --output bench/new.json --compare bench/HEAD.json --max-regression 15
+"""
+import argparse
+import asyncio
+import json
+import logging
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+
+_tmp_dir = tempfile.TemporaryDirectory()
+# config is read when src is imported, so the environment has to be in place first
+os.environ.setdefault("DB_URL", f"sqlite+aiosqlite:///{os.path.join(_tmp_dir.name, 'load_test.db')}")
+os.environ.setdefault("SECRET_KEY", "load-test-secret-key-that-is-long-enough")
+os.environ.setdefault("ALGORITHM", "HS256")
+
+from fastapi_cache import FastAPICache
+from fastapi_cache.backends.inmemory import InMemoryBackend
+from httpx import ASGITransport, AsyncClient
+
+from src.backend.cache import TwoTierBackend
+from src.backend.session import engine
+from src.db.database import Base
+from src.main import app
+
+
+def percentile(samples: list[float], q: float) -> float:
+    if not samples:
+        return 0.0
+    samples = sorted(samples)
+    return samples[min(len(samples) - 1, int(round(q / 100 * (len(samples) - 1))))]
+
+
+class EndpointStats:
+    def __init__(self):
+        self.latencies: list[float] = []
+        self.errors = 0
+
+    def summary(self, elapsed: float) -> dict:
+        latencies_ms = [latency * 1000 for latency in self.latencies]
+        return {
+            "requests": len(self.latencies),
+            "errors": self.errors,
+            "rps": round(len(self.latencies) / elapsed, 2) if elapsed else 0.0,
+            "p50_ms": round(percentile(latencies_ms, 50), 3),
+            "p95_ms": round(percentile(latencies_ms, 95), 3),
+            "p99_ms": round(percentile(latencies_ms, 99), 3),
+        }
+
+
+class LoadTest:
+    def __init__(self, client: AsyncClient, resources: int, skills: int):
+        self.client = client
+        self.resource_count = resources
+        self.skill_count = skills
+        self.token = ""
+        self.user_id = 1
+        self.resource_ids: list[int] = []
+        self.skill_ids: list[int] = []
+        self.cursors: list[str | None] = [None]
+
+    @property
+    def auth(self) -> dict:
+        return {"Authorization": f"Bearer {self.token}"}
+
+    async def seed(self):
+        user = {"name": "Load Tester", "email": "load@example.com", "password": "load-password", "is_active": True, "role": "admin"}
+        await self.client.post("/auth/register", json=user)
+        await self.client.post("/auth/register", json={**user, "email": "learner@example.com", "role": "learner"})
+        response = await self.client.post("/auth/token", data={"username": user["email"], "password": user["password"]})
+        response.raise_for_status()
+        self.token = response.json()["access_token"]
+
+        rows = [
+            {
+                "title": f"Resource {i}",
+                "description": "Seeded by the load test",
+                "url": f"http://example.com/{i}",
+                "resource_type": random.choice(["article", "video", "course", "book"]),
+                "difficulty": random.randint(1, 5),
+                "skills": random.sample([f"Skill {n}" for n in range(self.skill_count)], min(3, self.skill_count)),
+            }
+            for i in range(self.resource_count)
+        ]
+        response = await self.client.post("/resources/bulk", json=rows, headers=self.auth)
+        response.raise_for_status()
+
+        cursor = None
+        while True:
+            page = (await self.client.get("/resources/", params={"limit": 100, **({"cursor": cursor} if cursor else {})})).json()
+            self.resource_ids.extend(item["id"] for item in page["items"])
+            cursor = page["next_cursor"]
+            if cursor is None:
+                break
+            self.cursors.append(cursor)
+        self.skill_ids = [skill["id"] for skill in (await self.client.get("/skills/")).json()]
+
+    def scenarios(self) -> dict:
+        """Endpoint name -> (weight, coroutine function issuing one request)"""
+        return {
+            "GET /resources/": (30, lambda: self.client.get("/resources/", params={"limit": 50, **({"cursor": c} if (c := random.choice(self.cursors)) else {})})),
+            "GET /resources/{id}": (25, lambda: self.client.get(f"/resources/{random.choice(self.resource_ids)}", headers=self.auth)),
+            "GET /skills/": (10, lambda: self.client.get("/skills/")),
+            "GET /skills/{id}": (10, lambda: self.client.get(f"/skills/{random.choice(self.skill_ids)}")),
+            "GET /user/me/skills": (5, lambda: self.client.get("/user/me/skills", params={"user_id": self.user_id}, headers=self.auth)),
+            "GET /auth/": (5, lambda: self.client.get("/auth/")),
+            "POST /auth/token": (5, lambda: self.client.post("/auth/token", data={"username": "learner@example.com", "password": "load-password"})),
+            "PUT /resources/{id}/update": (5, lambda: self.client.put(
+                f"/resources/{random.choice(self.resource_ids)}/update",
+                json={"title": "Updated", "url": "http://example.com/updated", "resource_type": "article", "difficulty": 3},
+                headers=self.auth,
+            )),
+            "POST /resources/create": (5, lambda: self.client.post(
+                "/resources/create",
+                json={"title": "Created", "url": "http://example.com/created", "resource_type": "video", "difficulty": 2},
+                headers=self.auth,
+            )),
+        }
+
+    async def run(self, concurrency: int, duration: float, only: list[str] | None) -> dict:
+        scenarios = {name: scenario for name, scenario in self.scenarios().items() if not only or name in only}
+        names = list(scenarios)
+        weights = [scenarios[name][0] for name in names]
+        stats = {name: EndpointStats() for name in names}
+        deadline = time.perf_counter() + duration
+
+        async def client_loop():
+            while time.perf_counter() < deadline:
+                name = random.choices(names, weights)[0]
+                started = time.perf_counter()
+                try:
+                    response = await scenarios[name][1]()
+                    failed = response.status_code >= 400
+                except Exception:
+                    failed = True
+                stats[name].latencies.append(time.perf_counter() - started)
+                stats[name].errors += failed
+
+        started = time.perf_counter()
+        await asyncio.gather(*(client_loop() for _ in range(concurrency)))
+        elapsed = time.perf_counter() - started
+
+        total = EndpointStats()
+        for endpoint in stats.values():
+            total.latencies.extend(endpoint.latencies)
+            total.errors += endpoint.errors
+        return {
+            "elapsed_s": round(elapsed, 3),
+            "total": total.summary(elapsed),
+            "endpoints": {name: endpoint.summary(elapsed) for name, endpoint in stats.items()},
+        }
+
+
+def init_cache(kind: str):
+    if kind == "memory":
+        FastAPICache.init(InMemoryBackend(), prefix="fastapi-cache")
+        return None
+    if kind == "fakeredis":
+        try:
+            import fakeredis
+        except ImportError:
+            sys.exit("--cache fakeredis needs the fakeredis package: pip install fakeredis")
+        redis = fakeredis.FakeAsyncRedis()
+    else:
+        from redis import asyncio as aioredis
+        from src.backend.config import config
+        redis = aioredis.from_url(config.REDIS_URL)
+    backend = TwoTierBackend(redis, maxsize=1024, ttl=5)
+    FastAPICache.init(backend, prefix="fastapi-cache")
+    return backend
+
+
+def git_revision() -> str:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def compare(current: dict, baseline: dict, max_regression: float) -> bool:
+    """Prints the p95 change per endpoint, False when one regressed by more than max_regression percent"""
+    ok = True
+    print(f"\nagainst {baseline.get('revision', '?')}:")
+    for name, result in current["endpoints"].items():
+        before = baseline.get("endpoints", {}).get(name)
+        if not before or not before["p95_ms"]:
+            continue
+        change = (result["p95_ms"] - before["p95_ms"]) / before["p95_ms"] * 100
+        regressed = change > max_regression
+        ok = ok and not regressed
+        print(f"  {name:<28} p95 {before['p95_ms']:>9.2f} -> {result['p95_ms']:>9.2f} ms ({change:+.1f}%){'  REGRESSION' if regressed else ''}")
+    return ok
+
+
+async def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--cache", choices=["memory", "fakeredis", "redis"], default="memory")
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--duration", type=float, default=10.0, help="seconds of load")
+    parser.add_argument("--resources", type=int, default=1000)
+    parser.add_argument("--skills", type=int, default=50)
+    parser.add_argument("--endpoint", action="append", help="only drive the named endpoint, repeatable")
+    parser.add_argument("--output", default="bench_output.json")
+    parser.add_argument("--compare", help="results JSON of an earlier run")
+    parser.add_argument("--max-regression", type=float, default=20.0, help="allowed p95 increase in percent")
+    args = parser.parse_args()
+
+    logging.getLogger("sqlalchemy.engine").setLevel(logging.WARNING)
+
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.drop_all)
+        await conn.run_sync(Base.metadata.create_all)
+    cache_backend = init_cache(args.cache)
+
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://load-test") as client:
+        load_test = LoadTest(client, args.resources, args.skills)
+        await load_test.seed()
+        result = await load_test.run(args.concurrency, args.duration, args.endpoint)
+
+    if isinstance(cache_backend, TwoTierBackend):
+        await cache_backend.stop()
+    await engine.dispose()
+
+    result = {
+        "revision": git_revision(),
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "database": engine.url.render_as_string(hide_password=True),
+        "cache": args.cache,
+        "concurrency": args.concurrency,
+        "resources": args.resources,
+        **result,
+    }
+    for name, endpoint in result["endpoints"].items():
+        print(f"{name:<28} {endpoint['rps']:>9.1f} req/s  p50 {endpoint['p50_ms']:>8.2f}  p95 {endpoint['p95_ms']:>8.2f}  p99 {endpoint['p99_ms']:>8.2f} ms  errors {endpoint['errors']}")
+    print(f"{'total':<28} {result['total']['rps']:>9.1f} req/s")
+
+    with open(args.output, "w") as output:
+        json.dump(result, output, indent=2)
+
+    if args.compare:
+        with open(args.compare) as baseline:
+            if not compare(result, json.load(baseline), args.max_regression):
+                sys.exit(1)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,534 @@
+import asyncio
+import hashlib
+import inspect
+import json
+import logging
+import secrets
+import time
+from dataclasses import dataclass
+from datetime import datetime
+from email.utils import formatdate, parsedate_to_datetime
+from functools import wraps
+from typing import Any, Awaitable, Callable, Iterable, Optional, Tuple
+
+from fastapi import Request, Response
+from fastapi.dependencies.utils import get_typed_return_annotation
+from fastapi_cache import FastAPICache
+from fastapi_cache.backends.redis import RedisBackend
+from fastapi_cache.types import Backend
+from pydantic import BaseModel
+from redis.asyncio import Redis
+
+from src.backend.compression import choose_encoding, compress, weaken_etag
+from src.backend.config import config
+from src.backend.responses import json_bytes_response, json_serializer
+from src.utils.cache_utils import TTLCache
+
+logger = logging.getLogger(__name__)
+
+# Builds the cache key of an endpoint call from its keyword arguments
+CacheKeyBuilder = Callable[[dict[str, Any]], str]
+# Lists the tags of a cached entry from the endpoint's keyword arguments and its result
+CacheTagger = Callable[[dict[str, Any], Any], Iterable[str]]
+
+# The newest page of the resource listing, the only page a newly created resource can land on
+RESOURCE_LIST_TAIL_TAG = "resources:tail"
+# Every filtered or re-sorted listing of resources, where a new or changed resource can land on any page
+RESOURCE_LIST_TAG = "resources:list"
+# Every cached listing of skills, changed by any skill being created, renamed or deleted
+SKILL_LIST_TAG = "skills:list"
+
+
+def resource_tag(resource_id: int) -> str:
+    return f"resource:{resource_id}"
+
+def skill_tag(skill_id: int) -> str:
+    return f"skill:{skill_id}"
+
+
+class TwoTierBackend(Backend):
+    """
+    FastAPICache backend with a per-worker in-memory LRU (L1) in front of Redis (L2)
+
+    Hot keys are answered from process memory for up to `ttl` seconds. Evictions are
+    broadcast over Redis pub/sub so every worker drops its L1 copy of an invalidated key.
+    Other per-worker caches ride the same channel through handlers added with on_eviction.
+
+    Attributes:
+    redis: Client of the shared Redis, also used for the eviction channel
+    local: The L1 tier, bounded to `maxsize` entries
+    """
+
+    def __init__(self, redis: Redis, maxsize: int, ttl: float, channel: str = "fastapi-cache:evictions"):
+        self.redis = redis
+        self.remote = RedisBackend(redis)
+        self.local = TTLCache(maxsize=maxsize, ttl=ttl)
+        self.channel = channel
+        self._handlers: dict[str, Callable[[Any], None]] = {}
+        self._listener: asyncio.Task | None = None
+
+    async def get_with_ttl(self, key: str) -> Tuple[int, Optional[bytes]]:
+        value = self.local.get(key)
+        if value is not None:
+            return int(self.local.ttl), value
+
+        ttl, value = await self.remote.get_with_ttl(key)
+        if value is not None:
+            self.local.set(key, value, ttl=min(self.local.ttl, ttl))
+        return ttl, value
+
+    async def get(self, key: str) -> Optional[bytes]:
+        return (await self.get_with_ttl(key))[1]
+
+    async def set(self, key: str, value: bytes, expire: Optional[int] = None) -> None:
+        await self.remote.set(key, value, expire)
+        self.local.set(key, value, ttl=min(self.local.ttl, expire or self.local.ttl))
+
+    async def clear(self, namespace: Optional[str] = None, key: Optional[str] = None) -> int:
+        count = await self.remote.clear(namespace, key)
+        if namespace:
+            await self.publish({"namespace": namespace})
+        elif key:
+            await self.publish({"keys": [key]})
+        return count
+
+    async def evict(self, keys: Iterable[str | bytes]) -> None:
+        """Drops keys already deleted from Redis out of the L1 tier of every worker"""
+        keys = [key.decode() if isinstance(key, bytes) else key for key in keys]
+        if keys:
+            await self.publish({"keys": keys})
+
+    def on_eviction(self, field: str, handler: Callable[[Any], None]) -> None:
+        """Calls handler with the field of every eviction message carrying it, in every worker that registered it"""
+        self._handlers[field] = handler
+
+    async def publish(self, message: dict) -> None:
+        self._evict_local(message)
+        await self.redis.publish(self.channel, json.dumps(message))
+
+    def _evict_local(self, message: dict) -> None:
+        for key in message.get("keys", []):
+            self.local.pop(key)
+        namespace = message.get("namespace")
+        if namespace:
+            for key, _ in self.local.items():
+                if key.startswith(namespace):
+                    self.local.pop(key)
+        for field, handler in self._handlers.items():
+            if field in message:
+                handler(message[field])
+
+    async def start(self) -> None:
+        self._listener = asyncio.create_task(self._listen())
+
+    async def stop(self) -> None:
+        if self._listener is not None:
+            self._listener.cancel()
+            self._listener = None
+
+    async def _listen(self) -> None:
+        while True:
+            try:
+                async with self.redis.pubsub() as pubsub:
+                    await pubsub.subscribe(self.channel)
+                    async for message in pubsub.listen():
+                        if message["type"] == "message":
+                            self._evict_local(json.loads(message["data"]))
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                # while disconnected the L1 ttl bounds how stale a worker can get
+                logger.warning("Cache eviction listener lost its Redis subscription, retrying", exc_info=True)
+                self.local.clear()
+                await asyncio.sleep(1)
+
+    def stats(self) -> dict:
+        return {"l1": self.local.stats(), "listening": self._listener is not None and not self._listener.done()}
+
+
+class CacheTagIndex:
+    """
+    Remembers which cache keys carry which tags, so a write evicts only the entries it affects
+
+    Tags live next to the cached entries as Redis sets. Backends without sets, like the
+    in-memory backend used in tests, fall back to a dictionary held by this process.
+    """
+
+    def __init__(self):
+        self._local: dict[str, set[str]] = {}
+
+    def _tag_key(self, tag: str) -> str:
+        return f"{FastAPICache.get_prefix()}:tag:{tag}"
+
+    async def add(self, key: str, tags: Iterable[str], expire: int) -> None:
+        tags = set(tags)
+        backend = FastAPICache.get_backend()
+        if not isinstance(backend, (RedisBackend, TwoTierBackend)):
+            for tag in tags:
+                self._local.setdefault(tag, set()).add(key)
+            return
+
+        async with backend.redis.pipeline(transaction=False) as pipe:
+            for tag in tags:
+                tag_key = self._tag_key(tag)
+                pipe.sadd(tag_key, key)
+                # the set has to outlive the longest lived entry it points at, so its ttl only ever
+                # grows: NX sets it on a new set, GT raises it (both need Redis 7)
+                pipe.expire(tag_key, expire, nx=True)
+                pipe.expire(tag_key, expire, gt=True)
+            await pipe.execute()
+
+    async def invalidate(self, *tags: str) -> int:
+        backend = FastAPICache.get_backend()
+        if not isinstance(backend, (RedisBackend, TwoTierBackend)):
+            keys = set().union(*(self._local.pop(tag, set()) for tag in tags))
+            for key in keys:
+                if await backend.get(key) is not None:
+                    await backend.clear(key=key)
+            return len(keys)
+
+        tag_keys = [self._tag_key(tag) for tag in tags]
+        keys = await backend.redis.sunion(tag_keys)
+        await backend.redis.delete(*keys, *tag_keys)
+        if isinstance(backend, TwoTierBackend):
+            await backend.evict(keys)
+        return len(keys)
+
+    def clear(self) -> None:
+        self._local.clear()
+
+
+cache_tag_index = CacheTagIndex()
+
+
+async def invalidate_cache_tags(*tags: str) -> None:
+    """Evicts every cached entry carrying one of the tags, a failure only leaves entries to expire on their own"""
+    try:
+        evicted = await cache_tag_index.invalidate(*tags)
+        logger.debug("Evicted %s cache entries for tags %s", evicted, tags)
+    except Exception:
+        logger.warning("Error invalidating cache tags %s", tags, exc_info=True)
+
+
+async def broadcast_eviction(field: str, value: Any) -> None:
+    """
+    Sends value to the on_eviction handlers of field in every worker, this one included.
+
+    Only a TwoTierBackend has the eviction channel: with any other backend nothing is sent and
+    the caller's own eviction is all there is. A failure is logged, not raised.
+    """
+    try:
+        backend = FastAPICache.get_backend()
+        if isinstance(backend, TwoTierBackend):
+            await backend.publish({field: value})
+    except Exception:
+        logger.warning("Error broadcasting the eviction of %s %s", field, value, exc_info=True)
+
+
+class LeaderCancelled(Exception):
+    """Raised to the followers of a SingleFlight computation whose leader was cancelled"""
+
+
+# Deletes a lock only while it holds the token of the caller, in one round trip
+RELEASE_LOCK_SCRIPT = """
+if redis.call('GET', KEYS[1]) == ARGV[1] then
+    return redis.call('DEL', KEYS[1])
+end
+return 0
+"""
+
+
+class SingleFlight:
+    """
+    Collapses concurrent cache misses for the same key into one computation
+
+    Within a worker, callers of the same key await the first caller's result, and compute it
+    themselves should that caller be cancelled. Across workers a short Redis lock elects one
+    computing worker while the others poll the cache for its result. The lock holds a random
+    token of its holder, so a worker outliving its lock never deletes the next holder's.
+
+    Attributes:
+    lock_timeout: Seconds a worker may hold the Redis lock, and how long others wait on it
+    """
+
+    def __init__(self, lock_timeout: float, poll_interval: float = 0.05):
+        self.lock_timeout = lock_timeout
+        self.poll_interval = poll_interval
+        self._inflight: dict[str, asyncio.Future] = {}
+        self.leaders = 0
+        self.followers = 0
+
+    def in_flight(self, key: str) -> bool:
+        return key in self._inflight
+
+    async def do(self, key: str, compute: Callable[[], Awaitable[Any]]) -> Any:
+        future = self._inflight.get(key)
+        while future is not None:
+            self.followers += 1
+            try:
+                return await asyncio.shield(future)
+            except LeaderCancelled:
+                # the leader's request went away, the first follower back computes in its place
+                future = self._inflight.get(key)
+
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        self.leaders += 1
+        try:
+            result = await compute()
+        except asyncio.CancelledError:
+            future.set_exception(LeaderCancelled(key))
+            future.exception()
+            raise
+        except Exception as e:
+            future.set_exception(e)
+            future.exception() # followers re-raise it, nobody has to retrieve it
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            del self._inflight[key]
+
+    async def acquire_lock(self, backend: Backend, key: str) -> str | None:
+        """Takes the cross-worker lock of a key, returns the token releasing it or None while another worker holds it"""
+        token = secrets.token_hex(16)
+        if not isinstance(backend, (RedisBackend, TwoTierBackend)):
+            return token
+        acquired = await backend.redis.set(f"{key}:lock", token, nx=True, px=int(self.lock_timeout * 1000))
+        return token if acquired else None
+
+    async def release_lock(self, backend: Backend, key: str, token: str) -> None:
+        """Releases the lock unless it expired meanwhile and another worker took it over"""
+        if isinstance(backend, (RedisBackend, TwoTierBackend)):
+            await backend.redis.eval(RELEASE_LOCK_SCRIPT, 1, f"{key}:lock", token)
+
+    async def wait_for(self, backend: Backend, key: str) -> Optional[bytes]:
+        """Polls the cache for the entry another worker is computing, None once the lock timed out"""
+        deadline = time.monotonic() + self.lock_timeout
+        while time.monotonic() < deadline:
+            await asyncio.sleep(self.poll_interval)
+            value = await backend.get(key)
+            if value is not None:
+                return value
+        return None
+
+    def stats(self) -> dict:
+        return {"in_flight": len(self._inflight), "leaders": self.leaders, "followers": self.followers}
+
+
+single_flight = SingleFlight(lock_timeout=config.cache_lock_timeout)
+
+
+def cache_stats() -> dict:
+    """Statistics of request coalescing and of the in-process cache tier, when the backend has one"""
+    stats = {"single_flight": single_flight.stats()}
+    backend = FastAPICache._backend
+    if isinstance(backend, TwoTierBackend):
+        stats.update(backend.stats())
+    return stats
+
+
+# Parameter cached() adds to the endpoint signature, so FastAPI hands the wrapper the request
+REQUEST_PARAM = "_cache_request"
+
+
+@dataclass
+class CacheEntry:
+    """The serialized JSON of an endpoint result together with its validators"""
+    fresh_until: float
+    etag: str
+    last_modified: float | None
+    payload: bytes
+
+
+# Cached entries are framed as b"<fresh until>|<etag>|<last modified>|<payload>", times in unix seconds
+def _pack_entry(entry: CacheEntry) -> bytes:
+    last_modified = "" if entry.last_modified is None else f"{entry.last_modified:.0f}"
+    return f"{entry.fresh_until:.3f}|{entry.etag}|{last_modified}|".encode() + entry.payload
+
+def _unpack_entry(raw: bytes) -> CacheEntry:
+    fresh_until, etag, last_modified, payload = raw.split(b"|", 3)
+    return CacheEntry(float(fresh_until), etag.decode(), float(last_modified) if last_modified else None, payload)
+
+
+def make_etag(payload: bytes) -> str:
+    """Strong ETag of a serialized response, equal payloads give equal tags"""
+    return f'"{hashlib.sha256(payload).hexdigest()[:32]}"'
+
+
+def latest_updated_at(value: Any) -> datetime | None:
+    """Newest updated_at of a result and the models nested in it, e.g. a resource and its skills"""
+    if isinstance(value, (list, tuple)):
+        return max(filter(None, map(latest_updated_at, value)), default=None)
+    if not isinstance(value, BaseModel):
+        return None
+    times = [getattr(value, "updated_at", None)]
+    times += [latest_updated_at(getattr(value, name)) for name in type(value).model_fields if name != "updated_at"]
+    return max((time for time in times if isinstance(time, datetime)), default=None)
+
+
+def is_not_modified(request: Request | None, entry: CacheEntry) -> bool:
+    """Whether the client already holds this version, If-None-Match taking precedence over If-Modified-Since"""
+    if request is None:
+        return False
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        tags = [tag.strip().removeprefix("W/") for tag in if_none_match.split(",")]
+        return "*" in tags or entry.etag in tags
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_modified_since and entry.last_modified is not None:
+        try:
+            since = parsedate_to_datetime(if_modified_since).timestamp()
+        except (TypeError, ValueError):
+            return False
+        return int(entry.last_modified) <= since
+    return False
+
+
+def validator_headers(entry: CacheEntry) -> dict[str, str]:
+    # no-cache lets clients keep the body but makes them revalidate it on every use
+    headers = {"ETag": entry.etag, "Cache-Control": "no-cache"}
+    if entry.last_modified is not None:
+        headers["Last-Modified"] = formatdate(entry.last_modified, usegmt=True)
+    return headers
+
+
+async def compressed_payload(backend: Backend, cache_key: str, entry: CacheEntry, encoding: str, expire: int) -> bytes:
+    """
+    The payload of an entry compressed with encoding, compressed once per version of the entry
+
+    Compressed copies are stored next to the entry under the cache key and encoding, framed as
+    b"<etag>|<body>". A copy whose ETag no longer matches the entry is replaced, so copies
+    need no invalidation of their own.
+    """
+    key = f"{cache_key}:{encoding}"
+    try:
+        raw = await backend.get(key)
+    except Exception:
+        logger.warning("Error retrieving cache key '%s' from backend", key, exc_info=True)
+        raw = None
+    if raw is not None:
+        etag, _, body = raw.partition(b"|")
+        if etag.decode() == entry.etag:
+            return body
+
+    body = await asyncio.to_thread(compress, entry.payload, encoding)
+    try:
+        await backend.set(key, entry.etag.encode() + b"|" + body, expire)
+    except Exception:
+        logger.warning("Error setting cache key '%s' in backend", key, exc_info=True)
+    return body
+
+
+def cached(
+    expire: int,
+    key_builder: CacheKeyBuilder,
+    tags: CacheTagger | None = None,
+    stale_ttl: int = 0,
+    last_modified: Callable[[Any], datetime | None] | None = None,
+):
+    """
+    Caches the result of an endpoint in the FastAPICache backend under a deterministic key
+
+    Unlike fastapi_cache.decorator.cache the key only depends on what key_builder picks from
+    the endpoint arguments, and every stored entry is registered under the tags returned by
+    `tags`, so writes can evict it through invalidate_cache_tags.
+
+    Concurrent misses of a key share one computation (see SingleFlight). With a stale_ttl,
+    entries are kept that many seconds past `expire`: one caller revalidates an expired entry
+    while everyone else is answered with the stale copy instead of piling onto the database.
+
+    Entries hold the response body itself, serialized once on a miss (see json_serializer),
+    and both hits and misses are answered with those bytes, so a hit builds no models and
+    encodes nothing. Every entry is stored with a strong ETag of its payload and, when
+    last_modified is given, the Last-Modified time it returns for the result. Conditional
+    requests matching them are answered with 304 Not Modified. Clients accepting Brotli or gzip
+    get a compressed copy of the payload that is also cached (see compressed_payload).
+    """
+
+    def wrapper(func: Callable[..., Awaitable[Any]]):
+        serialize = json_serializer(get_typed_return_annotation(func))
+
+        @wraps(func)
+        async def inner(*args, **kwargs):
+            request: Request | None = kwargs.pop(REQUEST_PARAM, None)
+            if not FastAPICache.get_enable():
+                return await func(*args, **kwargs)
+
+            backend = FastAPICache.get_backend()
+            cache_key = f"{FastAPICache.get_prefix()}:{key_builder(kwargs)}"
+
+            async def compute() -> CacheEntry:
+                result = await func(*args, **kwargs)
+                payload = serialize(result)
+                modified = last_modified(result) if last_modified is not None else None
+                entry = CacheEntry(
+                    fresh_until=time.time() + expire,
+                    etag=make_etag(payload),
+                    last_modified=modified.timestamp() if modified is not None else None,
+                    payload=payload,
+                )
+                try:
+                    if tags is not None:
+                        await cache_tag_index.add(cache_key, tags(kwargs, result), expire + stale_ttl)
+                    await backend.set(cache_key, _pack_entry(entry), expire + stale_ttl)
+                except Exception:
+                    logger.warning("Error setting cache key '%s' in backend", cache_key, exc_info=True)
+                return entry
+
+            async def compute_once(stale: CacheEntry | None = None) -> CacheEntry:
+                token = None
+                try:
+                    token = await single_flight.acquire_lock(backend, cache_key)
+                    if token is None:
+                        if stale is not None:
+                            return stale
+                        value = await single_flight.wait_for(backend, cache_key)
+                        if value is not None:
+                            return _unpack_entry(value)
+                except Exception:
+                    logger.warning("Error coordinating cache key '%s' across workers", cache_key, exc_info=True)
+                try:
+                    return await compute()
+                finally:
+                    if token is not None:
+                        await single_flight.release_lock(backend, cache_key, token)
+
+            try:
+                raw = await backend.get(cache_key)
+            except Exception:
+                logger.warning("Error retrieving cache key '%s' from backend", cache_key, exc_info=True)
+                raw = None
+
+            if raw is None:
+                entry = await single_flight.do(cache_key, compute_once)
+            else:
+                entry = _unpack_entry(raw)
+                # stale: exactly one caller revalidates, the rest keep getting the stale copy meanwhile
+                if entry.fresh_until <= time.time() and not single_flight.in_flight(cache_key):
+                    stale = entry
+                    entry = await single_flight.do(cache_key, lambda: compute_once(stale))
+
+            headers = validator_headers(entry)
+            if is_not_modified(request, entry):
+                return Response(status_code=304, headers=headers)
+            encoding = choose_encoding(request.headers.get("accept-encoding")) if request is not None else None
+            if encoding is None or len(entry.payload) < config.compression_min_size:
+                return json_bytes_response(entry.payload, headers=headers)
+
+            body = await single_flight.do(
+                f"{cache_key}:{encoding}:{entry.etag}",
+                lambda: compressed_payload(backend, cache_key, entry, encoding, expire + stale_ttl),
+            )
+            headers.update({"ETag": weaken_etag(entry.etag), "Content-Encoding": encoding, "Vary": "Accept-Encoding"})
+            return json_bytes_response(body, headers=headers)
+
+        signature = inspect.signature(func)
+        inner.__signature__ = signature.replace(parameters=[
+            *signature.parameters.values(),
+            inspect.Parameter(REQUEST_PARAM, inspect.Parameter.KEYWORD_ONLY, annotation=Request),
+        ])
+        return inner
+
+    return wrapper
@@ -0,0 +1,162 @@
+import gzip
+import zlib
+
+import anyio
+import brotli
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from src.backend.config import config
+
+# Content codings the app produces, in order of preference
+ENCODINGS = ("br", "gzip")
+COMPRESSIBLE_CONTENT_TYPES = ("text/", "application/json", "application/x-ndjson", "application/javascript", "application/xml", "image/svg+xml")
+# Bodies at least this large are compressed on a thread instead of on the event loop
+THREAD_COMPRESSION_SIZE = 256 * 1024
+
+
+def accepted_encodings(accept_encoding: str | None) -> set[str]:
+    """Content codings of an Accept-Encoding header the client accepts, ignoring those with q=0"""
+    encodings = set()
+    for item in (accept_encoding or "").split(","):
+        coding, _, params = item.strip().partition(";")
+        quality = params.strip().removeprefix("q=")
+        try:
+            if params and float(quality) == 0:
+                continue
+        except ValueError:
+            continue
+        if coding:
+            encodings.add(coding.strip().lower())
+    return encodings
+
+
+def choose_encoding(accept_encoding: str | None) -> str | None:
+    """The preferred coding the client accepts, None to send the body as it is"""
+    accepted = accepted_encodings(accept_encoding)
+    return next((encoding for encoding in ENCODINGS if encoding in accepted), None)
+
+
+def is_compressible(content_type: str | None) -> bool:
+    return content_type is not None and content_type.startswith(COMPRESSIBLE_CONTENT_TYPES)
+
+
+def weaken_etag(etag: str) -> str:
+    """A compressed body is a different representation, so its ETag may only match weakly"""
+    return etag if etag.startswith("W/") else f"W/{etag}"
+
+
+def compress(data: bytes, encoding: str, level: int | None = None) -> bytes:
+    """Compresses a whole body, at the configured level of the coding unless one is given"""
+    if encoding == "br":
+        return brotli.compress(data, quality=config.compression_brotli_quality if level is None else level)
+    return gzip.compress(data, compresslevel=config.compression_gzip_level if level is None else level, mtime=0)
+
+
+class StreamCompressor:
+    """Compresses a body sent in several messages, flushing after each so streamed lines arrive at once"""
+
+    def __init__(self, encoding: str):
+        self.encoding = encoding
+        if encoding == "br":
+            self._brotli = brotli.Compressor(quality=config.compression_brotli_quality)
+        else:
+            self._zlib = zlib.compressobj(config.compression_gzip_level, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+
+    def process(self, chunk: bytes) -> bytes:
+        if self.encoding == "br":
+            return self._brotli.process(chunk) + self._brotli.flush()
+        return self._zlib.compress(chunk) + self._zlib.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self) -> bytes:
+        if self.encoding == "br":
+            return self._brotli.finish()
+        return self._zlib.flush()
+
+
+class CompressionMiddleware:
+    """
+    Compresses text and JSON responses with Brotli or gzip, whichever the client prefers of the two
+
+    Bodies below minimum_size, partial content and responses that already carry a
+    Content-Encoding (precompressed static files, compressed cache entries) pass through
+    untouched. Streamed bodies are compressed chunk by chunk.
+    """
+
+    def __init__(self, app: ASGIApp, minimum_size: int = 1024):
+        self.app = app
+        self.minimum_size = minimum_size
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        encoding = choose_encoding(Headers(scope=scope).get("accept-encoding"))
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+        await self.app(scope, receive, CompressingSend(send, encoding, self.minimum_size))
+
+
+class CompressingSend:
+    """The send callable of one response, holds back the start message until the first body chunk decides"""
+
+    def __init__(self, send: Send, encoding: str, minimum_size: int):
+        self.send = send
+        self.encoding = encoding
+        self.minimum_size = minimum_size
+        self.start: Message | None = None
+        self.compressor: StreamCompressor | None = None
+
+    def _wants_compression(self, headers: MutableHeaders) -> bool:
+        if not is_compressible(headers.get("content-type")):
+            return False
+        headers.add_vary_header("Accept-Encoding")
+        return "content-encoding" not in headers and "content-range" not in headers
+
+    async def __call__(self, message: Message) -> None:
+        if message["type"] == "http.response.start":
+            self.start = message
+            return
+        if self.start is None:
+            # the start message is out, the rest of the body follows the decision made on its first chunk
+            if self.compressor is not None and message["type"] == "http.response.body":
+                more_body = message.get("more_body", False)
+                body = self.compressor.process(message.get("body", b""))
+                if not more_body:
+                    body += self.compressor.finish()
+                message = {**message, "body": body}
+            await self.send(message)
+            return
+
+        start, self.start = self.start, None
+        headers = MutableHeaders(raw=list(start["headers"]))
+        start = {**start, "headers": headers.raw}
+        if message["type"] != "http.response.body":
+            # e.g. http.response.pathsend, the server reads the file itself
+            await self.send(start)
+            await self.send(message)
+            return
+
+        body = message.get("body", b"")
+        more_body = message.get("more_body", False)
+        if not self._wants_compression(headers) or (not more_body and len(body) < self.minimum_size):
+            await self.send(start)
+            await self.send(message)
+            return
+
+        headers["Content-Encoding"] = self.encoding
+        if "etag" in headers:
+            headers["ETag"] = weaken_etag(headers["etag"])
+        if more_body:
+            del headers["Content-Length"]
+            self.compressor = StreamCompressor(self.encoding)
+            body = self.compressor.process(body)
+        elif len(body) >= THREAD_COMPRESSION_SIZE:
+            body = await anyio.to_thread.run_sync(compress, body, self.encoding)
+        else:
+            body = compress(body, self.encoding)
+        if not more_body:
+            headers["Content-Length"] = str(len(body))
+        await self.send(start)
+        await self.send({**message, "body": body})
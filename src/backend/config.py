@@ -12,6 +12,12 @@ class DatabaseConfig(BaseModel):
     
     Attributes:
     dsn: Data source for connecting with the target database
+    pool_size: Connections kept open in the pool of each worker
+    max_overflow: Extra connections opened above pool_size under load
+    pool_timeout: Seconds to wait for a free connection before giving up
+    pool_recycle: Seconds after which a connection is replaced, -1 disables recycling
+    pool_pre_ping: Test connections for liveness when they are checked out
+    statement_cache_size: asyncpg prepared statement cache size per connection, 0 for pgbouncer
     """
 
     db_url: str | None = os.getenv("DB_URL")
@@ -19,6 +25,12 @@ class DatabaseConfig(BaseModel):
         raise ValueError("Database url is missing")
     
     dsn: str = db_url
+    pool_size: int = int(os.getenv("DB_POOL_SIZE", 5))
+    max_overflow: int = int(os.getenv("DB_MAX_OVERFLOW", 10))
+    pool_timeout: float = float(os.getenv("DB_POOL_TIMEOUT", 30))
+    pool_recycle: int = int(os.getenv("DB_POOL_RECYCLE", 1800))
+    pool_pre_ping: bool = os.getenv("DB_POOL_PRE_PING", "true").lower() == "true"
+    statement_cache_size: int = int(os.getenv("DB_STATEMENT_CACHE_SIZE", 100))
 
 
 class Config(DatabaseConfig):
@@ -28,6 +40,43 @@ class Config(DatabaseConfig):
     Attributes:
     database: An embedded Pydantic model holding all database specific configuration
     token: A secret key for security-related operations
+    resource_page_size: Default number of learning resources returned per page
+    resource_page_max_size: Upper bound a client may request for a single page
+    password_hash_executor: "thread" or "process" pool used for bcrypt hashing and verification
+    password_hash_workers: Number of bcrypt operations allowed to run at the same time
+    password_hash_max_queue: Operations allowed to wait for a worker before new ones are rejected
+    principal_cache_size: Number of authenticated users kept in memory by get_current_user
+    principal_cache_ttl: Seconds an authenticated user is served from memory before it is reloaded
+    cache_l1_size: Entries of the in-process cache kept in front of Redis, 0 disables the L1 tier
+    cache_l1_ttl: Seconds an entry is served from the in-process cache before Redis is asked again
+    cache_stale_ttl: Seconds an expired response may still be served while one request refreshes it
+    cache_lock_timeout: Seconds a worker may spend computing a cache miss before others stop waiting
+    bulk_batch_size: Default number of rows written per INSERT (or COPY) by the bulk resource endpoint
+    job_queue_backend: "redis" for a Redis stream or "sqlite" for a local file holding background jobs
+    job_queue_sqlite_path: File of the SQLite job queue, shared by the API and the worker processes
+    job_worker_processes: Number of processes started by `python -m src.worker`
+    job_worker_concurrency: Jobs run at the same time by each worker process
+    job_max_attempts: Times a failing job is attempted before it is moved to the dead-letter queue
+    job_retry_backoff: Seconds before the first retry of a failed job, doubled on every further attempt
+    job_retry_backoff_max: Upper bound of the delay between two attempts of a job
+    job_visibility_timeout: Seconds a job stays leased to a worker before another worker may take it over
+    view_counter_backend: "redis" to aggregate resource views in Redis hashes shared by all workers, "memory" per worker
+    view_flush_interval: Seconds between two batched writes of the aggregated views to the database
+    image_upload_max_bytes: Largest resource image accepted, uploads are cut off once they stream past it
+    image_upload_chunk_size: Bytes read and written per step while an image upload streams to disk
+    image_variant_widths: Comma separated widths of the thumbnails rendered for every uploaded image
+    image_variant_quality: Encoder quality of the WebP and JPEG thumbnails
+    image_variant_workers: Processes rendering thumbnails in parallel
+    static_max_age: Seconds browsers may cache static files whose name is not a content hash
+    static_precompress_min_size: Smallest static asset given precompressed .br and .gz siblings at startup
+    compression_min_size: Smallest response body compressed for clients accepting Brotli or gzip
+    compression_gzip_level: zlib level (1-9) of gzip compressed responses
+    compression_brotli_quality: Brotli quality (0-11) of Brotli compressed responses
+    skill_index_enabled: Answer skill to resource lookups from the in-memory index instead of the database
+    skill_index_refresh_interval: Seconds between two rebuilds of the in-memory skill index from the database
+    learning_path_refresh_interval: Seconds between two rebuilds of the in-memory learning path graph from the database
+    related_resources_k: Most similar resources precomputed per resource
+    related_resources_refresh_interval: Seconds between two recomputations of the related resources on the process pool
     """
 
     database: DatabaseConfig = DatabaseConfig()
@@ -36,6 +85,43 @@ class Config(DatabaseConfig):
     algorithm: str | None = os.getenv("ALGORITHM")
     token_key: str = ""
     REDIS_URL: str = "redis://localhost:6379"
+    resource_page_size: int = int(os.getenv("RESOURCE_PAGE_SIZE", 50))
+    resource_page_max_size: int = int(os.getenv("RESOURCE_PAGE_MAX_SIZE", 500))
+    password_hash_executor: str = os.getenv("PASSWORD_HASH_EXECUTOR", "thread")
+    password_hash_workers: int = int(os.getenv("PASSWORD_HASH_WORKERS", 4))
+    password_hash_max_queue: int = int(os.getenv("PASSWORD_HASH_MAX_QUEUE", 64))
+    principal_cache_size: int = int(os.getenv("PRINCIPAL_CACHE_SIZE", 10_000))
+    principal_cache_ttl: int = int(os.getenv("PRINCIPAL_CACHE_TTL", 60))
+    cache_l1_size: int = int(os.getenv("CACHE_L1_SIZE", 1024))
+    cache_l1_ttl: float = float(os.getenv("CACHE_L1_TTL", 5))
+    cache_stale_ttl: int = int(os.getenv("CACHE_STALE_TTL", 30))
+    cache_lock_timeout: float = float(os.getenv("CACHE_LOCK_TIMEOUT", 5))
+    bulk_batch_size: int = int(os.getenv("BULK_BATCH_SIZE", 1000))
+    job_queue_backend: str = os.getenv("JOB_QUEUE_BACKEND", "redis")
+    job_queue_sqlite_path: str = os.getenv("JOB_QUEUE_SQLITE_PATH", "jobs.db")
+    job_worker_processes: int = int(os.getenv("JOB_WORKER_PROCESSES", 2))
+    job_worker_concurrency: int = int(os.getenv("JOB_WORKER_CONCURRENCY", 32))
+    job_max_attempts: int = int(os.getenv("JOB_MAX_ATTEMPTS", 5))
+    job_retry_backoff: float = float(os.getenv("JOB_RETRY_BACKOFF", 2))
+    job_retry_backoff_max: float = float(os.getenv("JOB_RETRY_BACKOFF_MAX", 300))
+    job_visibility_timeout: float = float(os.getenv("JOB_VISIBILITY_TIMEOUT", 60))
+    view_counter_backend: str = os.getenv("VIEW_COUNTER_BACKEND", "redis")
+    view_flush_interval: float = float(os.getenv("VIEW_FLUSH_INTERVAL", 30))
+    image_upload_max_bytes: int = int(os.getenv("IMAGE_UPLOAD_MAX_BYTES", 10 * 1024 * 1024))
+    image_upload_chunk_size: int = int(os.getenv("IMAGE_UPLOAD_CHUNK_SIZE", 256 * 1024))
+    image_variant_widths: str = os.getenv("IMAGE_VARIANT_WIDTHS", "160,480")
+    image_variant_quality: int = int(os.getenv("IMAGE_VARIANT_QUALITY", 80))
+    image_variant_workers: int = int(os.getenv("IMAGE_VARIANT_WORKERS", 2))
+    static_max_age: int = int(os.getenv("STATIC_MAX_AGE", 3600))
+    static_precompress_min_size: int = int(os.getenv("STATIC_PRECOMPRESS_MIN_SIZE", 1024))
+    compression_min_size: int = int(os.getenv("COMPRESSION_MIN_SIZE", 1024))
+    compression_gzip_level: int = int(os.getenv("COMPRESSION_GZIP_LEVEL", 6))
+    compression_brotli_quality: int = int(os.getenv("COMPRESSION_BROTLI_QUALITY", 4))
+    skill_index_enabled: bool = os.getenv("SKILL_INDEX_ENABLED", "true").lower() == "true"
+    skill_index_refresh_interval: float = float(os.getenv("SKILL_INDEX_REFRESH_INTERVAL", 300))
+    learning_path_refresh_interval: float = float(os.getenv("LEARNING_PATH_REFRESH_INTERVAL", 300))
+    related_resources_k: int = int(os.getenv("RELATED_RESOURCES_K", 20))
+    related_resources_refresh_interval: float = float(os.getenv("RELATED_RESOURCES_REFRESH_INTERVAL", 600))
 
 
 config = Config()
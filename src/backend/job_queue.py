@@ -0,0 +1,401 @@
+import asyncio
+import json
+import logging
+import os
+import random
+import socket
+import time
+from abc import ABC, abstractmethod
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable
+
+import aiosqlite
+from redis import asyncio as aioredis
+from redis.asyncio import Redis
+from redis.exceptions import ResponseError
+
+from src.backend.config import config
+
+logger = logging.getLogger(__name__)
+
+# Coroutine function run by a worker for a job, called with the keyword arguments it was enqueued with
+JobHandler = Callable[..., Awaitable[Any]]
+
+
+@dataclass
+class Job:
+    """
+    A unit of background work reserved by a worker
+
+    Attributes:
+    id: Backend specific identifier used to acknowledge the job
+    name: Name of the handler that runs the job
+    kwargs: Keyword arguments passed to the handler
+    attempts: Number of times the job was handed to a worker, this delivery included
+    """
+
+    id: str
+    name: str
+    kwargs: dict[str, Any] = field(default_factory=dict)
+    attempts: int = 1
+
+
+class JobQueue(ABC):
+    """
+    Durable queue of background jobs shared by the API workers and the job worker processes
+
+    A reserved job stays leased to its worker for `visibility_timeout` seconds. Unless it is
+    acknowledged, retried or dead-lettered in that time, another worker picks it up again.
+    """
+
+    def __init__(self, visibility_timeout: float):
+        self.visibility_timeout = visibility_timeout
+
+    @abstractmethod
+    async def enqueue(self, name: str, **kwargs: Any) -> str:
+        """Appends a job and returns its id, a single write that does not wait for the job to run"""
+
+    @abstractmethod
+    async def reserve(self, consumer: str, count: int, block: float) -> list[Job]:
+        """Leases up to count ready jobs to consumer, waiting at most block seconds for one to arrive"""
+
+    @abstractmethod
+    async def ack(self, job: Job) -> None:
+        """Removes a finished job"""
+
+    @abstractmethod
+    async def retry(self, job: Job, delay: float, error: str) -> None:
+        """Makes a failed job ready again after delay seconds"""
+
+    @abstractmethod
+    async def dead_letter(self, job: Job, error: str) -> None:
+        """Moves a job that will not be retried to the dead-letter queue"""
+
+    @abstractmethod
+    async def stats(self) -> dict:
+        """Number of ready, leased, delayed and dead jobs"""
+
+    async def close(self) -> None:
+        pass
+
+
+class RedisStreamJobQueue(JobQueue):
+    """
+    Job queue on a Redis stream read through a consumer group
+
+    Jobs waiting for a retry sit in a sorted set scored by the time they become ready and are
+    moved back onto the stream by whichever worker reserves next. Dead jobs go to a second,
+    capped stream.
+    """
+
+    def __init__(self, redis: Redis, visibility_timeout: float, stream: str = "jobs", group: str = "workers", dead_letter_size: int = 10_000):
+        super().__init__(visibility_timeout)
+        self.redis = redis
+        self.stream = stream
+        self.group = group
+        self.delayed_key = f"{stream}:delayed"
+        self.dead_letter_stream = f"{stream}:dead"
+        self.dead_letter_size = dead_letter_size
+        self._group_ready = False
+
+    async def _ensure_group(self) -> None:
+        if self._group_ready:
+            return
+        try:
+            await self.redis.xgroup_create(self.stream, self.group, id="0", mkstream=True)
+        except ResponseError as e:
+            if "BUSYGROUP" not in str(e):
+                raise
+        self._group_ready = True
+
+    async def enqueue(self, name: str, **kwargs: Any) -> str:
+        job_id = await self.redis.xadd(self.stream, {"name": name, "kwargs": json.dumps(kwargs), "attempts": 0})
+        return job_id.decode()
+
+    def _job(self, message_id: bytes, fields: dict[bytes, bytes], deliveries: int = 1) -> Job:
+        # the attempts field counts the runs before the job was last added to the stream,
+        # deliveries those since, as counted by the consumer group
+        return Job(
+            id=message_id.decode(),
+            name=fields[b"name"].decode(),
+            kwargs=json.loads(fields[b"kwargs"]),
+            attempts=int(fields.get(b"attempts", 0)) + deliveries,
+        )
+
+    async def _promote_delayed(self) -> None:
+        due = await self.redis.zrangebyscore(self.delayed_key, "-inf", time.time(), start=0, num=100)
+        for entry in due:
+            # only the worker that removes the entry puts it back, so concurrent promoters cannot duplicate it
+            if await self.redis.zrem(self.delayed_key, entry):
+                job = json.loads(entry)
+                await self.redis.xadd(self.stream, {"name": job["name"], "kwargs": json.dumps(job["kwargs"]), "attempts": job["attempts"]})
+
+    async def reserve(self, consumer: str, count: int, block: float) -> list[Job]:
+        await self._ensure_group()
+        await self._promote_delayed()
+
+        # jobs leased to a worker that died are claimed back once their lease ran out; the reply
+        # has a third element (deleted ids) from Redis 7 on, so it is indexed rather than unpacked
+        reply = await self.redis.xautoclaim(
+            self.stream, self.group, consumer, min_idle_time=int(self.visibility_timeout * 1000), start_id="0-0", count=count
+        )
+        claimed = [(message_id, fields) for message_id, fields in reply[1] if fields]
+        if claimed:
+            # the stream fields are not updated on delivery, the pending entries list counts them
+            pending = await self.redis.xpending_range(
+                self.stream, self.group, min=claimed[0][0], max=claimed[-1][0], count=len(reply[1]), consumername=consumer
+            )
+            deliveries = {entry["message_id"]: entry["times_delivered"] for entry in pending}
+            return [self._job(message_id, fields, deliveries.get(message_id, 1)) for message_id, fields in claimed]
+
+        response = await self.redis.xreadgroup(self.group, consumer, {self.stream: ">"}, count=count, block=int(block * 1000))
+        return [self._job(message_id, fields) for _, messages in response or [] for message_id, fields in messages]
+
+    async def ack(self, job: Job) -> None:
+        async with self.redis.pipeline(transaction=True) as pipe:
+            pipe.xack(self.stream, self.group, job.id)
+            pipe.xdel(self.stream, job.id)
+            await pipe.execute()
+
+    async def retry(self, job: Job, delay: float, error: str) -> None:
+        entry = json.dumps({"name": job.name, "kwargs": job.kwargs, "attempts": job.attempts, "id": job.id})
+        async with self.redis.pipeline(transaction=True) as pipe:
+            pipe.zadd(self.delayed_key, {entry: time.time() + delay})
+            pipe.xack(self.stream, self.group, job.id)
+            pipe.xdel(self.stream, job.id)
+            await pipe.execute()
+
+    async def dead_letter(self, job: Job, error: str) -> None:
+        fields = {"id": job.id, "name": job.name, "kwargs": json.dumps(job.kwargs), "attempts": job.attempts, "error": error}
+        async with self.redis.pipeline(transaction=True) as pipe:
+            pipe.xadd(self.dead_letter_stream, fields, maxlen=self.dead_letter_size, approximate=True)
+            pipe.xack(self.stream, self.group, job.id)
+            pipe.xdel(self.stream, job.id)
+            await pipe.execute()
+
+    async def stats(self) -> dict:
+        await self._ensure_group()
+        async with self.redis.pipeline(transaction=False) as pipe:
+            pipe.xlen(self.stream)
+            pipe.xpending(self.stream, self.group)
+            pipe.zcard(self.delayed_key)
+            pipe.xlen(self.dead_letter_stream)
+            length, pending, delayed, dead = await pipe.execute()
+        return {"backend": "redis", "ready": length - pending["pending"], "leased": pending["pending"], "delayed": delayed, "dead": dead}
+
+    async def close(self) -> None:
+        await self.redis.aclose()
+
+
+class SQLiteJobQueue(JobQueue):
+    """
+    Job queue in a SQLite table, for deployments without Redis
+
+    Every job is a row whose run_at is the time it becomes ready, or for a leased job the time
+    its lease runs out. Reservation is a single UPDATE ... RETURNING, so worker processes
+    sharing the file never lease the same job twice.
+    """
+
+    def __init__(self, path: str, visibility_timeout: float):
+        super().__init__(visibility_timeout)
+        self.path = path
+        self._db: aiosqlite.Connection | None = None
+        self._connect_lock = asyncio.Lock()
+
+    async def _connection(self) -> aiosqlite.Connection:
+        async with self._connect_lock:
+            if self._db is None:
+                db = await aiosqlite.connect(self.path, isolation_level=None)
+                await db.execute("PRAGMA journal_mode=WAL")
+                await db.execute("PRAGMA busy_timeout=5000")
+                await db.execute(
+                    """
+                    CREATE TABLE IF NOT EXISTS jobs (
+                        id INTEGER PRIMARY KEY AUTOINCREMENT,
+                        name TEXT NOT NULL,
+                        kwargs TEXT NOT NULL,
+                        status TEXT NOT NULL DEFAULT 'ready',
+                        attempts INTEGER NOT NULL DEFAULT 0,
+                        run_at REAL NOT NULL,
+                        last_error TEXT
+                    )
+                    """
+                )
+                await db.execute("CREATE INDEX IF NOT EXISTS ix_jobs_status_run_at ON jobs (status, run_at)")
+                self._db = db
+            return self._db
+
+    async def enqueue(self, name: str, **kwargs: Any) -> str:
+        db = await self._connection()
+        cursor = await db.execute("INSERT INTO jobs (name, kwargs, run_at) VALUES (?, ?, ?)", (name, json.dumps(kwargs), time.time()))
+        return str(cursor.lastrowid)
+
+    async def _reserve_ready(self, count: int) -> list[Job]:
+        db = await self._connection()
+        now = time.time()
+        # a 'leased' row whose run_at has passed belongs to a worker that died, so it is handed out again
+        cursor = await db.execute(
+            """
+            UPDATE jobs SET status = 'leased', attempts = attempts + 1, run_at = ?
+            WHERE id IN (
+                SELECT id FROM jobs WHERE status IN ('ready', 'leased') AND run_at <= ? ORDER BY run_at LIMIT ?
+            )
+            RETURNING id, name, kwargs, attempts
+            """,
+            (now + self.visibility_timeout, now, count),
+        )
+        rows = await cursor.fetchall()
+        return [Job(id=str(row[0]), name=row[1], kwargs=json.loads(row[2]), attempts=row[3]) for row in rows]
+
+    async def reserve(self, consumer: str, count: int, block: float) -> list[Job]:
+        deadline = time.monotonic() + block
+        while True:
+            jobs = await self._reserve_ready(count)
+            if jobs or time.monotonic() >= deadline:
+                return jobs
+            await asyncio.sleep(min(0.2, block))
+
+    async def ack(self, job: Job) -> None:
+        db = await self._connection()
+        await db.execute("DELETE FROM jobs WHERE id = ?", (int(job.id),))
+
+    async def retry(self, job: Job, delay: float, error: str) -> None:
+        db = await self._connection()
+        await db.execute(
+            "UPDATE jobs SET status = 'ready', run_at = ?, last_error = ? WHERE id = ?", (time.time() + delay, error, int(job.id))
+        )
+
+    async def dead_letter(self, job: Job, error: str) -> None:
+        db = await self._connection()
+        await db.execute("UPDATE jobs SET status = 'dead', last_error = ? WHERE id = ?", (error, int(job.id)))
+
+    async def stats(self) -> dict:
+        db = await self._connection()
+        now = time.time()
+        cursor = await db.execute(
+            """
+            SELECT
+                SUM(status = 'ready' AND run_at <= ?),
+                SUM(status = 'leased'),
+                SUM(status = 'ready' AND run_at > ?),
+                SUM(status = 'dead')
+            FROM jobs
+            """,
+            (now, now),
+        )
+        ready, leased, delayed, dead = await cursor.fetchone()
+        return {"backend": "sqlite", "ready": ready or 0, "leased": leased or 0, "delayed": delayed or 0, "dead": dead or 0}
+
+    async def close(self) -> None:
+        if self._db is not None:
+            await self._db.close()
+            self._db = None
+
+
+class JobWorker:
+    """
+    Runs jobs from a queue with bounded concurrency
+
+    A job whose handler raises is retried with exponential backoff and jitter until it has been
+    attempted max_attempts times, then moved to the dead-letter queue.
+
+    Attributes:
+    concurrency: Jobs run at the same time by this worker
+    max_attempts: Deliveries of a job before it is dead-lettered
+    backoff: Delay in seconds before the first retry, doubled for every further attempt
+    backoff_max: Upper bound of the retry delay
+    """
+
+    def __init__(
+        self,
+        queue: JobQueue,
+        handlers: dict[str, JobHandler],
+        concurrency: int,
+        max_attempts: int,
+        backoff: float,
+        backoff_max: float,
+        consumer: str | None = None,
+        poll_interval: float = 1.0,
+    ):
+        self.queue = queue
+        self.handlers = handlers
+        self.concurrency = concurrency
+        self.max_attempts = max_attempts
+        self.backoff = backoff
+        self.backoff_max = backoff_max
+        self.consumer = consumer or f"{socket.gethostname()}-{os.getpid()}"
+        self.poll_interval = poll_interval
+        self._running: set[asyncio.Task] = set()
+        self.completed = 0
+        self.retried = 0
+        self.dead_lettered = 0
+
+    def retry_delay(self, attempts: int) -> float:
+        delay = min(self.backoff_max, self.backoff * 2 ** (attempts - 1))
+        return delay * random.uniform(0.5, 1.0)
+
+    async def process(self, job: Job) -> None:
+        handler = self.handlers.get(job.name)
+        if handler is None:
+            await self.queue.dead_letter(job, f"No handler registered for job {job.name!r}")
+            self.dead_lettered += 1
+            return
+        if job.attempts > self.max_attempts:
+            # every earlier delivery lost its worker (crash, OOM, expired lease) before the handler returned
+            logger.error("Job %s %s was delivered %s times without finishing, moving it to the dead-letter queue", job.name, job.id, job.attempts)
+            await self.queue.dead_letter(job, f"Lease expired {job.attempts - 1} times")
+            self.dead_lettered += 1
+            return
+
+        try:
+            await handler(**job.kwargs)
+        except Exception as e:
+            error = f"{type(e).__name__}: {e}"
+            if job.attempts >= self.max_attempts:
+                logger.error("Job %s %s failed %s times, moving it to the dead-letter queue: %s", job.name, job.id, job.attempts, error)
+                await self.queue.dead_letter(job, error)
+                self.dead_lettered += 1
+            else:
+                delay = self.retry_delay(job.attempts)
+                logger.warning("Job %s %s failed, retrying in %.1fs: %s", job.name, job.id, delay, error)
+                await self.queue.retry(job, delay, error)
+                self.retried += 1
+        else:
+            await self.queue.ack(job)
+            self.completed += 1
+
+    async def run(self, stop: asyncio.Event) -> None:
+        """Reserves and runs jobs until stop is set, then lets the jobs already started finish"""
+        while not stop.is_set():
+            free = self.concurrency - len(self._running)
+            if free <= 0:
+                await asyncio.wait(self._running, return_when=asyncio.FIRST_COMPLETED)
+                continue
+            try:
+                jobs = await self.queue.reserve(self.consumer, free, block=self.poll_interval)
+            except Exception:
+                logger.warning("Error reserving jobs, retrying", exc_info=True)
+                await asyncio.sleep(self.poll_interval)
+                continue
+            for job in jobs:
+                task = asyncio.create_task(self.process(job))
+                self._running.add(task)
+                task.add_done_callback(self._running.discard)
+
+        if self._running:
+            await asyncio.wait(self._running)
+
+
+def create_job_queue() -> JobQueue:
+    """Job queue of the backend selected by config.job_queue_backend"""
+    if config.job_queue_backend == "sqlite":
+        return SQLiteJobQueue(config.job_queue_sqlite_path, visibility_timeout=config.job_visibility_timeout)
+    return RedisStreamJobQueue(aioredis.from_url(config.REDIS_URL), visibility_timeout=config.job_visibility_timeout)
+
+
+job_queue = create_job_queue()
+
+
+def get_job_queue() -> JobQueue:
+    """FastAPI dependency returning the job queue, overridden in tests"""
+    return job_queue
@@ -0,0 +1,253 @@
+import asyncio
+import logging
+import time
+from dataclasses import dataclass
+
+import numpy as np
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import sessionmaker
+
+from src.db.models import LearningResource, learning_resource_skill_association
+
+logger = logging.getLogger(__name__)
+
+# Rows read per round trip while the graph is built
+REBUILD_BATCH_SIZE = 10_000
+# Changed resources scored in Python before they are merged into the arrays
+OVERLAY_LIMIT = 1024
+# Difficulty is 1 to 5, so covering one more target skill always outweighs being easier
+DIFFICULTY_LEVELS = 10
+
+
+@dataclass
+class PathStep:
+    resource_id: int
+    difficulty: int
+    skill_ids: list[int]
+
+
+class LearningPathGraph:
+    """
+    In-memory bipartite graph of resources and the skills they teach, scored with NumPy
+
+    Resources are parallel arrays sorted by id (ids, difficulty, alive) and every association
+    an entry (entry_rows, entry_skills) pointing at its resource row, sorted by row. Changed
+    resources are marked stale and reloaded on the next query: their row is marked dead and
+    the new version kept in a small overlay, which is merged into the arrays once it outgrows
+    OVERLAY_LIMIT. A periodic rebuild picks up the writes of other workers.
+    """
+
+    def __init__(self):
+        self.ids = np.empty(0, dtype=np.int64)
+        self.difficulty = np.empty(0, dtype=np.int64)
+        self.alive = np.empty(0, dtype=bool)
+        self.entry_rows = np.empty(0, dtype=np.int64)
+        self.entry_skills = np.empty(0, dtype=np.int64)
+        self._overlay: dict[int, tuple[int, frozenset[int]]] = {}
+        self._stale: set[int] = set()
+        self._refresher: asyncio.Task | None = None
+        self.loaded = False
+        self.rebuilds = 0
+        self.rebuilt_at: float | None = None
+        self.compactions = 0
+        self.plans = 0
+
+    # --- changes ---
+
+    def mark_stale(self, *resource_ids: int) -> None:
+        """Reloads the resources from the database before the next path is planned"""
+        self._stale.update(resource_ids)
+
+    def mark_skill_stale(self, skill_id: int) -> None:
+        """Reloads every resource teaching the skill before the next path is planned"""
+        rows = self.entry_rows[self.entry_skills == skill_id]
+        self._stale.update(self.ids[rows].tolist())
+        self._stale.update(resource_id for resource_id, (_, skills) in self._overlay.items() if skill_id in skills)
+
+    async def refresh(self, session: AsyncSession) -> None:
+        """Loads the graph on first use and reloads the resources marked stale since the last call"""
+        if not self.loaded:
+            await self._load(session)
+        if not self._stale:
+            return
+        stale, self._stale = self._stale, set()
+        resources = await self._read_resources(session, stale)
+
+        stale_ids = np.fromiter(stale, dtype=np.int64, count=len(stale))
+        positions = np.searchsorted(self.ids, stale_ids)
+        found = positions < len(self.ids)
+        found[found] = self.ids[positions[found]] == stale_ids[found]
+        self.alive[positions[found]] = False
+        for resource_id in stale:
+            if resource_id in resources:
+                self._overlay[resource_id] = resources[resource_id]
+            else:
+                self._overlay.pop(resource_id, None)
+        if len(self._overlay) > OVERLAY_LIMIT:
+            self._compact()
+
+    async def _read_resources(self, session: AsyncSession, resource_ids: set[int]) -> dict[int, tuple[int, frozenset[int]]]:
+        difficulty = dict((await session.execute(
+            select(LearningResource.id, func.coalesce(LearningResource.difficulty, 1))
+            .where(LearningResource.id.in_(resource_ids))
+        )).all())
+        skills: dict[int, set[int]] = {resource_id: set() for resource_id in difficulty}
+        associations = await session.execute(
+            select(learning_resource_skill_association.c.learning_resource_id, learning_resource_skill_association.c.skill_id)
+            .where(learning_resource_skill_association.c.learning_resource_id.in_(resource_ids))
+        )
+        for resource_id, skill_id in associations:
+            skills[resource_id].add(skill_id)
+        return {resource_id: (difficulty[resource_id], frozenset(skills[resource_id])) for resource_id in difficulty}
+
+    def _compact(self) -> None:
+        """Merges the overlay into the arrays and drops the dead rows"""
+        live_entries = self.alive[self.entry_rows]
+        overlay_ids = np.fromiter(self._overlay, dtype=np.int64, count=len(self._overlay))
+        ids = np.concatenate([self.ids[self.alive], overlay_ids])
+        difficulty = np.concatenate([
+            self.difficulty[self.alive],
+            np.fromiter((difficulty for difficulty, _ in self._overlay.values()), dtype=np.int64, count=len(self._overlay)),
+        ])
+        entry_ids = np.concatenate([
+            self.ids[self.entry_rows[live_entries]],
+            np.fromiter((resource_id for resource_id, (_, skills) in self._overlay.items() for _ in skills), dtype=np.int64),
+        ])
+        entry_skills = np.concatenate([
+            self.entry_skills[live_entries],
+            np.fromiter((skill_id for _, skills in self._overlay.values() for skill_id in skills), dtype=np.int64),
+        ])
+        self._install(ids, difficulty, entry_ids, entry_skills)
+        self._overlay = {}
+        self.compactions += 1
+
+    def _install(self, ids: np.ndarray, difficulty: np.ndarray, entry_ids: np.ndarray, entry_skills: np.ndarray) -> None:
+        order = np.argsort(ids, kind="stable")
+        self.ids, self.difficulty = ids[order], difficulty[order]
+        self.alive = np.ones(len(ids), dtype=bool)
+        entry_rows = np.searchsorted(self.ids, entry_ids)
+        order = np.argsort(entry_rows, kind="stable")
+        self.entry_rows, self.entry_skills = entry_rows[order], entry_skills[order]
+
+    # --- building ---
+
+    async def _load(self, session: AsyncSession) -> None:
+        ids, difficulty, entry_ids, entry_skills = [], [], [], []
+        result = await session.stream(
+            select(LearningResource.id, func.coalesce(LearningResource.difficulty, 1))
+            .execution_options(yield_per=REBUILD_BATCH_SIZE)
+        )
+        async for rows in result.partitions():
+            ids.extend(row[0] for row in rows)
+            difficulty.extend(row[1] for row in rows)
+        result = await session.stream(
+            select(learning_resource_skill_association.c.learning_resource_id, learning_resource_skill_association.c.skill_id)
+            .execution_options(yield_per=REBUILD_BATCH_SIZE)
+        )
+        async for rows in result.partitions():
+            entry_ids.extend(row[0] for row in rows)
+            entry_skills.extend(row[1] for row in rows)
+
+        self._install(
+            np.array(ids, dtype=np.int64), np.array(difficulty, dtype=np.int64),
+            np.array(entry_ids, dtype=np.int64), np.array(entry_skills, dtype=np.int64),
+        )
+        self._overlay = {}
+        self.loaded = True
+        self.rebuilds += 1
+        self.rebuilt_at = time.time()
+
+    async def rebuild(self, session_factory: sessionmaker) -> None:
+        """Reads the whole graph again, resources changed meanwhile stay marked stale"""
+        self._stale = set()
+        async with session_factory() as session:
+            await self._load(session)
+
+    async def _rebuild_periodically(self, session_factory: sessionmaker, interval: float) -> None:
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                await self.rebuild(session_factory)
+            except Exception:
+                logger.warning("Error rebuilding the learning path graph, paths keep using the last one", exc_info=True)
+
+    async def start(self, session_factory: sessionmaker, interval: float) -> None:
+        self._refresher = asyncio.create_task(self._rebuild_periodically(session_factory, interval))
+
+    async def stop(self) -> None:
+        if self._refresher is not None:
+            self._refresher.cancel()
+            self._refresher = None
+
+    # --- planning ---
+
+    def plan(self, known_skill_ids: set[int], target_skill_ids: set[int], max_steps: int) -> tuple[list[PathStep], set[int]]:
+        """
+        Picks resources until every target skill not known yet is taught, easiest first.
+
+        One vectorized pass finds the associations teaching a missing skill; each round then
+        scores only the resources behind them: DIFFICULTY_LEVELS per still missing skill a
+        resource teaches, minus its difficulty. The steps come back ordered by difficulty, with
+        the target skills no chosen resource teaches.
+        """
+        self.plans += 1
+        missing = set(target_skill_ids) - set(known_skill_ids)
+        steps: list[PathStep] = []
+        hits = np.flatnonzero(self.alive[self.entry_rows] & np.isin(self.entry_skills, list(missing)))
+        # candidate rows in id order, every hit pointing at its candidate
+        rows, candidates = np.unique(self.entry_rows[hits], return_inverse=True)
+        hit_skills = self.entry_skills[hits]
+        active = np.ones(len(hits), dtype=bool)
+        difficulty = self.difficulty[rows]
+
+        while missing and len(steps) < max_steps:
+            coverage = np.bincount(candidates[active], minlength=len(rows))
+            scores = np.where(coverage > 0, coverage * DIFFICULTY_LEVELS - difficulty, np.iinfo(np.int64).min)
+            # argmax returns the first best candidate, the lowest id among equal scores
+            candidate = int(np.argmax(scores)) if len(scores) else -1
+            best = (int(scores[candidate]), -int(self.ids[rows[candidate]])) if candidate >= 0 and coverage[candidate] > 0 else None
+
+            best_overlay = None
+            for resource_id, (level, skills) in self._overlay.items():
+                taught = len(skills & missing)
+                if taught:
+                    option = (taught * DIFFICULTY_LEVELS - level, -resource_id)
+                    if best_overlay is None or option > best_overlay:
+                        best_overlay = option
+
+            if best is None and best_overlay is None:
+                break
+            if best_overlay is None or (best is not None and best > best_overlay):
+                taught = set(hit_skills[active & (candidates == candidate)].tolist())
+                steps.append(PathStep(int(self.ids[rows[candidate]]), int(difficulty[candidate]), sorted(taught)))
+            else:
+                resource_id = -best_overlay[1]
+                level, skills = self._overlay[resource_id]
+                taught = skills & missing
+                steps.append(PathStep(resource_id, level, sorted(taught)))
+            missing -= taught
+            active &= ~np.isin(hit_skills, list(taught))
+
+        steps.sort(key=lambda step: (step.difficulty, step.resource_id))
+        return steps, missing
+
+    def stats(self) -> dict:
+        return {
+            "loaded": self.loaded,
+            "resources": int(self.alive.sum()) + len(self._overlay),
+            "associations": len(self.entry_rows),
+            "overlay": len(self._overlay),
+            "stale": len(self._stale),
+            "rebuilds": self.rebuilds,
+            "rebuilt_at": self.rebuilt_at,
+            "compactions": self.compactions,
+            "plans": self.plans,
+        }
+
+
+learning_path_graph = LearningPathGraph()
+
+
+def get_learning_path_graph() -> LearningPathGraph:
+    return learning_path_graph
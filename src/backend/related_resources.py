@@ -0,0 +1,123 @@
+import asyncio
+import logging
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+from sqlalchemy import select
+from sqlalchemy.orm import sessionmaker
+
+from src.backend.config import config
+from src.db.models import learning_resource_skill_association
+from src.utils.similarity_utils import related_top_k
+
+logger = logging.getLogger(__name__)
+
+# Association rows read per round trip while the neighbours are recomputed
+REFRESH_BATCH_SIZE = 10_000
+
+
+class RelatedResources:
+    """
+    Precomputed most similar resources of every resource, by the skills they share
+
+    The similarity matrix is multiplied out on a process pool, off the event loop and the
+    GIL, and the result swapped in whole: ids sorted ascending and a row of neighbour ids
+    and similarities per id. A lookup is one binary search and a row slice. Until the first
+    refresh finishes lookups return None and callers fall back to the database.
+
+    Attributes:
+    k: Neighbours kept per resource
+    """
+
+    def __init__(self, k: int):
+        self.k = k
+        self.ids = np.empty(0, dtype=np.int64)
+        self.neighbours = np.empty((0, k), dtype=np.int64)
+        self.scores = np.empty((0, k), dtype=np.float32)
+        self._executor: ProcessPoolExecutor | None = None
+        self._refresher: asyncio.Task | None = None
+        self.loaded = False
+        self.refreshes = 0
+        self.refreshed_at: float | None = None
+        self.refresh_seconds: float | None = None
+        self.lookups = 0
+
+    @property
+    def executor(self) -> ProcessPoolExecutor:
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(max_workers=1)
+        return self._executor
+
+    def lookup(self, resource_id: int, limit: int) -> list[tuple[int, float]] | None:
+        """(id, similarity) of the most similar resources, best first, None until the first refresh"""
+        if not self.loaded:
+            return None
+        self.lookups += 1
+        row = int(np.searchsorted(self.ids, resource_id))
+        if row == len(self.ids) or self.ids[row] != resource_id:
+            return []
+        return [
+            (int(neighbour), float(score))
+            for neighbour, score in zip(self.neighbours[row, :limit], self.scores[row, :limit])
+            if neighbour >= 0
+        ]
+
+    async def refresh(self, session_factory: sessionmaker) -> None:
+        """Reads every association and recomputes the neighbours of every resource on the process pool"""
+        started = time.perf_counter()
+        resource_ids, skill_ids = [], []
+        async with session_factory() as session:
+            result = await session.stream(
+                select(learning_resource_skill_association.c.learning_resource_id, learning_resource_skill_association.c.skill_id)
+                .execution_options(yield_per=REFRESH_BATCH_SIZE)
+            )
+            async for rows in result.partitions():
+                resource_ids.extend(row[0] for row in rows)
+                skill_ids.extend(row[1] for row in rows)
+
+        self.ids, self.neighbours, self.scores = await asyncio.get_running_loop().run_in_executor(
+            self.executor, related_top_k,
+            np.array(resource_ids, dtype=np.int64), np.array(skill_ids, dtype=np.int64), self.k,
+        )
+        self.loaded = True
+        self.refreshes += 1
+        self.refreshed_at = time.time()
+        self.refresh_seconds = time.perf_counter() - started
+
+    async def _refresh_periodically(self, session_factory: sessionmaker, interval: float) -> None:
+        while True:
+            try:
+                await self.refresh(session_factory)
+            except Exception:
+                logger.warning("Error refreshing related resources, lookups keep using the last result", exc_info=True)
+            await asyncio.sleep(interval)
+
+    async def start(self, session_factory: sessionmaker, interval: float) -> None:
+        self._refresher = asyncio.create_task(self._refresh_periodically(session_factory, interval))
+
+    async def stop(self) -> None:
+        if self._refresher is not None:
+            self._refresher.cancel()
+            self._refresher = None
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+    def stats(self) -> dict:
+        return {
+            "loaded": self.loaded,
+            "resources": len(self.ids),
+            "k": self.k,
+            "refreshes": self.refreshes,
+            "refreshed_at": self.refreshed_at,
+            "refresh_seconds": self.refresh_seconds,
+            "lookups": self.lookups,
+        }
+
+
+related_resources = RelatedResources(k=config.related_resources_k)
+
+
+def get_related_resources() -> RelatedResources:
+    return related_resources
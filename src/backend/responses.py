@@ -0,0 +1,33 @@
+from typing import Any, Callable
+
+import orjson
+from fastapi.encoders import jsonable_encoder
+from pydantic import TypeAdapter
+from starlette.responses import JSONResponse, Response
+
+JSON_MEDIA_TYPE = "application/json"
+
+
+class ORJSONResponse(JSONResponse):
+    """JSONResponse rendered by orjson, the default response class of the app"""
+
+    def render(self, content: Any) -> bytes:
+        return orjson.dumps(content, option=orjson.OPT_NON_STR_KEYS)
+
+
+def json_bytes_response(payload: bytes, headers: dict[str, str] | None = None) -> Response:
+    """Response of an already serialized JSON body, sent as is without validating or encoding it again"""
+    return Response(payload, media_type=JSON_MEDIA_TYPE, headers=headers)
+
+
+def json_serializer(return_type: Any) -> Callable[[Any], bytes]:
+    """
+    Serializes endpoint results straight to JSON bytes, the same document FastAPI sends for them
+
+    Results with a return annotation go through a pydantic TypeAdapter of it, which dumps the
+    models in pydantic-core without building intermediate dicts, anything else through orjson.
+    """
+    if return_type is None:
+        return lambda result: orjson.dumps(jsonable_encoder(result), option=orjson.OPT_NON_STR_KEYS)
+    adapter = TypeAdapter(return_type)
+    return adapter.dump_json
@@ -1,3 +1,6 @@
+import hashlib
+import time
+
 import jwt
 from jwt.exceptions import InvalidTokenError
 from typing import Annotated
@@ -12,13 +15,41 @@ from .config import config
 
 from src.schemas.token_schema import TokenData
 from src.schemas.user_schema import UserResponse
+from src.backend.cache import broadcast_eviction
 from src.backend.session import get_async_session
 from src.services.user_service import UserService
+from src.utils.cache_utils import TTLCache
 
 
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/auth/token")
 
+# Authenticated users keyed by the hash of their bearer token, so repeat calls skip jwt.decode and the user lookup
+principal_cache = TTLCache(maxsize=config.principal_cache_size, ttl=config.principal_cache_ttl)
+
+
+def _token_cache_key(token: str) -> str:
+    return hashlib.sha256(token.encode()).hexdigest()
+
+
+# Field of the cache eviction messages listing users whose cached principals are stale
+PRINCIPAL_EVICTION_FIELD = "principals"
+
+
+def evict_principals(user_emails: list[str]) -> int:
+    """Drops every token of the given users cached by this worker"""
+    stale_keys = [key for key, user in principal_cache.items() if user.email in user_emails]
+    for key in stale_keys:
+        principal_cache.pop(key)
+    return len(stale_keys)
+
+
+async def invalidate_principal(user_email: str) -> int:
+    """Drops every cached token of the given user in every worker, call it whenever the user's role or is_active changes"""
+    evicted = evict_principals([user_email])
+    await broadcast_eviction(PRINCIPAL_EVICTION_FIELD, [user_email])
+    return evicted
+
 
 # create access token for the user
 def create_access_token(data: dict, expires_delta: timedelta | None = None):
@@ -35,6 +66,11 @@ def create_access_token(data: dict, expires_delta: timedelta | None = None):
 
 
 async def get_current_user(token: Annotated[str, Depends(oauth2_scheme)], session: AsyncSession = Depends(get_async_session)) -> UserResponse:
+    cache_key = _token_cache_key(token)
+    cached_user = principal_cache.get(cache_key)
+    if cached_user is not None:
+        return cached_user
+
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
@@ -64,6 +100,10 @@ async def get_current_user(token: Annotated[str, Depends(oauth2_scheme)], sessio
     user = await UserService(session).get_user_with_email(token_data.user_email)
     if user is None:
         raise credentials_exception
+
+    # never serve a token from the cache past its own expiry
+    expires_in = payload.get("exp", time.time() + config.principal_cache_ttl) - time.time()
+    principal_cache.set(cache_key, user, ttl=min(config.principal_cache_ttl, expires_in))
     return user
 
 
@@ -81,4 +121,6 @@ async def get_current_contributor_or_admin_user(current_user: Annotated[UserResp
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="You do not have permission to access this resource",
-        )
\ No newline at end of file
+        )
+
+    return current_user
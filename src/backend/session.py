@@ -1,14 +1,81 @@
+import time
 from typing import AsyncIterator
 
-from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, create_async_engine
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
 from contextlib import asynccontextmanager
 
 
-from src.backend.config import config
+from src.backend.config import config, DatabaseConfig
+
+
+class InstrumentedQueuePool(AsyncAdaptedQueuePool):
+    """Queue pool that records how long callers wait to check out a connection"""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.checkouts = 0
+        self.total_wait_seconds = 0.0
+        self.max_wait_seconds = 0.0
+
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            return super()._do_get()
+        finally:
+            waited = time.perf_counter() - started
+            self.checkouts += 1
+            self.total_wait_seconds += waited
+            self.max_wait_seconds = max(self.max_wait_seconds, waited)
+
+
+def engine_options(database: DatabaseConfig) -> dict:
+    """Pool and driver keyword arguments for create_async_engine, derived from the database config"""
+    url = make_url(database.dsn)
+    if url.get_backend_name() == "sqlite":
+        # SQLite uses its own single connection pools that take none of the sizing arguments
+        return {}
+
+    options = {
+        "poolclass": InstrumentedQueuePool,
+        "pool_size": database.pool_size,
+        "max_overflow": database.max_overflow,
+        "pool_timeout": database.pool_timeout,
+        "pool_recycle": database.pool_recycle,
+        "pool_pre_ping": database.pool_pre_ping,
+    }
+    if url.get_driver_name() == "asyncpg":
+        options["connect_args"] = {
+            "statement_cache_size": database.statement_cache_size,
+            "prepared_statement_cache_size": database.statement_cache_size,
+        }
+    return options
+
+
+def pool_stats(engine: AsyncEngine) -> dict:
+    """Snapshot of the connection pool of the given engine"""
+    pool = engine.pool
+    stats = {"pool_class": type(pool).__name__, "status": pool.status()}
+    if isinstance(pool, QueuePool):
+        stats.update(
+            size=pool.size(),
+            checked_in=pool.checkedin(),
+            checked_out=pool.checkedout(),
+            overflow=pool.overflow(),
+        )
+    if isinstance(pool, InstrumentedQueuePool):
+        stats.update(
+            checkouts=pool.checkouts,
+            avg_wait_ms=round(pool.total_wait_seconds / pool.checkouts * 1000, 3) if pool.checkouts else 0.0,
+            max_wait_ms=round(pool.max_wait_seconds * 1000, 3),
+        )
+    return stats
+
 
 # 1) create engine
-engine = create_async_engine(config.database.dsn)
+engine = create_async_engine(config.database.dsn, **engine_options(config.database))
 
 # 2) create session factory
 
@@ -20,6 +87,11 @@ AsyncSessionFactory = sessionmaker(
     autocommit=False
 )
 
+def get_session_factory() -> sessionmaker:
+    """Session factory for handlers that outlive the request scoped session, e.g. streaming responses"""
+    return AsyncSessionFactory
+
+
 async def get_async_session()-> AsyncIterator[AsyncSession]:
     async with AsyncSessionFactory() as session:
         try:
@@ -0,0 +1,167 @@
+import asyncio
+import logging
+import time
+from array import array
+from bisect import bisect_left, bisect_right, insort
+from typing import Callable
+
+from sqlalchemy import select
+from sqlalchemy.orm import sessionmaker
+
+from src.backend.config import config
+from src.db.models import learning_resource_skill_association
+
+logger = logging.getLogger(__name__)
+
+# Association rows read per round trip while the index is built
+REBUILD_BATCH_SIZE = 10_000
+
+
+def _contains(postings: array, resource_id: int) -> bool:
+    position = bisect_left(postings, resource_id)
+    return position < len(postings) and postings[position] == resource_id
+
+
+class SkillResourceIndex:
+    """
+    In-memory inverted index from a skill id to the sorted ids of the resources teaching it
+
+    Resources of one skill are a slice of its array, resources of several skills walk the
+    shortest array and binary search the others, neither touches the database. The index is
+    built from learning_resource_skill_association and then changed in place by the writes of
+    this worker, while a periodic rebuild picks up the writes of other workers. Changes made
+    during a rebuild are replayed onto the rebuilt index, so none of them is lost. Rebuilds run
+    one at a time: one asked for meanwhile starts over once the current one is swapped in.
+    """
+
+    def __init__(self):
+        self._postings: dict[int, array] = {}
+        self._pending: list[tuple[Callable, tuple]] | None = None
+        self._rebuild_lock = asyncio.Lock()
+        self._refresher: asyncio.Task | None = None
+        self.loaded = False
+        self.rebuilds = 0
+        self.rebuilt_at: float | None = None
+        self.lookups = 0
+
+    # --- changes, applied now and again after a rebuild that is in progress ---
+
+    def _change(self, apply: Callable, *args) -> None:
+        apply(self._postings, *args)
+        if self._pending is not None:
+            self._pending.append((apply, args))
+
+    @staticmethod
+    def _add(postings: dict[int, array], skill_id: int, resource_id: int) -> None:
+        resources = postings.setdefault(skill_id, array("q"))
+        if not _contains(resources, resource_id):
+            insort(resources, resource_id)
+
+    @staticmethod
+    def _remove(postings: dict[int, array], skill_id: int, resource_id: int) -> None:
+        resources = postings.get(skill_id)
+        if resources is not None and _contains(resources, resource_id):
+            del resources[bisect_left(resources, resource_id)]
+
+    @staticmethod
+    def _drop_skill(postings: dict[int, array], skill_id: int) -> None:
+        postings.pop(skill_id, None)
+
+    @staticmethod
+    def _drop_resource(postings: dict[int, array], resource_id: int) -> None:
+        for resources in postings.values():
+            if _contains(resources, resource_id):
+                del resources[bisect_left(resources, resource_id)]
+
+    def add(self, skill_id: int, resource_id: int) -> None:
+        self._change(self._add, skill_id, resource_id)
+
+    def remove(self, skill_id: int, resource_id: int) -> None:
+        self._change(self._remove, skill_id, resource_id)
+
+    def drop_skill(self, skill_id: int) -> None:
+        self._change(self._drop_skill, skill_id)
+
+    def drop_resource(self, resource_id: int) -> None:
+        self._change(self._drop_resource, resource_id)
+
+    # --- lookups ---
+
+    def lookup(self, skill_ids: list[int], after: int | None, limit: int) -> list[int] | None:
+        """Ids above after of the resources teaching every skill, at most limit, None until the index is built"""
+        if not self.loaded:
+            return None
+        self.lookups += 1
+        postings = sorted((self._postings.get(skill_id, array("q")) for skill_id in set(skill_ids)), key=len)
+        shortest, others = postings[0], postings[1:]
+        start = bisect_right(shortest, after) if after is not None else 0
+        matches = []
+        for resource_id in shortest[start:]:
+            if all(_contains(resources, resource_id) for resources in others):
+                matches.append(resource_id)
+                if len(matches) == limit:
+                    break
+        return matches
+
+    # --- building ---
+
+    async def rebuild(self, session_factory: sessionmaker) -> None:
+        """Reads every association into a new index and swaps it in, with the changes made meanwhile replayed"""
+        # the bulk endpoint's rebuild can start during the periodic one, which must not share its pending changes
+        async with self._rebuild_lock:
+            self._pending = []
+            try:
+                postings: dict[int, array] = {}
+                async with session_factory() as session:
+                    result = await session.stream(
+                        select(learning_resource_skill_association.c.skill_id, learning_resource_skill_association.c.learning_resource_id)
+                        .order_by(learning_resource_skill_association.c.skill_id, learning_resource_skill_association.c.learning_resource_id)
+                        .execution_options(yield_per=REBUILD_BATCH_SIZE)
+                    )
+                    async for rows in result.partitions():
+                        for skill_id, resource_id in rows:
+                            # rows arrive sorted, so appending keeps every array sorted
+                            postings.setdefault(skill_id, array("q")).append(resource_id)
+
+                for apply, args in self._pending:
+                    apply(postings, *args)
+                self._postings = postings
+                self.loaded = True
+                self.rebuilds += 1
+                self.rebuilt_at = time.time()
+            finally:
+                self._pending = None
+
+    async def _rebuild_periodically(self, session_factory: sessionmaker, interval: float) -> None:
+        while True:
+            try:
+                await self.rebuild(session_factory)
+            except Exception:
+                logger.warning("Error rebuilding the skill index, lookups keep using the last one", exc_info=True)
+            await asyncio.sleep(interval)
+
+    async def start(self, session_factory: sessionmaker, interval: float) -> None:
+        self._refresher = asyncio.create_task(self._rebuild_periodically(session_factory, interval))
+
+    async def stop(self) -> None:
+        if self._refresher is not None:
+            self._refresher.cancel()
+            self._refresher = None
+
+    def stats(self) -> dict:
+        return {
+            "loaded": self.loaded,
+            "skills": len(self._postings),
+            "associations": sum(len(resources) for resources in self._postings.values()),
+            "rebuilds": self.rebuilds,
+            "rebuilt_at": self.rebuilt_at,
+            "lookups": self.lookups,
+        }
+
+
+skill_index = SkillResourceIndex()
+
+
+def get_skill_index() -> SkillResourceIndex | None:
+    """FastAPI dependency returning the skill index, None when disabled so lookups go to the database"""
+    return skill_index if config.skill_index_enabled else None
@@ -0,0 +1,103 @@
+import os
+import re
+import stat
+from mimetypes import guess_type
+from pathlib import Path
+
+import anyio
+from starlette.datastructures import Headers
+from starlette.responses import FileResponse, Response
+from starlette.staticfiles import NotModifiedResponse, StaticFiles
+from starlette.types import Scope
+
+from src.backend.compression import accepted_encodings, compress
+
+# Files named after the SHA-256 of their content, optionally with a thumbnail width, never change
+CONTENT_HASHED_NAME = re.compile(r"^[0-9a-f]{64}(_\d+)?\.[a-z0-9]+$")
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+# Formats worth compressing, images and video are compressed already
+COMPRESSIBLE_SUFFIXES = {".css", ".csv", ".html", ".js", ".json", ".map", ".md", ".svg", ".txt", ".xml"}
+# Precompressed siblings in order of preference, with the suffix they are stored under
+PRECOMPRESSED_ENCODINGS = (("br", ".br"), ("gzip", ".gz"))
+# Siblings are written once, so they get the strongest levels
+PRECOMPRESS_LEVELS = {"br": 11, "gzip": 9}
+
+
+class CachedStaticFiles(StaticFiles):
+    """
+    StaticFiles tuned for the resource images and other assets under /static
+
+    - Content addressed files (see CONTENT_HASHED_NAME) are sent with an immutable one year
+      Cache-Control, everything else may be cached for `max_age` seconds and is revalidated
+      with ETag / Last-Modified after that.
+    - Compressible assets are answered from a precompressed .br or .gz sibling when the client
+      accepts it (see precompress_directory), so nothing is compressed per request.
+    - Byte ranges and zero-copy sends come from FileResponse, which answers Range requests and
+      hands the file to the server through the http.response.pathsend extension where offered.
+    """
+
+    def __init__(self, *args, max_age: int = 3600, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.max_age = max_age
+
+    def cache_control(self, path: str) -> str:
+        if CONTENT_HASHED_NAME.match(os.path.basename(path)):
+            return IMMUTABLE_CACHE_CONTROL
+        return f"public, max-age={self.max_age}"
+
+    async def get_response(self, path: str, scope: Scope) -> Response:
+        if scope["method"] in ("GET", "HEAD") and Path(path).suffix.lower() in COMPRESSIBLE_SUFFIXES:
+            accepted = accepted_encodings(Headers(scope=scope).get("accept-encoding"))
+            for encoding, suffix in PRECOMPRESSED_ENCODINGS:
+                if encoding not in accepted:
+                    continue
+                full_path, stat_result = await anyio.to_thread.run_sync(self.lookup_path, path + suffix)
+                if stat_result and stat.S_ISREG(stat_result.st_mode):
+                    return self.encoded_file_response(path, full_path, stat_result, scope, encoding)
+        return await super().get_response(path, scope)
+
+    def file_response(self, full_path, stat_result: os.stat_result, scope: Scope, status_code: int = 200) -> Response:
+        return self.encoded_file_response(str(full_path), full_path, stat_result, scope, None, status_code)
+
+    def encoded_file_response(
+        self, path: str, full_path, stat_result: os.stat_result, scope: Scope, encoding: str | None, status_code: int = 200
+    ) -> Response:
+        response = FileResponse(full_path, status_code=status_code, stat_result=stat_result, media_type=guess_type(path)[0] or "text/plain")
+        response.headers["Cache-Control"] = self.cache_control(path)
+        if Path(path).suffix.lower() in COMPRESSIBLE_SUFFIXES:
+            response.headers["Vary"] = "Accept-Encoding"
+        if encoding is not None:
+            response.headers["Content-Encoding"] = encoding
+        if self.is_not_modified(response.headers, Headers(scope=scope)):
+            return NotModifiedResponse(response.headers)
+        return response
+
+
+def precompress_directory(directory: str | Path, min_size: int = 1024) -> int:
+    """
+    Writes .br and .gz siblings of the compressible files under directory, returns how many were written
+
+    Siblings newer than their source are kept, and a sibling that would not save at least a tenth
+    of the size is not written at all.
+    """
+    written = 0
+    for path in Path(directory).rglob("*"):
+        if path.suffix.lower() not in COMPRESSIBLE_SUFFIXES or not path.is_file():
+            continue
+        source_stat = path.stat()
+        if source_stat.st_size < min_size:
+            continue
+        data = None
+        for encoding, suffix in PRECOMPRESSED_ENCODINGS:
+            target = path.with_name(path.name + suffix)
+            if target.exists() and target.stat().st_mtime >= source_stat.st_mtime:
+                continue
+            data = data if data is not None else path.read_bytes()
+            compressed = compress(data, encoding, PRECOMPRESS_LEVELS[encoding])
+            if len(compressed) > len(data) * 0.9:
+                continue
+            temp = target.with_name(f".{target.name}.{os.getpid()}.part")
+            temp.write_bytes(compressed)
+            os.replace(temp, target)
+            written += 1
+    return written
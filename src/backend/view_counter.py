@@ -0,0 +1,156 @@
+import asyncio
+import logging
+import time
+import uuid
+from collections import Counter
+
+from redis import asyncio as aioredis
+from redis.asyncio import Redis
+from redis.exceptions import ResponseError
+from sqlalchemy.orm import sessionmaker
+
+from src.backend.config import config
+from src.services.view_service import ResourceViewService
+
+logger = logging.getLogger(__name__)
+
+# Buckets that were never flushed, e.g. because every worker was down, are dropped after a day
+BUCKET_TTL = 24 * 60 * 60
+
+
+class ViewCounter:
+    """
+    Aggregates resource views in per-minute buckets and writes them to the database in batches
+
+    With Redis every view is one HINCRBY on the bucket of the current minute, shared by all
+    workers. A flush atomically renames each bucket before reading it, so views recorded while
+    it runs land in a fresh bucket and every bucket is written by exactly one worker. Without
+    Redis the buckets are kept in the memory of the worker.
+
+    Views of a flush interrupted between the rename and the database commit are lost, a
+    trade-off accepted for an analytics counter.
+    """
+
+    def __init__(self, redis: Redis | None, prefix: str = "views"):
+        self.redis = redis
+        self.prefix = prefix
+        self._local: dict[int, Counter] = {}
+        self._flusher: asyncio.Task | None = None
+        self.recorded = 0
+        self.flushed = 0
+        self.flush_errors = 0
+
+    @property
+    def buckets_key(self) -> str:
+        return f"{self.prefix}:buckets"
+
+    def _bucket_key(self, minute: int) -> str:
+        return f"{self.prefix}:{minute}"
+
+    async def record(self, resource_id: int, count: int = 1) -> None:
+        minute = int(time.time() // 60)
+        self.recorded += count
+        if self.redis is None:
+            self._local.setdefault(minute, Counter())[resource_id] += count
+            return
+
+        key = self._bucket_key(minute)
+        async with self.redis.pipeline(transaction=False) as pipe:
+            pipe.hincrby(key, resource_id, count)
+            pipe.expire(key, BUCKET_TTL)
+            pipe.sadd(self.buckets_key, minute)
+            await pipe.execute()
+
+    async def _drain_redis(self) -> tuple[Counter, list[str]]:
+        """Takes over every bucket, returns the summed views and the renamed keys to delete once they are stored"""
+        counts: Counter = Counter()
+        taken = []
+        current_minute = int(time.time() // 60)
+        for minute in sorted(int(member) for member in await self.redis.smembers(self.buckets_key)):
+            flushing_key = f"{self.prefix}:flushing:{minute}:{uuid.uuid4().hex}"
+            try:
+                await self.redis.rename(self._bucket_key(minute), flushing_key)
+            except ResponseError:
+                # already taken by another worker; past minutes will not be written again
+                if minute < current_minute:
+                    await self.redis.srem(self.buckets_key, minute)
+                continue
+            if minute < current_minute:
+                await self.redis.srem(self.buckets_key, minute)
+            taken.append(flushing_key)
+            for resource_id, views in (await self.redis.hgetall(flushing_key)).items():
+                counts[int(resource_id)] += int(views)
+        return counts, taken
+
+    async def _restore(self, counts: Counter) -> None:
+        """Puts views whose flush failed back into the current bucket"""
+        if self.redis is None:
+            self._local.setdefault(int(time.time() // 60), Counter()).update(counts)
+            return
+        for resource_id, views in counts.items():
+            await self.record(resource_id, views)
+        self.recorded -= sum(counts.values())
+
+    async def flush(self, session_factory: sessionmaker) -> int:
+        """Adds the views aggregated so far to the resource view counts, returns the number of views written"""
+        if self.redis is None:
+            buckets, self._local = self._local, {}
+            counts = sum(buckets.values(), Counter())
+            taken = []
+        else:
+            counts, taken = await self._drain_redis()
+        if not counts:
+            return 0
+
+        try:
+            async with session_factory() as session:
+                await ResourceViewService(session).add_view_counts(counts)
+        except Exception:
+            self.flush_errors += 1
+            await self._restore(counts)
+            raise
+        finally:
+            if taken:
+                await self.redis.delete(*taken)
+
+        views = sum(counts.values())
+        self.flushed += views
+        return views
+
+    async def _flush_periodically(self, session_factory: sessionmaker, interval: float) -> None:
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                await self.flush(session_factory)
+            except Exception:
+                logger.warning("Error flushing resource views, they are retried with the next flush", exc_info=True)
+
+    async def start(self, session_factory: sessionmaker, interval: float) -> None:
+        self._flusher = asyncio.create_task(self._flush_periodically(session_factory, interval))
+
+    async def stop(self, session_factory: sessionmaker) -> None:
+        """Stops the periodic flush and writes what is still aggregated"""
+        if self._flusher is not None:
+            self._flusher.cancel()
+            self._flusher = None
+        try:
+            await self.flush(session_factory)
+        except Exception:
+            logger.warning("Error flushing resource views on shutdown", exc_info=True)
+
+    def stats(self) -> dict:
+        return {
+            "backend": "memory" if self.redis is None else "redis",
+            "recorded": self.recorded,
+            "flushed": self.flushed,
+            "flush_errors": self.flush_errors,
+            "flushing": self._flusher is not None and not self._flusher.done(),
+        }
+
+
+view_counter = ViewCounter(aioredis.from_url(config.REDIS_URL) if config.view_counter_backend == "redis" else None)
+
+
+def get_view_counter() -> ViewCounter:
+    """FastAPI dependency returning the view counter, overridden in tests"""
+    return view_counter
@@ -1,10 +1,11 @@
 # src/db/models.py
 
 from datetime import datetime
-from sqlalchemy import Column, Integer, String, Boolean, DateTime, ForeignKey, Table
+from sqlalchemy import Column, Integer, BigInteger, String, Boolean, DateTime, ForeignKey, Table, Index
 from sqlalchemy.orm import relationship, Mapped, mapped_column
 
 from .database import Base
+from .search_index import attach_search_index
 
 # Association table for many-to-many between LearningResource and Skills
 learning_resource_skill_association = Table(
@@ -12,6 +13,8 @@ learning_resource_skill_association = Table(
     Base.metadata,
     Column("learning_resource_id", ForeignKey("learning_resource.id"), primary_key=True),
     Column("skill_id", ForeignKey("skills.id"), primary_key=True),
+    # The primary key leads with the resource, this reverse index answers "resources teaching a skill"
+    Index("ix_learning_resource_skill_association_skill_id_resource_id", "skill_id", "learning_resource_id"),
 )
 
 class User(Base):
@@ -29,6 +32,14 @@ class User(Base):
 
 class LearningResource(Base):
     __tablename__ = "learning_resource"
+    __table_args__ = (
+        # Keyset pagination walks resources ordered by (created_at, id)
+        Index("ix_learning_resource_created_at_id", "created_at", "id"),
+        # The same walk within one type, difficulty or owner, the difficulty index also serves sorting by difficulty
+        Index("ix_learning_resource_resource_type_created_at_id", "resource_type", "created_at", "id"),
+        Index("ix_learning_resource_difficulty_created_at_id", "difficulty", "created_at", "id"),
+        Index("ix_learning_resource_user_id_created_at_id", "user_id", "created_at", "id"),
+    )
 
     id = Column(Integer, primary_key=True, index=True, autoincrement=True)
     title = Column(String, index=True, nullable=False)
@@ -36,7 +47,9 @@ class LearningResource(Base):
     url = Column(String, nullable=True)
     resource_type = Column(String, nullable=False)
     difficulty = Column(Integer, default=1)
-    created_at = Column(DateTime, nullable=False, default=datetime.now())
+    created_at = Column(DateTime, nullable=False, default=datetime.now)
+    # bumped on every change, the Last-Modified of the resource
+    updated_at = Column(DateTime, nullable=False, default=datetime.now, onupdate=datetime.now)
     image_path = Column(String, nullable=True)
     user_id = Column(Integer, ForeignKey("user.id"))
 
@@ -47,16 +60,47 @@ class LearningResource(Base):
     )
 
 
+# Full-text search over title and description, see src/db/search_index.py
+attach_search_index(LearningResource.__table__)
+
+
 class Skills(Base):
     __tablename__ = "skills"
 
     id = Column(Integer, primary_key=True, index=True, autoincrement=True)
-    title = Column(String, index=True, nullable=False)
+    # one skill per title, so concurrent writers creating it upsert the same row
+    title = Column(String, index=True, unique=True, nullable=False)
     created_at = Column(DateTime, nullable=False, default=datetime.now())
+    updated_at = Column(DateTime, nullable=False, default=datetime.now, onupdate=datetime.now)
     user_id = Column(Integer, ForeignKey("user.id")) # Skill can be created by a user
 
     user = relationship("User", back_populates="skills")
     # Many-to-many relationship with LearningResource through the association table
     learning_resources = relationship(
         "LearningResource", secondary=learning_resource_skill_association, back_populates="skills"
-    )
\ No newline at end of file
+    )
+
+
+class ResourceViewCount(Base):
+    """Running view total of a learning resource, maintained by the batched flushes of the view counter"""
+    __tablename__ = "resource_view_count"
+    __table_args__ = (
+        # "most viewed" reads the top of this index instead of sorting every row
+        Index("ix_resource_view_count_view_count", "view_count"),
+    )
+
+    resource_id = Column(Integer, ForeignKey("learning_resource.id", ondelete="CASCADE"), primary_key=True)
+    view_count = Column(BigInteger, nullable=False, default=0)
+
+
+class ImageBlob(Base):
+    """An image file stored once under its SHA-256, shared by every resource with the same image"""
+    __tablename__ = "image_blob"
+
+    sha256 = Column(String(64), primary_key=True)
+    url = Column(String, nullable=False, unique=True)
+    content_type = Column(String, nullable=False)
+    size = Column(BigInteger, nullable=False)
+    # resources whose image_path points at url, the file is collected once it drops to 0
+    ref_count = Column(Integer, nullable=False, default=0)
+    created_at = Column(DateTime, nullable=False, default=datetime.now)
@@ -0,0 +1,55 @@
+# src/db/search_index.py
+
+from sqlalchemy import DDL, Table, event
+
+# Postgres: a stored tsvector generated from title (weight A) and description (weight B) under a
+# GIN index, plus a trigram index on title for misspelled and partial words. Generated columns are
+# recomputed by every INSERT, UPDATE and COPY, so the index never needs a rebuild.
+POSTGRES_SEARCH_DDL = [
+    "CREATE EXTENSION IF NOT EXISTS pg_trgm",
+    """
+    ALTER TABLE learning_resource ADD COLUMN IF NOT EXISTS search_vector tsvector
+    GENERATED ALWAYS AS (
+        setweight(to_tsvector('english', coalesce(title, '')), 'A') ||
+        setweight(to_tsvector('english', coalesce(description, '')), 'B')
+    ) STORED
+    """,
+    "CREATE INDEX IF NOT EXISTS ix_learning_resource_search_vector ON learning_resource USING gin (search_vector)",
+    "CREATE INDEX IF NOT EXISTS ix_learning_resource_title_trgm ON learning_resource USING gin (title gin_trgm_ops)",
+]
+
+# SQLite: an external content FTS5 table over the same columns, kept in step by triggers
+SQLITE_SEARCH_DDL = [
+    """
+    CREATE VIRTUAL TABLE IF NOT EXISTS learning_resource_fts USING fts5(
+        title, description, content='learning_resource', content_rowid='id', tokenize='porter unicode61'
+    )
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS learning_resource_fts_insert AFTER INSERT ON learning_resource BEGIN
+        INSERT INTO learning_resource_fts(rowid, title, description) VALUES (new.id, new.title, new.description);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS learning_resource_fts_delete AFTER DELETE ON learning_resource BEGIN
+        INSERT INTO learning_resource_fts(learning_resource_fts, rowid, title, description) VALUES ('delete', old.id, old.title, old.description);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS learning_resource_fts_update AFTER UPDATE OF title, description ON learning_resource BEGIN
+        INSERT INTO learning_resource_fts(learning_resource_fts, rowid, title, description) VALUES ('delete', old.id, old.title, old.description);
+        INSERT INTO learning_resource_fts(rowid, title, description) VALUES (new.id, new.title, new.description);
+    END
+    """,
+]
+SQLITE_DROP_SEARCH_DDL = ["DROP TABLE IF EXISTS learning_resource_fts"]
+
+
+def attach_search_index(table: Table) -> None:
+    """Creates the full-text index of the dialect together with the learning_resource table"""
+    for statement in POSTGRES_SEARCH_DDL:
+        event.listen(table, "after_create", DDL(statement).execute_if(dialect="postgresql"))
+    for statement in SQLITE_SEARCH_DDL:
+        event.listen(table, "after_create", DDL(statement).execute_if(dialect="sqlite"))
+    for statement in SQLITE_DROP_SEARCH_DDL:
+        event.listen(table, "before_drop", DDL(statement).execute_if(dialect="sqlite"))
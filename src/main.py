@@ -1,21 +1,34 @@
+import asyncio
 from contextlib import asynccontextmanager
 
 from fastapi import FastAPI
-from fastapi.staticfiles import StaticFiles
 
 from fastapi_cache import FastAPICache
 from fastapi_cache.backends.redis import RedisBackend
 
 from redis import asyncio as aioredis
 
-from src.backend.session import engine
+from src.backend.session import engine, AsyncSessionFactory
 from src.db.database import Base
 from src.backend.config import config
+from src.backend.cache import TwoTierBackend
+from src.backend.security import PRINCIPAL_EVICTION_FIELD, evict_principals
+from src.backend.job_queue import job_queue
+from src.backend.view_counter import view_counter
+from src.backend.skill_index import skill_index
+from src.backend.learning_path import learning_path_graph
+from src.backend.related_resources import related_resources
+from src.backend.compression import CompressionMiddleware
+from src.backend.responses import ORJSONResponse
+from src.backend.static_files import CachedStaticFiles, precompress_directory
+from src.utils.auth_utils import password_hashing_pool
+from src.utils.image_variant_utils import image_variant_pool
 
 from .routers.resource_router import resource_router
 from .routers.auth_router import auth_router
 from .routers.skill_router import skill_router
 from .routers.user_router import user_router
+from .routers.metrics_router import metrics_router
 
 @asynccontextmanager
 async def lifespan(app:FastAPI):
@@ -23,24 +36,53 @@ async def lifespan(app:FastAPI):
     print("Initializing database....")
     async with engine.begin() as conn:
         await conn.run_sync(Base.metadata.create_all)
-        print("Database initialized")
+    print("Database initialized")
 
-        redis_client = aioredis.from_url(config.REDIS_URL, encoding="utf8", decode_responses=True)
-        FastAPICache.init(RedisBackend(redis_client), prefix="fastapi-cache")
-        print("FastAPI-Cache initialized with Redis.")
+    # @cached stores response bodies as raw bytes, so the client must not decode responses
+    redis_client = aioredis.from_url(config.REDIS_URL)
+    if config.cache_l1_size > 0:
+        cache_backend = TwoTierBackend(redis_client, maxsize=config.cache_l1_size, ttl=config.cache_l1_ttl)
+        # role and is_active changes made on another worker evict the principals cached here
+        cache_backend.on_eviction(PRINCIPAL_EVICTION_FIELD, evict_principals)
+        await cache_backend.start()
+    else:
+        cache_backend = RedisBackend(redis_client)
+    FastAPICache.init(cache_backend, prefix="fastapi-cache")
+    print("FastAPI-Cache initialized with Redis.")
 
-        yield
-    
-        print("Application shutdown")
+    await view_counter.start(AsyncSessionFactory, interval=config.view_flush_interval)
+    if config.skill_index_enabled:
+        await skill_index.start(AsyncSessionFactory, interval=config.skill_index_refresh_interval)
+    # the graph is loaded by the first path request, then rebuilt periodically
+    await learning_path_graph.start(AsyncSessionFactory, interval=config.learning_path_refresh_interval)
+    await related_resources.start(AsyncSessionFactory, interval=config.related_resources_refresh_interval)
+    written = await asyncio.to_thread(precompress_directory, "static", config.static_precompress_min_size)
+    print(f"Precompressed {written} static files.")
 
-app: FastAPI = FastAPI(lifespan=lifespan, title="Learning Path API", version="0.1.1")
+    yield
 
-app.mount("/static", StaticFiles(directory="static"), name="static")
+    print("Application shutdown")
+    await view_counter.stop(AsyncSessionFactory)
+    await skill_index.stop()
+    await learning_path_graph.stop()
+    await related_resources.stop()
+    if isinstance(cache_backend, TwoTierBackend):
+        await cache_backend.stop()
+    password_hashing_pool.shutdown()
+    image_variant_pool.shutdown()
+    await job_queue.close()
+
+app: FastAPI = FastAPI(lifespan=lifespan, title="Learning Path API", version="0.1.1", default_response_class=ORJSONResponse)
+
+app.add_middleware(CompressionMiddleware, minimum_size=config.compression_min_size)
+
+app.mount("/static", CachedStaticFiles(directory="static", max_age=config.static_max_age), name="static")
 
 app.include_router(resource_router)
 app.include_router(auth_router)
 app.include_router(skill_router)
 app.include_router(user_router)
+app.include_router(metrics_router)
 
 @app.get('/status')
 def get_fastapi_status():
@@ -1,6 +1,8 @@
 from datetime import timedelta
 
-from fastapi import APIRouter, Depends, status, HTTPException, Form, BackgroundTasks
+import logging
+
+from fastapi import APIRouter, Depends, status, HTTPException, Form
 from fastapi.security import OAuth2PasswordRequestForm
 
 from sqlalchemy.ext.asyncio import AsyncSession
@@ -11,7 +13,10 @@ from src.backend.session import get_async_session
 from src.backend.config import config
 from src.backend.security import create_access_token
 from src.services.user_service import UserService
-from src.tasks import send_email_notification
+from src.backend.job_queue import JobQueue, get_job_queue
+from src.utils.auth_utils import PasswordHashingBusy
+
+logger = logging.getLogger(__name__)
 
 auth_router = APIRouter(prefix="/auth", tags=["Authentication"])
 
@@ -35,14 +40,20 @@ async def get_users(session: AsyncSession = Depends(get_async_session)):
 
 
 @auth_router.post("/register", status_code=status.HTTP_201_CREATED, description="Register new users")
-async def register_user(user: UserCreate, background_tasks: BackgroundTasks, session:AsyncSession = Depends(get_async_session)):
+async def register_user(user: UserCreate, session:AsyncSession = Depends(get_async_session), job_queue: JobQueue = Depends(get_job_queue)):
     """FastAPI endpoint to register user"""
     try:
         user = await UserService(session).create_new_user(user)
         if user == "User already exists":
             return {"message": "User already exists", "status": 400}
-        background_tasks.add_task(send_email_notification, user.email, "Welcome to our platform", "Thank you for registering")
+        try:
+            await job_queue.enqueue("send_email_notification", recipient=user.email, subject="Welcome to our platform", body="Thank you for registering")
+        except Exception:
+            # the account exists either way, a lost welcome email must not fail the registration
+            logger.warning("Error enqueueing the welcome email of %s", user.email, exc_info=True)
         return {"message": "User Created", "status": 201}
+    except PasswordHashingBusy as e:
+        raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail=str(e), headers={"Retry-After": "1"})
     except Exception as e:
         raise ValueError(f"Error while creating user: {e}")
     
@@ -54,10 +65,13 @@ async def access_token(
     session: AsyncSession = Depends(get_async_session)
 ):
 
-    user = await UserService(session).authenticate_user(
-        form_data.username,  # Use 'username' field instead of 'email'
-        form_data.password
-    )
+    try:
+        user = await UserService(session).authenticate_user(
+            form_data.username,  # Use 'username' field instead of 'email'
+            form_data.password
+        )
+    except PasswordHashingBusy as e:
+        raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail=str(e), headers={"Retry-After": "1"})
     if user is None:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
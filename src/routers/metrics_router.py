@@ -0,0 +1,35 @@
+from fastapi import APIRouter, status
+
+from src.backend.cache import cache_stats
+from src.backend.job_queue import job_queue
+from src.backend.view_counter import view_counter
+from src.backend.skill_index import skill_index
+from src.backend.learning_path import learning_path_graph
+from src.backend.related_resources import related_resources
+from src.backend.security import principal_cache
+from src.backend.session import engine, pool_stats
+from src.utils.auth_utils import password_hashing_pool
+from src.utils.image_variant_utils import image_variant_pool
+
+metrics_router: APIRouter = APIRouter(prefix="/metrics", tags=["Metrics"])
+
+
+@metrics_router.get("/", status_code=status.HTTP_200_OK, description="Runtime metrics of the worker process")
+async def get_metrics():
+    """FastAPI endpoint to expose pool and queue statistics of this worker"""
+    try:
+        jobs = await job_queue.stats()
+    except Exception as e:
+        jobs = {"error": str(e)}
+    return {
+        "database_pool": pool_stats(engine),
+        "password_hashing": password_hashing_pool.stats(),
+        "principal_cache": principal_cache.stats(),
+        "response_cache": cache_stats(),
+        "job_queue": jobs,
+        "view_counter": view_counter.stats(),
+        "skill_index": skill_index.stats(),
+        "learning_path": learning_path_graph.stats(),
+        "related_resources": related_resources.stats(),
+        "image_variants": image_variant_pool.stats(),
+    }
@@ -1,20 +1,43 @@
-from uuid import uuid4
-import shutil 
-from pathlib import Path
-from fastapi import APIRouter, Depends, HTTPException, status, BackgroundTasks, UploadFile, File
-from fastapi_cache.decorator import cache
-from fastapi_cache import FastAPICache
-from fastapi_cache.key_builder import default_key_builder
+import asyncio
+from datetime import datetime
+from typing import AsyncIterator
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, status, UploadFile, File, Query, Request
+from pydantic import ValidationError
+from fastapi.responses import StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import sessionmaker
 
-from src.schemas.learning_resource_schema import LearningResourceCreate, LearningResource as ILearningResource
+from src.schemas.learning_resource_schema import (
+    LearningResourceCreate,
+    LearningResource as ILearningResource,
+    LearningResourcePage,
+    LearningResourceSearchPage,
+    LearningResourceType,
+    LearningResourceFilters,
+    LearningResourceSort,
+    LearningResourceBulkCreate,
+    BulkCreateResult,
+    BulkRowError,
+    ResourceViews,
+    RelatedLearningResource,
+)
 from src.db.models import LearningResource
 from src.schemas.user_schema import User
-from src.schemas.skills_schema import SkillCreate
-from src.backend.session import get_async_session
+from src.schemas.skills_schema import SkillCreate, ResourceSkillsUpdate, ResourceSkillsResult
+from src.backend.session import get_async_session, get_session_factory
+from src.backend.config import config
+from src.backend.cache import cached, invalidate_cache_tags, latest_updated_at, resource_tag, skill_tag, RESOURCE_LIST_TAG, RESOURCE_LIST_TAIL_TAG, SKILL_LIST_TAG
 from src.backend.security import get_current_contributor_or_admin_user, get_current_admin_user
 from src.services.resource_service import LearningResourceService
-from src.tasks import log_resource_view
+from src.services.image_service import render_image_variants
+from src.backend.view_counter import ViewCounter, get_view_counter
+from src.backend.skill_index import SkillResourceIndex, get_skill_index
+from src.backend.learning_path import LearningPathGraph, get_learning_path_graph
+from src.backend.related_resources import RelatedResources, get_related_resources
+from src.services.view_service import ResourceViewService
+from src.utils.pagination_utils import decode_cursor
+from src.utils.bulk_utils import read_bulk_rows, NDJSON_MEDIA_TYPE
+from src.utils.image_utils import save_image_stream, upload_chunks, InvalidImage, ImageTooLarge, RESOURCE_IMAGES_DIR
 
 import logging
 logging.basicConfig()
@@ -22,42 +45,202 @@ logging.getLogger('sqlalchemy.engine').setLevel(logging.INFO)
 
 resource_router: APIRouter = APIRouter(prefix="/resources", tags=["Learning Resource"])
 
-async def get_resource_by_id_key_builder(
-    func,
-    *args,
-    **kwargs,
-):
-    resource_id = kwargs.get("resource_id")
-    if resource_id is None:
-        return default_key_builder(func, *args, **kwargs)
+def get_resource_by_id_key_builder(kwargs: dict) -> str:
+    return f"resources:resource_id={kwargs['resource_id']}"
+
+
+def get_resource_filters(
+    resource_type: LearningResourceType | None = Query(None, description="Only resources of this type"),
+    difficulty: int | None = Query(None, ge=1, le=5, description="Only resources of this difficulty"),
+    user_id: int | None = Query(None, description="Only resources created by this user"),
+    created_after: datetime | None = Query(None, description="Only resources created at or after this time"),
+    created_before: datetime | None = Query(None, description="Only resources created before this time"),
+) -> LearningResourceFilters:
+    return LearningResourceFilters(
+        resource_type=resource_type, difficulty=difficulty, user_id=user_id, created_after=created_after, created_before=created_before
+    )
+
+
+def is_default_listing(kwargs: dict) -> bool:
+    """The unfiltered listing oldest first, where new resources can only land on the last page"""
+    return kwargs["sort"] == LearningResourceSort.oldest and not kwargs["filters"].model_dump(exclude_none=True)
+
+
+def get_resources_key_builder(kwargs: dict) -> str:
+    key = f"resources:list:limit={kwargs['limit']}:cursor={kwargs['cursor'] or ''}"
+    if is_default_listing(kwargs):
+        return key
+    options = sorted(kwargs["filters"].model_dump(mode="json", exclude_none=True).items())
+    return ":".join([key, f"sort={kwargs['sort'].value}", *(f"{name}={value}" for name, value in options)])
+
+
+def resource_tags(resource: ILearningResource) -> set[str]:
+    """A cached resource goes stale when the resource itself or any of its skills change"""
+    return {resource_tag(resource.id), *(skill_tag(skill.id) for skill in resource.skills or [])}
+
+
+def get_resource_by_id_tags(kwargs: dict, resource: ILearningResource) -> set[str]:
+    return resource_tags(resource)
 
-    return f"{func.__module__}:{func.__name__}:resource_id={resource_id}"
 
+def get_resources_tags(kwargs: dict, page: LearningResourcePage) -> set[str]:
+    tags = set().union(*(resource_tags(resource) for resource in page.items))
+    if not is_default_listing(kwargs):
+        tags.add(RESOURCE_LIST_TAG)
+    elif page.next_cursor is None:
+        tags.add(RESOURCE_LIST_TAIL_TAG)
+    return tags
+
+
+@resource_router.get("/", status_code=status.HTTP_200_OK, description="Get a page of Learning Resources")
+@cached(expire=60, key_builder=get_resources_key_builder, tags=get_resources_tags, stale_ttl=config.cache_stale_ttl)
+async def get_resources(
+    filters: LearningResourceFilters = Depends(get_resource_filters),
+    sort: LearningResourceSort = Query(LearningResourceSort.oldest, description="Order of the listing, a leading - for descending"),
+    limit: int = Query(config.resource_page_size, ge=1, le=config.resource_page_max_size),
+    cursor: str | None = Query(None, description="next_cursor returned by the previous page"),
+    session: AsyncSession = Depends(get_async_session)
+)-> LearningResourcePage:
+    """FastAPI endpoint to get resources page by page, filtered and sorted"""
+    try:
+        after = decode_cursor(cursor) if cursor else None
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    if after is not None and after[2] is None and sort in (LearningResourceSort.easiest, LearningResourceSort.hardest):
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=f"Cursor was not issued for sort={sort.value}")
 
-@resource_router.get("/", status_code=status.HTTP_200_OK, description="Get All Learning Resources")
-@cache(expire=60)
-async def get_resources(session: AsyncSession = Depends(get_async_session))-> list[ILearningResource]:
-    """FastAPI endpoint to get all resources"""
     try:
-        resources = await LearningResourceService(session).get_all_resources()
-        return resources
+        page = await LearningResourceService(session).get_resources_page(limit, after, filters, sort)
+        return page
     except Exception as e:
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=f"Error getting resources: {str(e)}")
-    
+
+
+@resource_router.get("/stream", status_code=status.HTTP_200_OK, description="Stream all Learning Resources as NDJSON")
+async def stream_resources(session_factory: sessionmaker = Depends(get_session_factory)):
+    """FastAPI endpoint to stream every resource, one JSON document per line"""
+    async def ndjson_lines():
+        # The request scoped session is closed before the body is sent, so the stream owns its session
+        async with session_factory() as session:
+            async for resource in LearningResourceService(session).stream_resources():
+                yield resource.model_dump_json() + "\n"
+
+    return StreamingResponse(ndjson_lines(), media_type="application/x-ndjson")
+
+
+def get_most_viewed_key_builder(kwargs: dict) -> str:
+    return f"resources:most_viewed:limit={kwargs['limit']}"
+
+
+@resource_router.get("/most_viewed", status_code=status.HTTP_200_OK, description="Get the most viewed Learning Resources")
+# counts only change when the view counter flushes, so the ranking is cached for one flush interval
+@cached(expire=int(config.view_flush_interval), key_builder=get_most_viewed_key_builder)
+async def get_most_viewed_resources(
+    limit: int = Query(10, ge=1, le=100),
+    session: AsyncSession = Depends(get_async_session)
+) -> list[ResourceViews]:
+    """FastAPI endpoint to get the resources with the highest view counts"""
+    try:
+        return await ResourceViewService(session).get_most_viewed(limit)
+    except Exception as e:
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=f"Error getting most viewed resources: {str(e)}")
+
+
+@resource_router.get("/search", status_code=status.HTTP_200_OK, description="Search Learning Resources by title and description")
+async def search_resources(
+    q: str = Query(..., min_length=1, max_length=200, description="Words to look for, each also matching longer words it starts"),
+    resource_type: LearningResourceType | None = Query(None),
+    difficulty: int | None = Query(None, ge=1, le=5),
+    skill_id: int | None = Query(None, description="Only resources teaching this skill"),
+    limit: int = Query(config.resource_page_size, ge=1, le=config.resource_page_max_size),
+    offset: int = Query(0, ge=0, description="next_offset returned by the previous page"),
+    session: AsyncSession = Depends(get_async_session)
+) -> LearningResourceSearchPage:
+    """FastAPI endpoint to get one page of the resources matching a query, best match first"""
+    try:
+        return await LearningResourceService(session).search_resources(
+            q, limit, offset,
+            resource_type=resource_type.value if resource_type is not None else None,
+            difficulty=difficulty,
+            skill_id=skill_id,
+        )
+    except Exception as e:
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=f"Error searching resources: {str(e)}")
+
 
 @resource_router.post("/create", status_code=status.HTTP_201_CREATED, description="Creates a learning resource")
 async def create_resource(resource_data: LearningResourceCreate, session: AsyncSession = Depends(get_async_session), current_user: User = Depends(get_current_contributor_or_admin_user)):
     """FastAPI endpoint to create a learning resource"""
     try:
         await LearningResourceService(session).create_new_resource(resource_data)
-        await FastAPICache.clear(namespace="fastapi-cache")
+        # new resources sort last, so only the tail page of the default listing changes
+        await invalidate_cache_tags(RESOURCE_LIST_TAIL_TAG, RESOURCE_LIST_TAG)
         return {"message": "Learning Resource Created", "status": 201}
     except Exception as e:
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=f"Error creating resource: {str(e)}")
         
 
+@resource_router.post(
+    "/bulk",
+    status_code=status.HTTP_201_CREATED,
+    description="Creates learning resources from a JSON array or an NDJSON stream",
+    openapi_extra={
+        "requestBody": {
+            "required": True,
+            "content": {
+                "application/json": {"schema": {"type": "array", "items": LearningResourceBulkCreate.model_json_schema()}},
+                NDJSON_MEDIA_TYPE: {"schema": LearningResourceBulkCreate.model_json_schema()},
+            },
+        }
+    },
+)
+async def bulk_create_resources(
+    request: Request,
+    background_tasks: BackgroundTasks,
+    batch_size: int = Query(config.bulk_batch_size, ge=1, le=10_000),
+    use_copy: bool = Query(False, description="Load rows with COPY on Postgres"),
+    session: AsyncSession = Depends(get_async_session),
+    session_factory: sessionmaker = Depends(get_session_factory),
+    skill_index: SkillResourceIndex | None = Depends(get_skill_index),
+    graph: LearningPathGraph = Depends(get_learning_path_graph),
+    current_user: User = Depends(get_current_contributor_or_admin_user)
+) -> BulkCreateResult:
+    """FastAPI endpoint to create many learning resources in batches"""
+    errors: list[BulkRowError] = []
+
+    async def valid_resources():
+        async for index, row, error in read_bulk_rows(request):
+            if error is not None:
+                errors.append(BulkRowError(index=index, error=error))
+                continue
+            try:
+                yield LearningResourceBulkCreate.model_validate(row)
+            except ValidationError as e:
+                errors.append(BulkRowError(index=index, error=str(e)))
+
+    try:
+        created = await LearningResourceService(session).bulk_create_resources(
+            valid_resources(), batch_size, user_id=current_user.id if current_user else None, use_copy=use_copy
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=f"Error creating resources: {str(e)}")
+
+    # one invalidation for the whole load, new resources only ever land on the tail page
+    if created:
+        # rows may have brought new skills along
+        await invalidate_cache_tags(RESOURCE_LIST_TAIL_TAG, RESOURCE_LIST_TAG, SKILL_LIST_TAG)
+        # one rebuild of the skill index is cheaper than replaying a whole load of associations
+        if skill_index is not None:
+            background_tasks.add_task(skill_index.rebuild, session_factory)
+        if graph.loaded:
+            background_tasks.add_task(graph.rebuild, session_factory)
+    return BulkCreateResult(created=created, failed=len(errors), errors=errors)
+
+
 @resource_router.get('/{resource_id}', status_code=status.HTTP_200_OK, description="Get learning resource of a given ID")
-@cache(expire=60, key_builder = get_resource_by_id_key_builder)
+@cached(expire=60, key_builder=get_resource_by_id_key_builder, tags=get_resource_by_id_tags, stale_ttl=config.cache_stale_ttl, last_modified=latest_updated_at)
 async def get_resource_by_id(resource_id: int, session: AsyncSession = Depends(get_async_session), current_user: User = Depends(get_current_contributor_or_admin_user) )->ILearningResource:
     """FastAPI endpoint to get a resource by ID"""
     try:
@@ -65,55 +248,133 @@ async def get_resource_by_id(resource_id: int, session: AsyncSession = Depends(g
         if resource is None:
             raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Resource not found")
         return resource
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=f"Error getting resource: {str(e)}")
 
 
+def get_related_resources_key_builder(kwargs: dict) -> str:
+    return f"resources:related:resource_id={kwargs['resource_id']}:limit={kwargs['limit']}"
+
+
+def get_related_resources_tags(kwargs: dict, related: list[RelatedLearningResource]) -> set[str]:
+    return {resource_tag(kwargs["resource_id"]), *(resource_tag(item.resource.id) for item in related)}
+
+
+@resource_router.get('/{resource_id}/related', status_code=status.HTTP_200_OK, description="Get the learning resources sharing the most skills with a resource")
+# neighbours only change when they are recomputed, the resources they embed are tagged
+@cached(expire=int(config.related_resources_refresh_interval), key_builder=get_related_resources_key_builder, tags=get_related_resources_tags, stale_ttl=config.cache_stale_ttl)
+async def get_related_resources_of_resource(
+    resource_id: int,
+    limit: int = Query(10, ge=1, le=config.related_resources_k),
+    session: AsyncSession = Depends(get_async_session),
+    related: RelatedResources = Depends(get_related_resources),
+) -> list[RelatedLearningResource]:
+    """FastAPI endpoint to get the resources most similar to a resource, best first"""
+    try:
+        items = await LearningResourceService(session).get_related_resources(resource_id, limit, related)
+        if not items and await session.get(LearningResource, resource_id) is None:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Resource not found")
+        return items
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=f"Error getting related resources: {str(e)}")
+
+
 @resource_router.put('/{resource_id}/update', status_code=status.HTTP_200_OK, description="Update a learning resource")
-async def update_resource(resource_id: int, new_resource_data: LearningResourceCreate, session: AsyncSession = Depends(get_async_session), current_user: User = Depends(get_current_contributor_or_admin_user)):
+async def update_resource(resource_id: int, new_resource_data: LearningResourceCreate, session: AsyncSession = Depends(get_async_session), graph: LearningPathGraph = Depends(get_learning_path_graph), current_user: User = Depends(get_current_contributor_or_admin_user)):
     """FastAPI endpoint to update a resource"""
     try:
         resource = await LearningResourceService(session).update_resource(resource_id, new_resource_data)
         if resource is None:
             raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Resource not found")
-        await FastAPICache.clear(namespace="fastapi-cache")
+        graph.mark_stale(resource_id)
+        # a new type or difficulty moves the resource into other filtered listings
+        await invalidate_cache_tags(resource_tag(resource_id), RESOURCE_LIST_TAG)
         return resource
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=f"Error updating resource: {str(e)}")    
 
 
 @resource_router.delete('/{resource_id}/delete', status_code=status.HTTP_200_OK, description="Delete a learning resource record")
-async def delete_resource(resource_id: int, session: AsyncSession = Depends(get_async_session), current_user: User = Depends(get_current_contributor_or_admin_user)):
+async def delete_resource(resource_id: int, session: AsyncSession = Depends(get_async_session), skill_index: SkillResourceIndex | None = Depends(get_skill_index), graph: LearningPathGraph = Depends(get_learning_path_graph), current_user: User = Depends(get_current_contributor_or_admin_user)):
     """FastAPI endpoint to delete a resource by ID"""
     try:
         resource = await LearningResourceService(session).delete_resource(resource_id)
         if resource is None:
             raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Resource not found")
-        await FastAPICache.clear(namespace="fastapi-cache")
+        if skill_index is not None:
+            skill_index.drop_resource(resource_id)
+        graph.mark_stale(resource_id)
+        await invalidate_cache_tags(resource_tag(resource_id))
         return {"message": "Learning Resource Deleted", "status": 200}
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=f"Error deleting resource: {str(e)}")
     
 
 @resource_router.delete('/{resource_id}/admin/delete', status_code=status.HTTP_200_OK, description="Delete a learning resource record")
-async def delete_admin_resource(resource_id: int, session: AsyncSession = Depends(get_async_session), current_user: User = Depends(get_current_admin_user)):
+async def delete_admin_resource(resource_id: int, session: AsyncSession = Depends(get_async_session), skill_index: SkillResourceIndex | None = Depends(get_skill_index), graph: LearningPathGraph = Depends(get_learning_path_graph), current_user: User = Depends(get_current_admin_user)):
     """FastAPI endpoint to delete a resource by ID"""
     try:
         resource = await LearningResourceService(session).delete_resource(resource_id)
         if resource is None:
             raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Resource not found")
-        await FastAPICache.clear(namespace="fastapi-cache")
+        if skill_index is not None:
+            skill_index.drop_resource(resource_id)
+        graph.mark_stale(resource_id)
+        await invalidate_cache_tags(resource_tag(resource_id))
         return {"message": "Learning Resource Deleted", "status": 200}
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=f"Error deleting resource: {str(e)}")
     
 
+@resource_router.put("/{resource_id}/skills", status_code=status.HTTP_200_OK, description="Set the skills of a learning resource, attaching and detaching in bulk")
+async def set_resource_skills(
+    resource_id: int,
+    update: ResourceSkillsUpdate,
+    session: AsyncSession = Depends(get_async_session),
+    skill_index: SkillResourceIndex | None = Depends(get_skill_index),
+    graph: LearningPathGraph = Depends(get_learning_path_graph),
+    current_user: User = Depends(get_current_contributor_or_admin_user)
+) -> ResourceSkillsResult:
+    """FastAPI endpoint to make the given skill ids and titles the exact skills of a resource"""
+    try:
+        result = await LearningResourceService(session).set_resource_skills(resource_id, update, user_id=current_user.id if current_user else None)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=f"Error setting resource skills: {str(e)}")
+    if result is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Resource not found")
+
+    if result.added or result.removed:
+        if skill_index is not None:
+            for skill_id in result.added:
+                skill_index.add(skill_id, resource_id)
+            for skill_id in result.removed:
+                skill_index.remove(skill_id, resource_id)
+        graph.mark_stale(resource_id)
+        # listings and related resources embedding this resource carry its tag
+        await invalidate_cache_tags(resource_tag(resource_id), *([SKILL_LIST_TAG] if result.created else []))
+    return result
+
+
 @resource_router.post("/resources/{resource_id}/skills/{skill_id}", status_code=status.HTTP_200_OK, description="Create skill for a given resource")
 async def add_skill_to_resource(
     resource_id: int,
     user_id: int,
     skill_data: SkillCreate,
     session: AsyncSession = Depends(get_async_session),
+    skill_index: SkillResourceIndex | None = Depends(get_skill_index),
+    graph: LearningPathGraph = Depends(get_learning_path_graph),
     current_user: User = Depends(get_current_contributor_or_admin_user)
 ):
     service = LearningResourceService(session)
@@ -125,7 +386,10 @@ async def add_skill_to_resource(
         # This means the resource was not found by the service method
         raise HTTPException(status_code=404, detail="Resource not found or skill could not be associated.")
 
-    await FastAPICache.clear(namespace="fastapi-cache")
+    if skill_index is not None:
+        skill_index.add(skill.id, resource_id)
+    graph.mark_stale(resource_id)
+    await invalidate_cache_tags(resource_tag(resource_id), SKILL_LIST_TAG)
     # Return the associated skill or a confirmation message
     return {"message": "Skill added to resource successfully", "skill": skill}
 
@@ -136,6 +400,8 @@ async def delete_skill_from_resource(
     user_id: int,
     skill_id: int,
     session: AsyncSession = Depends(get_async_session),
+    skill_index: SkillResourceIndex | None = Depends(get_skill_index),
+    graph: LearningPathGraph = Depends(get_learning_path_graph),
     current_user: User = Depends(get_current_contributor_or_admin_user)
 ):
     service = LearningResourceService(session)
@@ -146,55 +412,95 @@ async def delete_skill_from_resource(
     skill = await service.delete_learning_resource_skill(resource_id, user_id, skill_id)
     if skill is None:
         raise HTTPException(status_code=404, detail="Skill not found")
+    # the skill row itself is deleted, so every resource that listed it is stale
+    if skill_index is not None:
+        skill_index.drop_skill(skill_id)
+    graph.mark_skill_stale(skill_id)
+    await invalidate_cache_tags(resource_tag(resource_id), skill_tag(skill_id), SKILL_LIST_TAG)
     return skill
 
 
-@resource_router.post("/{resource_id}/log_view", status_code=status.HTTP_200_OK)
-def view_logs(resource_id: int, user_id:int, background_task: BackgroundTasks):
-    background_task.add_task(log_resource_view, resource_id, user_id)
-    return {"message": "View logged"}
-
-
-@resource_router.post("/{resource_id}/upload_image", status_code=status.HTTP_200_OK, description="Upload image for the resource")
-async def upload_resource_image(resource_id: int, image_file: UploadFile = File(...), session: AsyncSession = Depends(get_async_session)):
-    BASE_DIR = Path(__file__).resolve().parent.parent.parent
-    STATIC_DIR = BASE_DIR / "static"
-    RESOURCE_IMAGES_DIR = STATIC_DIR / "resource_images"
+@resource_router.get("/{resource_id}/views", status_code=status.HTTP_200_OK, description="Get the view count of a learning resource")
+async def get_resource_views(resource_id: int, session: AsyncSession = Depends(get_async_session)) -> ResourceViews:
+    """FastAPI endpoint to get how often a resource was viewed, as of the last flush of the view counter"""
+    views = await ResourceViewService(session).get_resource_views(resource_id)
+    if views is None:
+        raise HTTPException(status_code=404, detail="Resource not found")
+    return views
 
 
-    file_extension = Path(image_file.filename).suffix
-    unique_filename = f"{uuid4()}{file_extension}"
+@resource_router.post("/{resource_id}/log_view", status_code=status.HTTP_200_OK)
+async def view_logs(resource_id: int, user_id:int, view_counter: ViewCounter = Depends(get_view_counter)):
+    try:
+        await view_counter.record(resource_id)
+    except Exception as e:
+        raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail=f"Error while logging view: {e}")
+    return {"message": "View logged"}
 
-    full_file_path = RESOURCE_IMAGES_DIR / unique_filename
 
-    print(f"Saving to: {full_file_path}")
+async def store_resource_image(resource_id: int, chunks: AsyncIterator[bytes], session: AsyncSession, background_tasks: BackgroundTasks) -> dict:
+    """Streams an image to disk and points the resource at it once the file is complete, thumbnails follow after the response"""
     try:
-        RESOURCE_IMAGES_DIR.mkdir(parents=True, exist_ok=True)
+        image = await save_image_stream(chunks, RESOURCE_IMAGES_DIR, config.image_upload_max_bytes)
+    except InvalidImage as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    except ImageTooLarge as e:
+        raise HTTPException(status_code=413, detail=str(e))
 
-        if not image_file.content_type.startswith("image/"):
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail="Only image files are allowed."
-        )
-
-        with open(full_file_path, "wb") as file_object: 
-            shutil.copyfileobj(image_file.file, file_object)
-            
-            image_url = f"/static/resource_images/{unique_filename}"
-
-            await LearningResourceService(session).add_image_resource(resource_id, image_url)
-            
-            return {
-                "message": "Image uploaded successfully",
-                "filename": unique_filename,
-                "content_type": image_file.content_type,
-                "file_size": image_file.size,
-                "image_url": image_url
-            }
+    try:
+        resource = await LearningResourceService(session).add_image_resource(resource_id, image)
+        if resource is None:
+            await asyncio.to_thread(image.path.unlink, missing_ok=True)
+            raise HTTPException(status_code=404, detail="Resource not found")
+        await invalidate_cache_tags(resource_tag(resource_id))
+    except HTTPException:
+        raise
     except Exception as e:
+        # before the blob was acquired the upload is still the temp file, after it the failed
+        # transaction is rolled back and a blob no one else references deleted by the service
+        await asyncio.to_thread(image.path.unlink, missing_ok=True)
+        await session.rollback()
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Error uploading image: {str(e)}"
         )
+
+    # resizing takes a process pool round trip, the committed upload need not wait for it
+    background_tasks.add_task(render_image_variants, resource.image_path, image.sha256)
+    return {
+        "message": "Image uploaded successfully",
+        "filename": image.blob_name,
+        "content_type": image.content_type,
+        "file_size": image.size,
+        "sha256": image.sha256,
+        "image_url": resource.image_path
+    }
+
+
+def check_image_upload(content_type: str | None, content_length: int | None):
+    """Rejects uploads whose declared type or size is already wrong before reading any of the body"""
+    if not (content_type or "").startswith("image/"):
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Only image files are allowed.")
+    if content_length is not None and content_length > config.image_upload_max_bytes:
+        raise HTTPException(
+            status_code=413,
+            detail=f"Image is larger than {config.image_upload_max_bytes} bytes"
+        )
+
+
+@resource_router.post("/{resource_id}/upload_image", status_code=status.HTTP_200_OK, description="Upload image for the resource")
+async def upload_resource_image(resource_id: int, background_tasks: BackgroundTasks, image_file: UploadFile = File(...), session: AsyncSession = Depends(get_async_session)):
+    """FastAPI endpoint to upload the image of a resource as a multipart form field"""
+    try:
+        check_image_upload(image_file.content_type, image_file.size)
+        return await store_resource_image(resource_id, upload_chunks(image_file, config.image_upload_chunk_size), session, background_tasks)
     finally:
-        image_file.file.close()
\ No newline at end of file
+        await image_file.close()
+
+
+@resource_router.put("/{resource_id}/image", status_code=status.HTTP_200_OK, description="Upload image for the resource as the raw request body")
+async def put_resource_image(resource_id: int, request: Request, background_tasks: BackgroundTasks, session: AsyncSession = Depends(get_async_session)):
+    """FastAPI endpoint to stream the image of a resource straight from the request body, without spooling it first"""
+    content_length = request.headers.get("content-length")
+    check_image_upload(request.headers.get("content-type"), int(content_length) if content_length and content_length.isdigit() else None)
+    return await store_resource_image(resource_id, request.stream(), session, background_tasks)
\ No newline at end of file
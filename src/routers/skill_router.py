@@ -1,14 +1,37 @@
-from fastapi import APIRouter, status, Depends, HTTPException
+from fastapi import APIRouter, status, Depends, HTTPException, Query
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from src.backend.cache import cached, invalidate_cache_tags, latest_updated_at, skill_tag, SKILL_LIST_TAG
+from src.backend.config import config
 from src.backend.security import get_current_contributor_or_admin_user
+from src.backend.skill_index import SkillResourceIndex, get_skill_index
+from src.backend.learning_path import LearningPathGraph, get_learning_path_graph
 from src.backend.session import get_async_session
+from src.schemas.learning_resource_schema import LearningResourcePage
 from src.schemas.skills_schema import Skill, SkillCreate
+from src.services.resource_service import LearningResourceService
 from src.services.skill_service import SkillService
+from src.utils.pagination_utils import decode_id_cursor
 
 skill_router: APIRouter =  APIRouter(prefix="/skills", tags=["Skill"])
 
+
+def get_skills_key_builder(kwargs: dict) -> str:
+    return "skills:list"
+
+def get_skill_by_id_key_builder(kwargs: dict) -> str:
+    return f"skills:skill_id={kwargs['skill_id']}"
+
+def get_skills_tags(kwargs: dict, skills: list[Skill]) -> set[str]:
+    return {SKILL_LIST_TAG}
+
+def get_skill_by_id_tags(kwargs: dict, skill: Skill) -> set[str]:
+    return {skill_tag(skill.id)}
+
+
 @skill_router.get("/", status_code=status.HTTP_200_OK, description="Get all skills created")
+@cached(expire=60, key_builder=get_skills_key_builder, tags=get_skills_tags, stale_ttl=config.cache_stale_ttl)
 async def get_skills(session: AsyncSession = Depends(get_async_session)) -> list[Skill]:
     try:
         skills = await SkillService(session).get_all_skills()
@@ -21,18 +44,71 @@ async def get_skills(session: AsyncSession = Depends(get_async_session)) -> list
 async def create_skill(skill: SkillCreate, session: AsyncSession = Depends(get_async_session), current_user: dict = Depends(get_current_contributor_or_admin_user)):
     try:
         await SkillService(session).create_skill(skill)
+        await invalidate_cache_tags(SKILL_LIST_TAG)
         return {"message": "Skill Created", "status": 201}
+    except IntegrityError:
+        await session.rollback()
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=f"Skill '{skill.title}' already exists")
     except Exception as e:
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=f"Error creating skill: {str(e)}")
     
 
+@skill_router.get("/resources", status_code=status.HTTP_200_OK, description="Get the resources teaching every one of the given skills")
+async def get_resources_with_skills(
+    skill_ids: list[int] = Query(..., min_length=1, max_length=20, description="Skills every returned resource teaches"),
+    limit: int = Query(config.resource_page_size, ge=1, le=config.resource_page_max_size),
+    cursor: str | None = Query(None, description="next_cursor returned by the previous page"),
+    session: AsyncSession = Depends(get_async_session),
+    skill_index: SkillResourceIndex | None = Depends(get_skill_index),
+) -> LearningResourcePage:
+    """FastAPI endpoint to get one page, ordered by id, of the intersection of the resources of several skills"""
+    try:
+        after = decode_id_cursor(cursor) if cursor else None
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
+    try:
+        return await LearningResourceService(session).get_skill_resources_page(skill_ids, limit, after, skill_index)
+    except Exception as e:
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=f"Error getting resources: {str(e)}")
+
+
+@skill_router.get("/{skill_id}/resources", status_code=status.HTTP_200_OK, description="Get the resources teaching a skill")
+async def get_skill_resources(
+    skill_id: int,
+    limit: int = Query(config.resource_page_size, ge=1, le=config.resource_page_max_size),
+    cursor: str | None = Query(None, description="next_cursor returned by the previous page"),
+    session: AsyncSession = Depends(get_async_session),
+    skill_index: SkillResourceIndex | None = Depends(get_skill_index),
+) -> LearningResourcePage:
+    """FastAPI endpoint to get the resources of a skill page by page, ordered by id"""
+    try:
+        after = decode_id_cursor(cursor) if cursor else None
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
+    try:
+        page = await LearningResourceService(session).get_skill_resources_page([skill_id], limit, after, skill_index)
+        # only an empty first page needs to tell a skill without resources from a missing one
+        if not page.items and after is None and await SkillService(session).get_skill_by_id(skill_id) is None:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Skill not found")
+        return page
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=f"Error getting resources: {str(e)}")
+
+
 @skill_router.get('/{skill_id}', status_code=status.HTTP_200_OK, description="Get skill of a given ID")
+@cached(expire=60, key_builder=get_skill_by_id_key_builder, tags=get_skill_by_id_tags, stale_ttl=config.cache_stale_ttl, last_modified=latest_updated_at)
 async def get_skill_by_id(skill_id: int, session: AsyncSession = Depends(get_async_session))->Skill:
     try:
         skill = await SkillService(session).get_skill_by_id(skill_id)
         if skill is None:
             raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Skill not found")
         return skill
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=f"Error getting skill: {str(e)}")
     
@@ -43,18 +119,27 @@ async def skill_update(skill_id: int, update_data: SkillCreate, session: AsyncSe
         skill = await SkillService(session).update_skill(skill_id, update_data)
         if skill is None:
             raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Skill not found")
+        # cached resources embed their skills
+        await invalidate_cache_tags(skill_tag(skill_id), SKILL_LIST_TAG)
         return skill
+    except IntegrityError:
+        await session.rollback()
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=f"Skill '{update_data.title}' already exists")
     except Exception as e:
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=f"Error updating skill: {str(e)}")
     
 
 
 @skill_router.delete('/{skill_id}/delete', status_code=status.HTTP_200_OK, description="Delete a skill record")
-async def delete_skill(skill_id: int, session: AsyncSession = Depends(get_async_session), current_user: dict = Depends(get_current_contributor_or_admin_user)):
+async def delete_skill(skill_id: int, session: AsyncSession = Depends(get_async_session), skill_index: SkillResourceIndex | None = Depends(get_skill_index), graph: LearningPathGraph = Depends(get_learning_path_graph), current_user: dict = Depends(get_current_contributor_or_admin_user)):
     try:
         skill = await SkillService(session).delete_skill(skill_id)
         if skill is None:
             raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Skill not found")
+        if skill_index is not None:
+            skill_index.drop_skill(skill_id)
+        graph.mark_skill_stale(skill_id)
+        await invalidate_cache_tags(skill_tag(skill_id), SKILL_LIST_TAG)
         return {"message": "Skill Deleted", "status": 200}
     except Exception as e:
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=f"Error deleting skill: {str(e)}")
\ No newline at end of file
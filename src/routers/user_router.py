@@ -1,9 +1,14 @@
-from fastapi import APIRouter, Depends, status, HTTPException
+from fastapi import APIRouter, Depends, status, HTTPException, Query
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from src.backend.session import get_async_session
-from src.backend.security import get_current_contributor_or_admin_user
+from src.backend.learning_path import LearningPathGraph, get_learning_path_graph
+from src.backend.security import get_current_contributor_or_admin_user, get_current_admin_user, invalidate_principal
+from src.schemas.learning_path_schema import LearningPath
 from src.schemas.skills_schema import SkillCreate
+from src.schemas.user_schema import UserAccessUpdate, UserResponse
+from src.services.learning_path_service import LearningPathService
 from src.services.user_service import UserService
 
 user_router = APIRouter(prefix="/user", tags=["User"])
@@ -20,6 +25,9 @@ async def user_skills(
         if user_skill is None:
             raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="User not found")
         return {"message": "Skill Assigned to User", "status": 201}
+    except IntegrityError:
+        await session.rollback()
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=f"Skill '{skill.title}' already exists")
     except Exception as e:
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=f"Error while creating skill for user: {e}")
 
@@ -36,4 +44,41 @@ async def get_user_skills(
             raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="User not found")
         return user_skill
     except Exception as e:
-        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=f"Error while getting skill for user: {e}")
\ No newline at end of file
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=f"Error while getting skill for user: {e}")
+
+
+@user_router.get("/me/learning_path", description="API endpoint to plan the resources leading from the skills of a user to target skills", status_code=status.HTTP_200_OK)
+async def get_learning_path(
+    user_id: int,
+    target_skill_ids: list[int] = Query(..., min_length=1, max_length=50, description="Skills the user wants to learn"),
+    max_steps: int = Query(20, ge=1, le=100, description="Most resources on the path"),
+    session: AsyncSession = Depends(get_async_session),
+    graph: LearningPathGraph = Depends(get_learning_path_graph),
+    current_user = Depends(get_current_contributor_or_admin_user)
+) -> LearningPath:
+    try:
+        path = await LearningPathService(session).get_learning_path(user_id, target_skill_ids, graph, max_steps)
+    except Exception as e:
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=f"Error while planning learning path: {e}")
+    if path is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="User not found")
+    return path
+
+
+@user_router.put("/{user_id}/access", description="API endpoint to change the role or active status of a user", status_code=status.HTTP_200_OK)
+async def update_user_access(
+    user_id: int,
+    access: UserAccessUpdate,
+    session: AsyncSession = Depends(get_async_session),
+    current_user = Depends(get_current_admin_user)
+) -> UserResponse:
+    try:
+        user = await UserService(session).update_user_access(user_id, access)
+    except Exception as e:
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=f"Error while updating user access: {e}")
+    if user is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="User not found")
+
+    # cached principals still carry the old role / is_active
+    await invalidate_principal(user.email)
+    return user
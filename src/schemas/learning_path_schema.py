@@ -0,0 +1,14 @@
+from pydantic import BaseModel, Field
+
+from src.schemas.learning_resource_schema import LearningResource
+
+
+class LearningPathStep(BaseModel):
+    resource: LearningResource = Field(description="Resource to work through at this step")
+    skill_ids: list[int] = Field(description="Target skills this step teaches that earlier steps do not")
+
+
+class LearningPath(BaseModel):
+    steps: list[LearningPathStep] = Field(description="Resources covering the target skills, easiest first")
+    known_skill_ids: list[int] = Field(description="Skills of the user, taken as already learned")
+    uncovered_skill_ids: list[int] = Field(description="Target skills no step teaches, none of the resources or too many steps", default=[])
@@ -1,9 +1,10 @@
 from datetime import datetime
 
-from pydantic import BaseModel, Field, ConfigDict
+from pydantic import BaseModel, Field, ConfigDict, computed_field
 from enum import Enum
 
 from src.schemas.skills_schema import Skill # Assuming Skill is your Pydantic schema for Skills
+from src.utils.image_variant_utils import image_variant_urls
 
 class LearningResourceType(Enum):
     article = "article"
@@ -22,12 +23,76 @@ class LearningResourceCreate(LearningResourceBase):
     pass
     
 
+class ImageVariant(BaseModel):
+    width: int = Field(description="Maximum width in pixels, smaller images are not upscaled")
+    format: str = Field(description="File format of the variant, webp or the format of the upload")
+    url: str = Field(description="URL of the resized image")
+
+
 class LearningResource(LearningResourceBase):
     id: int = Field(description="Unique id of the learning resource")
     created_at: datetime = Field(description="Creation timestamp of the learning resource", default=datetime.now())
+    updated_at: datetime | None = Field(description="When the learning resource was last changed", default=None)
     # Change 'skills' to 'skill' and make it optional, or directly reference the Skill Pydantic model
     skill_ids: list[int] | None = Field(None, description="ID of the skill associated with the learning resource")
     skills: list[Skill] | None = Field(description="Skill user can learn from the learning resource", default=None)
     image_path: str | None = Field(description="Image path of the learning resource", default=None)
 
-    model_config = ConfigDict(from_attributes=True)
\ No newline at end of file
+    model_config = ConfigDict(from_attributes=True)
+
+    @computed_field(description="Thumbnails of the image for list views, derived from its content addressed image_path")
+    @property
+    def image_variants(self) -> list[ImageVariant] | None:
+        urls = image_variant_urls(self.image_path)
+        return [ImageVariant(**variant) for variant in urls] if urls is not None else None
+
+
+class LearningResourceSort(Enum):
+    oldest = "created_at"
+    newest = "-created_at"
+    easiest = "difficulty"
+    hardest = "-difficulty"
+
+
+class LearningResourceFilters(BaseModel):
+    resource_type: LearningResourceType | None = Field(description="Only resources of this type", default=None)
+    difficulty: int | None = Field(description="Only resources of this difficulty", default=None, ge=1, le=5)
+    user_id: int | None = Field(description="Only resources created by this user", default=None)
+    created_after: datetime | None = Field(description="Only resources created at or after this time", default=None)
+    created_before: datetime | None = Field(description="Only resources created before this time", default=None)
+
+
+class LearningResourcePage(BaseModel):
+    items: list[LearningResource] = Field(description="Learning resources on this page")
+    next_cursor: str | None = Field(description="Opaque cursor for the next page, null on the last page", default=None)
+
+
+class RelatedLearningResource(BaseModel):
+    resource: LearningResource = Field(description="A resource teaching skills of the given resource")
+    similarity: float = Field(description="Jaccard similarity of the skills of both resources, from 0 to 1")
+
+
+class LearningResourceSearchPage(BaseModel):
+    items: list[LearningResource] = Field(description="Matching learning resources, best match first")
+    next_offset: int | None = Field(description="offset of the next page, null on the last page", default=None)
+
+
+class LearningResourceBulkCreate(LearningResourceCreate):
+    skills: list[str] = Field(description="Titles of the skills taught, created when they do not exist yet", default=[])
+
+
+class BulkRowError(BaseModel):
+    index: int = Field(description="Zero based position of the rejected row in the request body")
+    error: str = Field(description="Why the row was rejected")
+
+
+class BulkCreateResult(BaseModel):
+    created: int = Field(description="Number of learning resources inserted")
+    failed: int = Field(description="Number of rows rejected")
+    errors: list[BulkRowError] = Field(description="Rejected rows", default=[])
+
+
+class ResourceViews(BaseModel):
+    resource_id: int = Field(description="Unique id of the learning resource")
+    title: str = Field(description="Title of the learning resource")
+    view_count: int = Field(description="Views counted up to the last flush of the view counter")
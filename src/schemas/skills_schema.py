@@ -10,5 +10,17 @@ class SkillCreate(SkillBase):
 class Skill(SkillBase):
     id: int = Field(description="Id of the skill", ge=1)
     created_at: datetime = Field(description="When it was created")
+    updated_at: datetime | None = Field(description="When it was last changed", default=None)
 
-    model_config = ConfigDict(from_attributes=True)
\ No newline at end of file
+    model_config = ConfigDict(from_attributes=True)
+
+class ResourceSkillsUpdate(BaseModel):
+    skill_ids: list[int] = Field(description="Ids of existing skills the resource teaches", default=[], max_length=500)
+    titles: list[str] = Field(description="Titles of skills the resource teaches, created when they do not exist yet", default=[], max_length=500)
+
+
+class ResourceSkillsResult(BaseModel):
+    skills: list[Skill] = Field(description="Every skill the resource teaches now")
+    added: list[int] = Field(description="Ids of the skills attached by this update")
+    removed: list[int] = Field(description="Ids of the skills detached by this update")
+    created: list[int] = Field(description="Ids of the skills created for titles that did not exist")
@@ -36,6 +36,10 @@ class UserResponse(BaseModel):
 
     model_config = ConfigDict(from_attributes=True)
 
+class UserAccessUpdate(BaseModel):
+    role: UserRole | None = Field(description="New access role of the user", default=None)
+    is_active: bool | None = Field(description="Whether the user may still sign in", default=None)
+
 class UserCredentials(BaseModel):
     email: EmailStr = Field(description="Email of the user")
     password: str = Field(description="password")
@@ -1,3 +1,4 @@
+from sqlalchemy.dialects import postgresql, sqlite
 from sqlalchemy.ext.asyncio import AsyncSession
 
 class SessionMixin:
@@ -5,4 +6,7 @@ class SessionMixin:
         self.session = session
 
 class BaseService(SessionMixin):
-    pass
\ No newline at end of file
+    def dialect_insert(self, model):
+        """INSERT for the dialect of the session, which has on_conflict_do_update and on_conflict_do_nothing"""
+        dialect = self.session.get_bind().dialect.name
+        return (postgresql.insert if dialect == "postgresql" else sqlite.insert)(model)
@@ -0,0 +1,105 @@
+import asyncio
+import logging
+import os
+from pathlib import Path
+
+from sqlalchemy import delete, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.db.models import ImageBlob, LearningResource
+from src.services.base import BaseService
+from src.utils.image_utils import RESOURCE_IMAGES_DIR, RESOURCE_IMAGES_URL, StoredImage
+from src.utils.image_variant_utils import image_variant_pool
+
+logger = logging.getLogger(__name__)
+
+
+async def render_image_variants(url: str, sha256: str, directory: Path = RESOURCE_IMAGES_DIR) -> None:
+    """Renders the thumbnails of a stored image, run after the upload committed so no row lock is held meanwhile"""
+    try:
+        await image_variant_pool.render(directory / url.rsplit("/", 1)[-1], sha256)
+    except Exception:
+        # the original is stored, thumbnails are rendered again by the next upload of the same image
+        logger.warning("Error rendering the variants of image %s", sha256, exc_info=True)
+
+
+class ImageBlobService(BaseService):
+    """
+    Content addressed storage of resource images
+
+    Every distinct image is one file named by its SHA-256 and one image_blob row counting the
+    resources that point at it. Row and file only change while the row is locked by the
+    upsert or delete of the current transaction, so an upload of an image never races the
+    collection of the same image.
+    """
+
+    def __init__(self, session: AsyncSession, directory: Path = RESOURCE_IMAGES_DIR, url_prefix: str = RESOURCE_IMAGES_URL):
+        self.session = session
+        self.directory = directory
+        self.url_prefix = url_prefix
+
+    def _path(self, url: str) -> Path:
+        return self.directory / url.rsplit("/", 1)[-1]
+
+    async def acquire(self, image: StoredImage) -> tuple[str, bool]:
+        """Adds a reference to the blob of an uploaded image and moves the file in place, returns its url and whether no one else references it"""
+        url = f"{self.url_prefix}/{image.blob_name}"
+        stmt = self.dialect_insert(ImageBlob).values(
+            sha256=image.sha256, url=url, content_type=image.content_type, size=image.size, ref_count=1
+        )
+        ref_count = (await self.session.execute(
+            stmt.on_conflict_do_update(index_elements=[ImageBlob.sha256], set_={"ref_count": ImageBlob.ref_count + 1})
+            .returning(ImageBlob.ref_count)
+        )).scalar_one()
+
+        path = self._path(url)
+        if await asyncio.to_thread(path.exists):
+            # already stored by an earlier upload of the same content
+            await asyncio.to_thread(image.path.unlink, missing_ok=True)
+        else:
+            await asyncio.to_thread(os.replace, image.path, path)
+        return url, ref_count == 1
+
+    async def _delete_files(self, url: str) -> None:
+        path = self._path(url)
+        for variant in image_variant_pool.variant_paths(path, path.stem):
+            await asyncio.to_thread(variant.unlink, missing_ok=True)
+        await asyncio.to_thread(path.unlink, missing_ok=True)
+
+    async def release(self, url: str | None) -> None:
+        """Drops a reference, images stored before content addressing have no blob and are left alone"""
+        if url:
+            await self.session.execute(
+                update(ImageBlob).where(ImageBlob.url == url, ImageBlob.ref_count > 0).values(ref_count=ImageBlob.ref_count - 1)
+            )
+
+    async def set_resource_image(self, resource: LearningResource, image: StoredImage) -> list[str]:
+        """Points a resource at an uploaded image and commits, returns urls of blobs that lost a reference"""
+        old_url = resource.image_path
+        url, sole_reference = await self.acquire(image)
+        try:
+            resource.image_path = url
+            # uploading the image a resource already has nets out to the same single reference
+            await self.release(old_url)
+            await self.session.commit()
+        except Exception:
+            # the file is already moved in place, it goes before the rollback unlocks the blob row
+            if sole_reference:
+                await self._delete_files(url)
+            await self.session.rollback()
+            raise
+        return [old_url] if old_url and old_url != url else []
+
+    async def collect_garbage(self, urls: list[str] | None = None) -> int:
+        """Deletes blobs no resource points at any more, only those of urls when given, returns the number deleted"""
+        stmt = delete(ImageBlob).where(ImageBlob.ref_count <= 0)
+        if urls is not None:
+            if not urls:
+                return 0
+            stmt = stmt.where(ImageBlob.url.in_(urls))
+        deleted = (await self.session.execute(stmt.returning(ImageBlob.url))).scalars().all()
+        # files go before the commit, while the deleted rows still block uploads of the same image
+        for url in deleted:
+            await self._delete_files(url)
+        await self.session.commit()
+        return len(deleted)
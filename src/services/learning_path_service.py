@@ -0,0 +1,35 @@
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.backend.learning_path import LearningPathGraph
+from src.schemas.learning_path_schema import LearningPath, LearningPathStep
+from src.services.base import BaseService
+from src.services.resource_service import LearningResourceService
+from src.services.user_service import UserService
+
+
+class LearningPathService(BaseService):
+    def __init__(self, session: AsyncSession):
+        self.session = session
+
+    async def get_learning_path(self, user_id: int, target_skill_ids: list[int], graph: LearningPathGraph, max_steps: int) -> LearningPath | None:
+        """
+        Plans the resources taking a user from their skills to the target skills, None if the user does not exist.
+        """
+        skills = await UserService(self.session).get_user_skill(user_id)
+        if skills is None:
+            return None
+        known_skill_ids = sorted(skill.id for skill in skills)
+
+        await graph.refresh(self.session)
+        steps, uncovered = graph.plan(set(known_skill_ids), set(target_skill_ids), max_steps)
+
+        resources = await LearningResourceService(self.session).get_resources_by_ids([step.resource_id for step in steps])
+        resources = {resource.id: resource for resource in resources}
+        return LearningPath(
+            steps=[
+                LearningPathStep(resource=resources[step.resource_id], skill_ids=step.skill_ids)
+                for step in steps if step.resource_id in resources
+            ],
+            known_skill_ids=known_skill_ids,
+            uncovered_skill_ids=sorted(uncovered),
+        )
@@ -1,11 +1,49 @@
+from datetime import datetime
+from typing import AsyncIterator, TYPE_CHECKING
+
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
-from sqlalchemy.orm import selectinload, joinedload
+from sqlalchemy import select, insert, delete, text, or_, exists, func, literal_column, table, column, tuple_
+from sqlalchemy.orm import selectinload, aliased
 
-from src.db.models import LearningResource, Skills
-from src.schemas.learning_resource_schema import LearningResourceCreate, LearningResource as ILearningResource
-from src.schemas.skills_schema import SkillCreate
+from src.db.models import LearningResource, Skills, learning_resource_skill_association
+from src.schemas.learning_resource_schema import LearningResourceCreate, LearningResource as ILearningResource, LearningResourcePage, LearningResourceBulkCreate, LearningResourceSearchPage, LearningResourceFilters, LearningResourceSort, RelatedLearningResource
+from src.schemas.skills_schema import SkillCreate, ResourceSkillsUpdate, ResourceSkillsResult
 from src.services.base import BaseService
+from src.services.image_service import ImageBlobService
+from src.utils.image_utils import StoredImage
+from src.utils.pagination_utils import encode_cursor, encode_id_cursor
+from src.utils.search_utils import search_terms, postgres_tsquery, fts5_match
+
+if TYPE_CHECKING:
+    from src.backend.related_resources import RelatedResources
+    from src.backend.skill_index import SkillResourceIndex
+
+
+# Only the columns the LearningResource response model needs
+RESOURCE_COLUMNS = (
+    LearningResource.id,
+    LearningResource.title,
+    LearningResource.description,
+    LearningResource.url,
+    LearningResource.resource_type,
+    LearningResource.difficulty,
+    LearningResource.created_at,
+    LearningResource.updated_at,
+    LearningResource.image_path,
+)
+SKILL_COLUMNS = (Skills.id, Skills.title, Skills.created_at, Skills.updated_at)
+# Stays well below the bind parameter limits of SQLite and asyncpg
+SKILL_LOAD_CHUNK_SIZE = 1000
+# Full-text index of each dialect, created with the table in src/db/search_index.py
+SEARCH_VECTOR = literal_column("learning_resource.search_vector")
+SEARCH_FTS_TABLE = table("learning_resource_fts", column("rowid"))
+# Keyset of each sort order of the resource listing, the last columns always (created_at, id)
+SORT_KEYSETS = {
+    LearningResourceSort.oldest: (LearningResource.created_at, LearningResource.id),
+    LearningResourceSort.newest: (LearningResource.created_at, LearningResource.id),
+    LearningResourceSort.easiest: (LearningResource.difficulty, LearningResource.created_at, LearningResource.id),
+    LearningResourceSort.hardest: (LearningResource.difficulty, LearningResource.created_at, LearningResource.id),
+}
 
 
 class LearningResourceService(BaseService):
@@ -26,21 +64,387 @@ class LearningResourceService(BaseService):
         return db_resource
 
     
+    async def bulk_create_resources(
+        self,
+        resources: AsyncIterator[LearningResourceBulkCreate],
+        batch_size: int,
+        user_id: int | None = None,
+        use_copy: bool = False,
+    ) -> int:
+        """
+        Inserts resources and their skills batch by batch in a single transaction, returns the number inserted.
+        use_copy switches to Postgres COPY and is ignored on other databases.
+        """
+        connection = await self.session.connection()
+        use_copy = use_copy and connection.dialect.name == "postgresql"
+        created = 0
+        batch: list[LearningResourceBulkCreate] = []
+        try:
+            async for resource in resources:
+                batch.append(resource)
+                if len(batch) >= batch_size:
+                    created += await self._insert_resource_batch(batch, user_id, use_copy)
+                    batch = []
+            if batch:
+                created += await self._insert_resource_batch(batch, user_id, use_copy)
+            await self.session.commit()
+        except Exception:
+            await self.session.rollback()
+            raise
+        return created
+
+
+    async def _insert_resource_batch(self, batch: list[LearningResourceBulkCreate], user_id: int | None, use_copy: bool) -> int:
+        created_at = datetime.now()
+        rows = [
+            {
+                "title": resource.title,
+                "description": resource.description,
+                "url": resource.url,
+                "resource_type": resource.resource_type.value,
+                "difficulty": resource.difficulty,
+                "created_at": created_at,
+                "updated_at": created_at,
+                "user_id": user_id,
+            }
+            for resource in batch
+        ]
+
+        if use_copy:
+            resource_ids = await self._copy_resource_rows(rows)
+        else:
+            # executemany with RETURNING, ids come back in the order of the rows
+            result = await self.session.execute(
+                insert(LearningResource).returning(LearningResource.id, sort_by_parameter_order=True), rows
+            )
+            resource_ids = result.scalars().all()
+
+        await self._attach_skill_titles(list(zip(resource_ids, batch)), user_id)
+        return len(resource_ids)
+
+
+    async def _copy_resource_rows(self, rows: list[dict]) -> list[int]:
+        # COPY cannot return generated ids, so reserve them from the sequence first
+        connection = await self.session.connection()
+        result = await connection.execute(
+            text("SELECT nextval(pg_get_serial_sequence('learning_resource', 'id')) FROM generate_series(1, :n)"),
+            {"n": len(rows)},
+        )
+        resource_ids = list(result.scalars().all())
+
+        columns = ["id", *rows[0].keys()]
+        raw_connection = await connection.get_raw_connection()
+        await raw_connection.driver_connection.copy_records_to_table(
+            LearningResource.__tablename__,
+            records=[(resource_id, *row.values()) for resource_id, row in zip(resource_ids, rows)],
+            columns=columns,
+        )
+        return resource_ids
+
+
+    async def _skill_ids_for_titles(self, titles: set[str], user_id: int | None) -> tuple[dict[str, int], list[int]]:
+        """
+        Maps skill titles to skill ids, creating the missing skills with one INSERT ... ON CONFLICT (title) DO NOTHING.
+        Returns the map and the created ids.
+        """
+        result = await self.session.execute(select(Skills.id, Skills.title).where(Skills.title.in_(titles)))
+        skill_ids: dict[str, int] = {title: skill_id for skill_id, title in result.all()}
+
+        now = datetime.now()
+        missing = [{"title": title, "user_id": user_id, "created_at": now, "updated_at": now} for title in titles if title not in skill_ids]
+        created: list[int] = []
+        if missing:
+            stmt = (
+                self.dialect_insert(Skills)
+                .on_conflict_do_nothing(index_elements=[Skills.title])
+                .returning(Skills.id, Skills.title)
+            )
+            for skill_id, title in (await self.session.execute(stmt, missing)).all():
+                skill_ids[title] = skill_id
+                created.append(skill_id)
+            # titles another transaction created since the SELECT above
+            if lost := [row["title"] for row in missing if row["title"] not in skill_ids]:
+                result = await self.session.execute(select(Skills.id, Skills.title).where(Skills.title.in_(lost)))
+                skill_ids.update({title: skill_id for skill_id, title in result.all()})
+        return skill_ids, created
+
+
+    async def _attach_skill_titles(self, resources: list[tuple[int, LearningResourceBulkCreate]], user_id: int | None) -> None:
+        titles = {title for _, resource in resources for title in resource.skills}
+        if not titles:
+            return
+        skill_ids, _ = await self._skill_ids_for_titles(titles, user_id)
+
+        associations = {
+            (resource_id, skill_ids[title])
+            for resource_id, resource in resources
+            for title in resource.skills
+        }
+        await self.session.execute(
+            insert(learning_resource_skill_association),
+            [{"learning_resource_id": resource_id, "skill_id": skill_id} for resource_id, skill_id in associations],
+        )
+
+
+    async def _fetch_skills(self, resource_ids: list[int]) -> dict[int, list[dict]]:
+        """
+        Loads the skills of many resources with batched IN queries instead of joining them onto every resource row.
+        """
+        skills: dict[int, list[dict]] = {}
+        for start in range(0, len(resource_ids), SKILL_LOAD_CHUNK_SIZE):
+            chunk = resource_ids[start:start + SKILL_LOAD_CHUNK_SIZE]
+            result = await self.session.execute(
+                select(learning_resource_skill_association.c.learning_resource_id, *SKILL_COLUMNS)
+                .join(Skills, Skills.id == learning_resource_skill_association.c.skill_id)
+                .where(learning_resource_skill_association.c.learning_resource_id.in_(chunk))
+                .order_by(learning_resource_skill_association.c.learning_resource_id, Skills.id)
+            )
+            for row in result.mappings():
+                skill = dict(row)
+                skills.setdefault(skill.pop("learning_resource_id"), []).append(skill)
+        return skills
+
+
+    async def _fetch_resources(self, query) -> list[ILearningResource]:
+        """
+        Runs a query over RESOURCE_COLUMNS and builds the response models without loading ORM objects.
+        """
+        rows = (await self.session.execute(query)).mappings().all()
+        skills = await self._fetch_skills([row["id"] for row in rows])
+        return [ILearningResource.model_validate({**row, "skills": skills.get(row["id"], [])}) for row in rows]
+
+
     async def get_all_resources(self) -> list[ILearningResource]:
-        result = await self.session.execute(
-            select(LearningResource).options(joinedload(LearningResource.skills))
+        return await self._fetch_resources(
+            select(*RESOURCE_COLUMNS).order_by(LearningResource.created_at, LearningResource.id)
         )
-        resources = result.scalars().unique().all()
-        return [ILearningResource.model_validate(resource) for resource in resources]
 
-    
+
+    def resources_page_query(
+        self,
+        limit: int,
+        after: tuple[datetime, int, int | None] | None = None,
+        filters: LearningResourceFilters | None = None,
+        sort: LearningResourceSort = LearningResourceSort.oldest,
+    ):
+        """
+        SELECT of one page of resources in the given sort order, starting after a keyset position.
+
+        Every sort ends in (created_at, id) and runs in one direction, so each filter and sort is
+        served by one of the composite indexes on learning_resource, read forwards or backwards.
+        """
+        keyset = SORT_KEYSETS[sort]
+        descending = sort in (LearningResourceSort.newest, LearningResourceSort.hardest)
+        query = (
+            select(*RESOURCE_COLUMNS)
+            .order_by(*(column.desc() if descending else column for column in keyset))
+            .limit(limit + 1) # one extra row tells us whether another page exists
+        )
+
+        if filters is not None:
+            if filters.resource_type is not None:
+                query = query.where(LearningResource.resource_type == filters.resource_type.value)
+            if filters.difficulty is not None:
+                query = query.where(LearningResource.difficulty == filters.difficulty)
+            if filters.user_id is not None:
+                query = query.where(LearningResource.user_id == filters.user_id)
+            if filters.created_after is not None:
+                query = query.where(LearningResource.created_at >= filters.created_after)
+            if filters.created_before is not None:
+                query = query.where(LearningResource.created_at < filters.created_before)
+
+        if after is not None:
+            created_at, resource_id, difficulty = after
+            values = (difficulty, created_at, resource_id) if len(keyset) == 3 else (created_at, resource_id)
+            # row value comparison, which both databases answer with a range scan of the index
+            position = tuple_(*keyset)
+            query = query.where(position < tuple_(*values) if descending else position > tuple_(*values))
+        return query
+
+
+    async def get_resources_page(
+        self,
+        limit: int,
+        after: tuple[datetime, int, int | None] | None = None,
+        filters: LearningResourceFilters | None = None,
+        sort: LearningResourceSort = LearningResourceSort.oldest,
+    ) -> LearningResourcePage:
+        """
+        Returns one page of the resources matching filters in the given sort order, starting after the given keyset position.
+        """
+        resources = await self._fetch_resources(self.resources_page_query(limit, after, filters, sort))
+
+        next_cursor = None
+        if len(resources) > limit:
+            resources = resources[:limit]
+            last = resources[-1]
+            difficulty = last.difficulty if len(SORT_KEYSETS[sort]) == 3 else None
+            next_cursor = encode_cursor(last.created_at, last.id, difficulty)
+
+        return LearningResourcePage(items=resources, next_cursor=next_cursor)
+
+
+    async def stream_resources(self, batch_size: int = 500) -> AsyncIterator[ILearningResource]:
+        """
+        Yields every resource from a server side cursor without materialising the full result set.
+        """
+        result = await self.session.stream(
+            select(*RESOURCE_COLUMNS)
+            .order_by(LearningResource.created_at, LearningResource.id)
+            .execution_options(yield_per=batch_size)
+        )
+        async for rows in result.mappings().partitions():
+            skills = await self._fetch_skills([row["id"] for row in rows])
+            for row in rows:
+                yield ILearningResource.model_validate({**row, "skills": skills.get(row["id"], [])})
+
+
+    async def search_resources(
+        self,
+        query: str,
+        limit: int,
+        offset: int = 0,
+        resource_type: str | None = None,
+        difficulty: int | None = None,
+        skill_id: int | None = None,
+    ) -> LearningResourceSearchPage:
+        """
+        Returns one page of the resources matching every word of query, best match first.
+
+        Words also match longer words they start, and titles count more than descriptions. On
+        Postgres the tsvector index is OR-ed with trigram similarity of the title, which finds
+        misspelled titles too; SQLite falls back to an FTS5 table ranked by bm25.
+        """
+        terms = search_terms(query)
+        if not terms:
+            return LearningResourceSearchPage(items=[])
+
+        if self.session.get_bind().dialect.name == "postgresql":
+            tsquery = func.to_tsquery("english", postgres_tsquery(terms))
+            text_query = " ".join(terms)
+            stmt = (
+                select(*RESOURCE_COLUMNS)
+                .where(or_(SEARCH_VECTOR.op("@@")(tsquery), LearningResource.title.op("%")(text_query)))
+                .order_by((func.ts_rank_cd(SEARCH_VECTOR, tsquery) + func.similarity(LearningResource.title, text_query)).desc(), LearningResource.id)
+            )
+        else:
+            stmt = (
+                select(*RESOURCE_COLUMNS)
+                .join(SEARCH_FTS_TABLE, SEARCH_FTS_TABLE.c.rowid == LearningResource.id)
+                .where(text("learning_resource_fts MATCH :match").bindparams(match=fts5_match(terms)))
+                # bm25 is lower for better matches, title hits weigh ten times description hits
+                .order_by(text("bm25(learning_resource_fts, 10.0, 1.0)"), LearningResource.id)
+            )
+
+        if resource_type is not None:
+            stmt = stmt.where(LearningResource.resource_type == resource_type)
+        if difficulty is not None:
+            stmt = stmt.where(LearningResource.difficulty == difficulty)
+        if skill_id is not None:
+            stmt = stmt.where(exists().where(
+                learning_resource_skill_association.c.learning_resource_id == LearningResource.id,
+                learning_resource_skill_association.c.skill_id == skill_id,
+            ))
+
+        resources = await self._fetch_resources(stmt.offset(offset).limit(limit + 1))
+        next_offset = None
+        if len(resources) > limit:
+            resources = resources[:limit]
+            next_offset = offset + limit
+        return LearningResourceSearchPage(items=resources, next_offset=next_offset)
+
+
+    async def get_skill_resources_page(
+        self,
+        skill_ids: list[int],
+        limit: int,
+        after: int | None = None,
+        skill_index: "SkillResourceIndex | None" = None,
+    ) -> LearningResourcePage:
+        """
+        Returns one page, ordered by id, of the resources teaching every one of skill_ids.
+
+        The ids come from the in-memory skill index once it is built, otherwise from the
+        (skill_id, learning_resource_id) index of the association table, where the resources
+        of several skills are those appearing once per skill.
+        """
+        skill_ids = sorted(set(skill_ids))
+        resource_ids = skill_index.lookup(skill_ids, after, limit + 1) if skill_index is not None else None
+        if resource_ids is None:
+            association = learning_resource_skill_association.c
+            stmt = (
+                select(association.learning_resource_id)
+                .where(association.skill_id.in_(skill_ids))
+                .group_by(association.learning_resource_id)
+                .having(func.count() == len(skill_ids))
+                .order_by(association.learning_resource_id)
+                .limit(limit + 1) # one extra row tells us whether another page exists
+            )
+            if after is not None:
+                stmt = stmt.where(association.learning_resource_id > after)
+            resource_ids = list((await self.session.execute(stmt)).scalars())
+
+        next_cursor = None
+        if len(resource_ids) > limit:
+            resource_ids = resource_ids[:limit]
+            next_cursor = encode_id_cursor(resource_ids[-1])
+        if not resource_ids:
+            return LearningResourcePage(items=[])
+
+        return LearningResourcePage(items=await self.get_resources_by_ids(resource_ids), next_cursor=next_cursor)
+
+
+    async def get_resources_by_ids(self, resource_ids: list[int]) -> list[ILearningResource]:
+        """Returns the resources of the given ids that exist, ordered by id"""
+        return await self._fetch_resources(
+            select(*RESOURCE_COLUMNS).where(LearningResource.id.in_(resource_ids)).order_by(LearningResource.id)
+        )
+
+
+    async def get_related_resources(
+        self,
+        resource_id: int,
+        limit: int,
+        related: "RelatedResources | None" = None,
+    ) -> list[RelatedLearningResource]:
+        """
+        Returns the resources sharing the most skills with resource_id, by Jaccard similarity of their skills.
+
+        The neighbours are read from the precomputed related resources once they are loaded,
+        otherwise the co-occurrences of this one resource are counted with a self join of the
+        association table.
+        """
+        neighbours = related.lookup(resource_id, limit) if related is not None else None
+        if neighbours is None:
+            mine, theirs = aliased(learning_resource_skill_association), aliased(learning_resource_skill_association)
+            association = learning_resource_skill_association.c
+            own_size = select(func.count()).where(association.learning_resource_id == resource_id).scalar_subquery()
+            their_size = (
+                select(func.count()).where(association.learning_resource_id == theirs.c.learning_resource_id)
+                .correlate(theirs).scalar_subquery()
+            )
+            shared = func.count()
+            similarity = shared * 1.0 / (own_size + their_size - shared)
+            stmt = (
+                select(theirs.c.learning_resource_id, similarity)
+                .join(mine, mine.c.skill_id == theirs.c.skill_id)
+                .where(mine.c.learning_resource_id == resource_id, theirs.c.learning_resource_id != resource_id)
+                .group_by(theirs.c.learning_resource_id)
+                .order_by(similarity.desc(), shared.desc(), theirs.c.learning_resource_id)
+                .limit(limit)
+            )
+            neighbours = [(neighbour, float(score)) for neighbour, score in await self.session.execute(stmt)]
+
+        resources = {resource.id: resource for resource in await self.get_resources_by_ids([neighbour for neighbour, _ in neighbours])}
+        return [
+            RelatedLearningResource(resource=resources[neighbour], similarity=score)
+            for neighbour, score in neighbours if neighbour in resources
+        ]
+
 
     async def get_resource_by_resource_id(self, resource_id: int):
-        result = await self.session.execute(select(LearningResource).where(LearningResource.id == resource_id))
-        resource = result.scalars().first()
-        if resource is None:
-            return None
-        return ILearningResource.model_validate(resource)
+        resources = await self._fetch_resources(select(*RESOURCE_COLUMNS).where(LearningResource.id == resource_id))
+        return resources[0] if resources else None
     
 
     async def delete_resource(self, resource_id: int):
@@ -48,12 +452,20 @@ class LearningResourceService(BaseService):
         resource = result.scalars().first()
         if resource is None:
             return None
+        blobs = ImageBlobService(self.session)
+        await blobs.release(resource.image_path)
         await self.session.delete(resource)
         await self.session.commit()
+        if resource.image_path:
+            await blobs.collect_garbage([resource.image_path])
         return resource
     
     async def update_resource(self, resource_id: int, new_data: LearningResourceCreate):
-        result = await self.session.execute(select(LearningResource).where(LearningResource.id == resource_id))
+        result = await self.session.execute(
+            select(LearningResource)
+            .options(selectinload(LearningResource.skills))
+            .where(LearningResource.id == resource_id)
+        )
         resource = result.scalars().first()
         
         if resource is None:
@@ -66,8 +478,8 @@ class LearningResourceService(BaseService):
         resource.difficulty = new_data.difficulty
 
 
+        # no refresh: it would expire the eagerly loaded skills and nothing is generated server side
         await self.session.commit()
-        await self.session.refresh(resource)
         
         return ILearningResource.model_validate(resource)
 
@@ -84,12 +496,8 @@ class LearningResourceService(BaseService):
             return None
 
         # Check for existing skill
-        skill_result = await self.session.execute(
-            select(Skills).where(
-                Skills.title == skill_data.title,
-                Skills.user_id == user_id
-            )
-        )
+        # titles are unique, the skill may have been created by another user
+        skill_result = await self.session.execute(select(Skills).where(Skills.title == skill_data.title))
         existing_skill = skill_result.scalars().first()
 
         # Create new skill if needed
@@ -102,6 +510,8 @@ class LearningResourceService(BaseService):
 
         if skill not in resource.skills:
             resource.skills.append(skill)
+            # the association table has no version of its own, the resource carries it
+            resource.updated_at = datetime.now()
         else:
             print("Skill already exists")
 
@@ -134,23 +544,68 @@ class LearningResourceService(BaseService):
 
         # Delete the skill
         await self.session.delete(skill_to_remove )
+        resource.updated_at = datetime.now()
         await self.session.commit()
         await self.session.refresh(resource)
         return {"message": "Skill deleted successfully"}
     
 
-    async def add_image_resource(self, resource_id: int, image_path: str):
-        result = await self.session.execute(
-            select(LearningResource)
-            .options(joinedload(LearningResource.skills)) # <-- Eager load skills here
-            .where(LearningResource.id == resource_id)
-        )
-        resource = result.scalars().first()
+    async def set_resource_skills(self, resource_id: int, update: ResourceSkillsUpdate, user_id: int | None) -> ResourceSkillsResult | None:
+        """
+        Makes the given skills the exact skill set of a resource, None if the resource does not exist.
 
+        Missing titles become skills in one upsert, new associations are added with one
+        INSERT ... ON CONFLICT DO NOTHING and the others removed with one DELETE, so the cost
+        does not grow with the number of skills. Raises ValueError for unknown skill ids.
+        """
+        resource = await self.session.get(LearningResource, resource_id)
         if resource is None:
             return None
 
-        resource.image_path = image_path
+        wanted = set(update.skill_ids)
+        if wanted:
+            existing = set((await self.session.execute(select(Skills.id).where(Skills.id.in_(wanted)))).scalars())
+            if unknown := wanted - existing:
+                raise ValueError(f"Unknown skill ids: {sorted(unknown)}")
+        created: list[int] = []
+        if update.titles:
+            skill_ids, created = await self._skill_ids_for_titles(set(update.titles), user_id)
+            wanted.update(skill_ids.values())
+
+        association = learning_resource_skill_association.c
+        added: list[int] = []
+        if wanted:
+            stmt = (
+                self.dialect_insert(learning_resource_skill_association)
+                .values([{"learning_resource_id": resource_id, "skill_id": skill_id} for skill_id in wanted])
+                .on_conflict_do_nothing()
+                .returning(association.skill_id)
+            )
+            added = list((await self.session.execute(stmt)).scalars())
+        removed = list((await self.session.execute(
+            delete(learning_resource_skill_association)
+            .where(association.learning_resource_id == resource_id, association.skill_id.not_in(wanted))
+            .returning(association.skill_id)
+        )).scalars())
+
+        if added or removed:
+            # the association table has no version of its own, the resource carries it
+            resource.updated_at = datetime.now()
         await self.session.commit()
-        await self.session.refresh(resource)
-        return ILearningResource.model_validate(resource)
\ No newline at end of file
+
+        skills = await self._fetch_skills([resource_id])
+        return ResourceSkillsResult(
+            skills=skills.get(resource_id, []), added=sorted(added), removed=sorted(removed), created=sorted(created),
+        )
+
+
+    async def add_image_resource(self, resource_id: int, image: StoredImage):
+        """Points the resource at the shared blob of the uploaded image, collecting the blob it replaced if unused"""
+        resource = await self.session.get(LearningResource, resource_id)
+        if resource is None:
+            return None
+
+        blobs = ImageBlobService(self.session)
+        released = await blobs.set_resource_image(resource, image)
+        await blobs.collect_garbage(released)
+        return await self.get_resource_by_resource_id(resource_id)
@@ -1,8 +1,10 @@
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
+from datetime import datetime
+
+from sqlalchemy import select, update
 
 from src.services.base import BaseService
-from src.db.models import Skills
+from src.db.models import Skills, LearningResource, learning_resource_skill_association
 from src.schemas.skills_schema import SkillCreate, Skill
 
 
@@ -48,6 +50,14 @@ class SkillService(BaseService):
         skill = result.scalars().first()
         if skill is None:
             return None
+        # resources embedding the skill change with it
+        await self.session.execute(
+            update(LearningResource)
+            .where(LearningResource.id.in_(
+                select(learning_resource_skill_association.c.learning_resource_id).where(learning_resource_skill_association.c.skill_id == skill_id)
+            ))
+            .values(updated_at=datetime.now())
+        )
         await self.session.delete(skill)
         await self.session.commit()
         return skill
\ No newline at end of file
@@ -4,7 +4,7 @@ from sqlalchemy.orm import selectinload
 
 
 from src.db.models import User, Skills
-from src.schemas.user_schema import UserCreate, UserResponse
+from src.schemas.user_schema import UserCreate, UserResponse, UserAccessUpdate
 from src.schemas.skills_schema import SkillCreate
 from src.services.base import BaseService
 from src.utils.auth_utils import get_password_hash, verify_password
@@ -44,6 +44,8 @@ class UserService(BaseService):
     async def get_user_with_email(self, email: str):
         result = await self.session.execute(select(User).where(User.email == email))
         user = result.scalar_one_or_none() 
+        if user is None:
+            return None
         return UserResponse.model_validate(user)
     
 
@@ -68,6 +70,21 @@ class UserService(BaseService):
         print("Correct Password: True") 
         return user 
     
+    async def update_user_access(self, user_id: int, access: UserAccessUpdate):
+        result = await self.session.execute(select(User).where(User.id == user_id))
+        user = result.scalar_one_or_none()
+        if user is None:
+            return None
+
+        if access.role is not None:
+            user.role = access.role.value
+        if access.is_active is not None:
+            user.is_active = access.is_active
+
+        await self.session.commit()
+        await self.session.refresh(user)
+        return UserResponse.model_validate(user)
+
     # Updated create_user_skill method
     async def create_user_skill(self, user_id: int, skill_data: SkillCreate): 
         user = await self.session.execute(select(User).where(User.id == user_id))
@@ -0,0 +1,54 @@
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.db.models import LearningResource, ResourceViewCount
+from src.schemas.learning_resource_schema import ResourceViews
+from src.services.base import BaseService
+
+# Rows per upsert statement, well below the bind parameter limits of SQLite and asyncpg
+VIEW_UPSERT_CHUNK_SIZE = 1000
+
+
+class ResourceViewService(BaseService):
+    def __init__(self, session: AsyncSession):
+        self.session = session
+
+    async def add_view_counts(self, counts: dict[int, int]) -> int:
+        """Adds aggregated views to the per-resource totals in batched upserts, returns the resources updated"""
+        resource_ids = list(counts)
+        updated = 0
+        for start in range(0, len(resource_ids), VIEW_UPSERT_CHUNK_SIZE):
+            chunk = resource_ids[start:start + VIEW_UPSERT_CHUNK_SIZE]
+            # views of resources deleted since they were counted are dropped
+            existing = (await self.session.execute(select(LearningResource.id).where(LearningResource.id.in_(chunk)))).scalars().all()
+            if not existing:
+                continue
+            stmt = self.dialect_insert(ResourceViewCount).values([{"resource_id": resource_id, "view_count": counts[resource_id]} for resource_id in existing])
+            stmt = stmt.on_conflict_do_update(
+                index_elements=[ResourceViewCount.resource_id],
+                set_={"view_count": ResourceViewCount.view_count + stmt.excluded.view_count},
+            )
+            await self.session.execute(stmt)
+            updated += len(existing)
+        await self.session.commit()
+        return updated
+
+    async def get_resource_views(self, resource_id: int) -> ResourceViews | None:
+        result = await self.session.execute(
+            select(LearningResource.id.label("resource_id"), LearningResource.title, ResourceViewCount.view_count)
+            .outerjoin(ResourceViewCount, ResourceViewCount.resource_id == LearningResource.id)
+            .where(LearningResource.id == resource_id)
+        )
+        row = result.mappings().first()
+        if row is None:
+            return None
+        return ResourceViews(resource_id=row["resource_id"], title=row["title"], view_count=row["view_count"] or 0)
+
+    async def get_most_viewed(self, limit: int) -> list[ResourceViews]:
+        result = await self.session.execute(
+            select(LearningResource.id.label("resource_id"), LearningResource.title, ResourceViewCount.view_count)
+            .join(LearningResource, LearningResource.id == ResourceViewCount.resource_id)
+            .order_by(ResourceViewCount.view_count.desc(), ResourceViewCount.resource_id)
+            .limit(limit)
+        )
+        return [ResourceViews.model_validate(dict(row)) for row in result.mappings()]
@@ -1,8 +1,14 @@
 import asyncio
+
+from src.backend.job_queue import JobHandler
+
+
 async def send_email_notification(recipient: str, subject: str, body: str):
     await asyncio.sleep(5)  # Simulate network delay
     print(f"Email sent to {recipient}: {subject} - {body}")
 
-async def log_resource_view(resource_id: int, user_id: int):
-    await asyncio.sleep(5)  # Simulate network delay
-    print(f"Logging view for resource {resource_id} by user {user_id}")
\ No newline at end of file
+
+# Jobs the worker processes know how to run, enqueued by name through src.backend.job_queue
+JOB_HANDLERS: dict[str, JobHandler] = {
+    "send_email_notification": send_email_notification,
+}
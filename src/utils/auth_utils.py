@@ -1,11 +1,110 @@
+import asyncio
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, Callable
+
 from passlib.context import CryptContext
 
+from src.backend.config import config
+
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 
+
+class PasswordHashingBusy(Exception):
+    """Raised when the hashing pool queue is full and the caller should retry later"""
+
+
+# module level so they can be pickled into a process pool
+def _hash(password: str) -> str:
+    return pwd_context.hash(password)
+
+def _verify(plain_password: str, hashed_password: str) -> bool:
+    return pwd_context.verify(plain_password, hashed_password)
+
+def _timed_call(func: Callable[..., Any], *args: Any) -> tuple[float, Any]:
+    started = time.perf_counter()
+    return started, func(*args)
+
+
+class PasswordHashingPool:
+    """
+    Runs bcrypt on a dedicated, bounded worker pool so a burst of logins cannot stall the event loop
+
+    Attributes:
+    max_workers: Number of hashing operations running at the same time
+    max_queue: Number of operations allowed to wait for a free worker
+    """
+
+    def __init__(self, max_workers: int, max_queue: int, kind: str = "thread"):
+        self.max_workers = max_workers
+        self.max_queue = max_queue
+        self.kind = kind
+        self._executor: Executor | None = None
+        self.in_flight = 0
+        self.peak_queue_depth = 0
+        self.completed = 0
+        self.rejected = 0
+        self.total_wait_seconds = 0.0
+
+    @property
+    def executor(self) -> Executor:
+        if self._executor is None:
+            if self.kind == "process":
+                self._executor = ProcessPoolExecutor(max_workers=self.max_workers)
+            else:
+                self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="password-hash")
+        return self._executor
+
+    @property
+    def queue_depth(self) -> int:
+        return max(0, self.in_flight - self.max_workers)
+
+    async def run(self, func: Callable[..., Any], *args: Any) -> Any:
+        if self.queue_depth >= self.max_queue:
+            self.rejected += 1
+            raise PasswordHashingBusy("Too many password operations in progress")
+
+        self.in_flight += 1
+        self.peak_queue_depth = max(self.peak_queue_depth, self.queue_depth)
+        submitted = time.perf_counter()
+        try:
+            started, result = await asyncio.get_running_loop().run_in_executor(self.executor, _timed_call, func, *args)
+        finally:
+            self.in_flight -= 1
+
+        self.completed += 1
+        self.total_wait_seconds += started - submitted
+        return result
+
+    def stats(self) -> dict:
+        return {
+            "executor": self.kind,
+            "max_workers": self.max_workers,
+            "max_queue": self.max_queue,
+            "in_flight": self.in_flight,
+            "queue_depth": self.queue_depth,
+            "peak_queue_depth": self.peak_queue_depth,
+            "completed": self.completed,
+            "rejected": self.rejected,
+            "avg_wait_ms": round(self.total_wait_seconds / self.completed * 1000, 3) if self.completed else 0.0,
+        }
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+
+password_hashing_pool = PasswordHashingPool(
+    max_workers=config.password_hash_workers,
+    max_queue=config.password_hash_max_queue,
+    kind=config.password_hash_executor,
+)
+
 # hash password entered by user
 async def get_password_hash(password: str):
-    return pwd_context.hash(password)
+    return await password_hashing_pool.run(_hash, password)
 
 # verify password enter by user
 async def verify_password(plain_password: str, hashed_password: str):
-    return pwd_context.verify(plain_password, hashed_password)
+    return await password_hashing_pool.run(_verify, plain_password, hashed_password)
@@ -0,0 +1,36 @@
+import json
+from typing import Any, AsyncIterator
+
+from fastapi import Request
+
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+
+
+def _parse_line(line: bytes) -> tuple[Any, str | None]:
+    try:
+        return json.loads(line), None
+    except ValueError as e:
+        return None, f"Invalid JSON: {e}"
+
+# yield (index, row, error) for every row of a JSON array or NDJSON request body
+async def read_bulk_rows(request: Request) -> AsyncIterator[tuple[int, Any, str | None]]:
+    if request.headers.get("content-type", "").startswith(NDJSON_MEDIA_TYPE):
+        # NDJSON is parsed while it streams in, so the body is never held in memory at once
+        index = 0
+        buffer = b""
+        async for chunk in request.stream():
+            buffer += chunk
+            *lines, buffer = buffer.split(b"\n")
+            for line in lines:
+                if line.strip():
+                    yield index, *_parse_line(line)
+                    index += 1
+        if buffer.strip():
+            yield index, *_parse_line(buffer)
+        return
+
+    rows = json.loads(await request.body())
+    if not isinstance(rows, list):
+        raise ValueError("Request body must be a JSON array or NDJSON")
+    for index, row in enumerate(rows):
+        yield index, row, None
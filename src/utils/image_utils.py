@@ -0,0 +1,100 @@
+import asyncio
+import hashlib
+from dataclasses import dataclass
+from pathlib import Path
+from typing import AsyncIterator
+from uuid import uuid4
+
+from fastapi import UploadFile
+
+
+RESOURCE_IMAGES_DIR = Path(__file__).resolve().parent.parent.parent / "static" / "resource_images"
+RESOURCE_IMAGES_URL = "/static/resource_images"
+
+
+class InvalidImage(Exception):
+    """Raised when the uploaded bytes are not an image of a supported format"""
+
+
+class ImageTooLarge(Exception):
+    """Raised as soon as an upload streams past the allowed size"""
+
+
+# content type -> (file extension, leading bytes identifying the format)
+IMAGE_SIGNATURES: dict[str, tuple[str, tuple[bytes, ...]]] = {
+    "image/png": (".png", (b"\x89PNG\r\n\x1a\n",)),
+    "image/jpeg": (".jpg", (b"\xff\xd8\xff",)),
+    "image/gif": (".gif", (b"GIF87a", b"GIF89a")),
+    "image/webp": (".webp", (b"RIFF",)),
+}
+# enough leading bytes to tell every supported format apart
+SIGNATURE_SIZE = 12
+
+
+def detect_image_type(head: bytes) -> str | None:
+    """Content type of an image from its first bytes, None when the format is not supported"""
+    for content_type, (_, signatures) in IMAGE_SIGNATURES.items():
+        if head.startswith(signatures):
+            if content_type == "image/webp" and head[8:12] != b"WEBP":
+                continue
+            return content_type
+    return None
+
+
+@dataclass
+class StoredImage:
+    path: Path
+    content_type: str
+    size: int
+    sha256: str
+
+    @property
+    def blob_name(self) -> str:
+        """Content addressed file name, identical images share it"""
+        return f"{self.sha256}{IMAGE_SIGNATURES[self.content_type][0]}"
+
+
+async def upload_chunks(upload: UploadFile, chunk_size: int) -> AsyncIterator[bytes]:
+    while chunk := await upload.read(chunk_size):
+        yield chunk
+
+
+async def save_image_stream(chunks: AsyncIterator[bytes], directory: Path, max_size: int) -> StoredImage:
+    """
+    Writes an image to a temporary file in directory while it streams in
+
+    The format is checked on the first bytes and the size on every chunk, so a rejected upload
+    stops being read at once. Disk writes run on a thread, off the event loop, and the SHA-256
+    of the content is computed on the way through, so the caller can move the complete file
+    to its content addressed name (see StoredImage.blob_name) without reading it again.
+    """
+    await asyncio.to_thread(directory.mkdir, parents=True, exist_ok=True)
+    temp_path = directory / f".{uuid4().hex}.part"
+    digest = hashlib.sha256()
+    head = b""
+    size = 0
+
+    file = await asyncio.to_thread(open, temp_path, "wb")
+    try:
+        async for chunk in chunks:
+            size += len(chunk)
+            if size > max_size:
+                raise ImageTooLarge(f"Image is larger than {max_size} bytes")
+            if len(head) < SIGNATURE_SIZE:
+                head += chunk[:SIGNATURE_SIZE - len(head)]
+                if len(head) == SIGNATURE_SIZE and detect_image_type(head) is None:
+                    raise InvalidImage("Only image files are allowed.")
+            digest.update(chunk)
+            await asyncio.to_thread(file.write, chunk)
+
+        # also covers uploads shorter than a signature
+        content_type = detect_image_type(head)
+        if content_type is None:
+            raise InvalidImage("Only image files are allowed.")
+        await asyncio.to_thread(file.close)
+    except BaseException:
+        await asyncio.to_thread(file.close)
+        await asyncio.to_thread(temp_path.unlink, missing_ok=True)
+        raise
+
+    return StoredImage(path=temp_path, content_type=content_type, size=size, sha256=digest.hexdigest())
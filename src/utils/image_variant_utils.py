@@ -0,0 +1,126 @@
+import asyncio
+import os
+import re
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+from PIL import Image
+
+from src.backend.config import config
+
+VARIANTS_DIR_NAME = "variants"
+# Pillow writer per file extension of the original upload
+PILLOW_FORMATS = {".png": "PNG", ".jpg": "JPEG", ".gif": "GIF", ".webp": "WEBP"}
+_BLOB_NAME = re.compile(r"^(?P<sha256>[0-9a-f]{64})(?P<extension>\.[a-z]+)$")
+
+
+def variant_widths() -> list[int]:
+    return sorted(int(width) for width in config.image_variant_widths.split(",") if width.strip())
+
+
+def variant_extensions(extension: str) -> list[str]:
+    """WebP for browsers that take it, the original format for the rest"""
+    return [".webp"] if extension == ".webp" else [".webp", extension]
+
+
+def variant_name(sha256: str, width: int, extension: str) -> str:
+    return f"{sha256}_{width}{extension}"
+
+
+def image_variant_urls(image_path: str | None) -> list[dict] | None:
+    """Urls of the resized copies of a content addressed image, None for images stored before content addressing"""
+    if not image_path:
+        return None
+    directory, _, name = image_path.rpartition("/")
+    match = _BLOB_NAME.match(name)
+    if match is None:
+        return None
+    return [
+        {
+            "width": width,
+            "format": extension.lstrip("."),
+            "url": f"{directory}/{VARIANTS_DIR_NAME}/{variant_name(match['sha256'], width, extension)}",
+        }
+        for width in variant_widths()
+        for extension in variant_extensions(match["extension"])
+    ]
+
+
+# module level so it can be pickled into the process pool
+def render_variants(source: str, target_dir: str, sha256: str, extension: str, widths: list[int], quality: int) -> list[str]:
+    """Writes a copy of the image per width and variant format, never upscaled, returns the files written"""
+    written = []
+    os.makedirs(target_dir, exist_ok=True)
+    with Image.open(source) as image:
+        image.load()
+        for width in widths:
+            resized = image.copy()
+            resized.thumbnail((width, image.height * width), Image.Resampling.LANCZOS)
+            for variant_extension in variant_extensions(extension):
+                pillow_format = PILLOW_FORMATS[variant_extension]
+                output = resized.convert("RGB") if pillow_format == "JPEG" and resized.mode != "RGB" else resized
+                path = os.path.join(target_dir, variant_name(sha256, width, variant_extension))
+                temp_path = f"{path}.{os.getpid()}.part"
+                output.save(temp_path, format=pillow_format, quality=quality)
+                os.replace(temp_path, path)
+                written.append(path)
+    return written
+
+
+class ImageVariantPool:
+    """
+    Renders resized WebP and original-format copies of uploaded images on a process pool
+
+    Resizing is CPU bound and holds the GIL, so it runs in separate processes instead of on
+    the event loop or its thread pool.
+
+    Attributes:
+    max_workers: Images resized at the same time
+    """
+
+    def __init__(self, max_workers: int, quality: int):
+        self.max_workers = max_workers
+        self.quality = quality
+        self._executor: ProcessPoolExecutor | None = None
+        self.rendered = 0
+        self.failed = 0
+
+    @property
+    def executor(self) -> ProcessPoolExecutor:
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(max_workers=self.max_workers)
+        return self._executor
+
+    def variant_paths(self, source: Path, sha256: str) -> list[Path]:
+        return [
+            source.parent / VARIANTS_DIR_NAME / variant_name(sha256, width, extension)
+            for width in variant_widths()
+            for extension in variant_extensions(source.suffix)
+        ]
+
+    async def render(self, source: Path, sha256: str) -> list[Path]:
+        """Renders the variants of a stored image that are missing, returns every variant path"""
+        paths = self.variant_paths(source, sha256)
+        if all(await asyncio.gather(*(asyncio.to_thread(path.exists) for path in paths))):
+            return paths
+        try:
+            await asyncio.get_running_loop().run_in_executor(
+                self.executor, render_variants,
+                str(source), str(source.parent / VARIANTS_DIR_NAME), sha256, source.suffix, variant_widths(), self.quality,
+            )
+        except Exception:
+            self.failed += 1
+            raise
+        self.rendered += 1
+        return paths
+
+    def stats(self) -> dict:
+        return {"max_workers": self.max_workers, "rendered": self.rendered, "failed": self.failed}
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+
+image_variant_pool = ImageVariantPool(max_workers=config.image_variant_workers, quality=config.image_variant_quality)
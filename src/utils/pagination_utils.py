@@ -0,0 +1,36 @@
+import base64
+import json
+from datetime import datetime
+
+
+# encode the keyset position of the last row of a page into an opaque cursor,
+# difficulty is only part of it for pages sorted by difficulty
+def encode_cursor(created_at: datetime, resource_id: int, difficulty: int | None = None) -> str:
+    position = {"created_at": created_at.isoformat(), "id": resource_id}
+    if difficulty is not None:
+        position["difficulty"] = difficulty
+    payload = json.dumps(position, separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+# decode a cursor produced by encode_cursor back into its keyset position (created_at, id, difficulty)
+def decode_cursor(cursor: str) -> tuple[datetime, int, int | None]:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        difficulty = payload.get("difficulty")
+        return datetime.fromisoformat(payload["created_at"]), int(payload["id"]), int(difficulty) if difficulty is not None else None
+    except (ValueError, KeyError, TypeError, AttributeError) as e:
+        raise ValueError(f"Invalid cursor: {cursor}") from e
+
+# encode the id of the last row of a page ordered by id alone, such as the resources of a skill
+def encode_id_cursor(resource_id: int) -> str:
+    payload = json.dumps({"id": resource_id}, separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+# decode a cursor produced by encode_id_cursor back into the id it points after
+def decode_id_cursor(cursor: str) -> int:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        return int(json.loads(base64.urlsafe_b64decode(padded.encode()))["id"])
+    except (ValueError, KeyError, TypeError, AttributeError) as e:
+        raise ValueError(f"Invalid cursor: {cursor}") from e
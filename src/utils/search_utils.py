@@ -0,0 +1,19 @@
+import re
+
+# Words of a search query, anything else (operators, quotes, punctuation) is dropped
+_WORD = re.compile(r"\w+")
+# Longer queries are cut, every extra word is another index lookup
+MAX_SEARCH_TERMS = 16
+
+
+# split free text into the lower cased words that are searched for
+def search_terms(query: str) -> list[str]:
+    return _WORD.findall(query.lower())[:MAX_SEARCH_TERMS]
+
+# Postgres tsquery matching every term, each also as the prefix of a longer word
+def postgres_tsquery(terms: list[str]) -> str:
+    return " & ".join(f"{term}:*" for term in terms)
+
+# FTS5 MATCH expression matching every term, each also as the prefix of a longer word
+def fts5_match(terms: list[str]) -> str:
+    return " AND ".join(f'"{term}"*' for term in terms)
@@ -0,0 +1,49 @@
+import numpy as np
+from scipy import sparse
+
+# Resources whose co-occurrences are multiplied out at once, bounds the memory of one step
+SIMILARITY_CHUNK_SIZE = 2048
+
+
+def related_top_k(entry_resource_ids: np.ndarray, entry_skill_ids: np.ndarray, k: int) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Top k most similar resources of every resource, by Jaccard similarity of their skill sets.
+
+    Builds the sparse resource x skill matrix X of the associations, multiplies out the
+    co-occurrence counts X @ X.T a chunk of resources at a time and keeps the k best of each
+    row. Ties go to the resource sharing more skills, then to the lower id.
+
+    Returns (ids, neighbours, scores): the resource ids having skills in ascending order, and
+    per resource its neighbour ids and similarities, padded with -1 and 0.
+    """
+    ids, rows = np.unique(entry_resource_ids, return_inverse=True)
+    _, columns = np.unique(entry_skill_ids, return_inverse=True)
+    matrix = sparse.csr_matrix(
+        (np.ones(len(rows), dtype=np.int32), (rows, columns)),
+        shape=(len(ids), int(columns.max()) + 1 if len(columns) else 0),
+    )
+    matrix.data[:] = 1 # an association listed twice still counts once
+    transposed = matrix.T.tocsr()
+    sizes = np.asarray(matrix.sum(axis=1)).ravel()
+
+    neighbours = np.full((len(ids), k), -1, dtype=np.int64)
+    scores = np.zeros((len(ids), k), dtype=np.float32)
+    for start in range(0, len(ids), SIMILARITY_CHUNK_SIZE):
+        shared = matrix[start:start + SIMILARITY_CHUNK_SIZE] @ transposed
+        shared.sort_indices()
+        shared = shared.tocoo()
+        chunk_rows, others, counts = shared.row, shared.col, shared.data
+        keep = chunk_rows + start != others
+        chunk_rows, others, counts = chunk_rows[keep], others[keep], counts[keep]
+
+        similarity = counts / (sizes[chunk_rows + start] + sizes[others] - counts)
+        # per row best first by similarity, then shared skills; lexsort is stable and the
+        # columns are sorted within each row, so equal neighbours stay in id order
+        order = np.lexsort((-counts, -similarity, chunk_rows))
+        chunk_rows, others, similarity = chunk_rows[order], others[order], similarity[order]
+        first = np.searchsorted(chunk_rows, chunk_rows, side="left")
+        rank = np.arange(len(chunk_rows)) - first
+        top = rank < k
+        neighbours[chunk_rows[top] + start, rank[top]] = ids[others[top]]
+        scores[chunk_rows[top] + start, rank[top]] = similarity[top]
+    return ids, neighbours, scores
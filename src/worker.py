@@ -0,0 +1,73 @@
+"""
+Background job worker
+
+Runs the jobs enqueued by the API through src.backend.job_queue in separate processes:
+
+    python -m src.worker --processes 4 --concurrency 32
+"""
+import argparse
+import asyncio
+import logging
+import multiprocessing
+import signal
+
+from src.backend.config import config
+from src.backend.job_queue import JobWorker, create_job_queue
+from src.tasks import JOB_HANDLERS
+
+logger = logging.getLogger("src.worker")
+
+
+async def serve(concurrency: int) -> None:
+    stop = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(sig, stop.set)
+
+    queue = create_job_queue()
+    worker = JobWorker(
+        queue,
+        JOB_HANDLERS,
+        concurrency=concurrency,
+        max_attempts=config.job_max_attempts,
+        backoff=config.job_retry_backoff,
+        backoff_max=config.job_retry_backoff_max,
+    )
+    logger.info("Worker %s started, running up to %s jobs at a time", worker.consumer, concurrency)
+    try:
+        await worker.run(stop)
+    finally:
+        await queue.close()
+    logger.info("Worker %s stopped: %s completed, %s retried, %s dead-lettered", worker.consumer, worker.completed, worker.retried, worker.dead_lettered)
+
+
+def run_process(concurrency: int) -> None:
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(processName)s %(levelname)s %(message)s")
+    asyncio.run(serve(concurrency))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run background jobs from the job queue")
+    parser.add_argument("--processes", type=int, default=config.job_worker_processes)
+    parser.add_argument("--concurrency", type=int, default=config.job_worker_concurrency, help="jobs run at the same time per process")
+    args = parser.parse_args()
+
+    if args.processes <= 1:
+        run_process(args.concurrency)
+        return
+
+    # children get their own SIGINT/SIGTERM handlers and drain their jobs before exiting
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    processes = [
+        multiprocessing.Process(target=run_process, args=(args.concurrency,), name=f"worker-{index}")
+        for index in range(args.processes)
+    ]
+    for process in processes:
+        process.start()
+    signal.signal(signal.SIGTERM, lambda *_: [process.terminate() for process in processes])
+    for process in processes:
+        process.join()
+
+
+if __name__ == "__main__":
+    main()
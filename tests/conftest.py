@@ -1,12 +1,22 @@
 # tests/conftest.py
 
 import pytest
+import pytest_asyncio
 from httpx import AsyncClient, ASGITransport
 from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession, async_sessionmaker
-from sqlalchemy.pool import NullPool # Use NullPool for in-memory SQLite to prevent issues
+from sqlalchemy.pool import StaticPool
+
+from fastapi_cache import FastAPICache
+from fastapi_cache.backends.inmemory import InMemoryBackend
 
 from src.main import app
-from src.backend.session import get_async_session
+from src.backend.session import get_async_session, get_session_factory
+from src.backend.cache import cache_tag_index
+from src.backend.job_queue import SQLiteJobQueue, get_job_queue
+from src.backend.view_counter import ViewCounter, get_view_counter
+from src.backend.skill_index import SkillResourceIndex, get_skill_index
+from src.backend.learning_path import LearningPathGraph, get_learning_path_graph
+from src.backend.related_resources import RelatedResources, get_related_resources
 from src.db.database import Base
 
 # --- Test Database Configuration ---
@@ -14,13 +24,13 @@ from src.db.database import Base
 # This ensures each test starts with a clean slate.
 TEST_DATABASE_URL = "sqlite+aiosqlite:///:memory:"
 
-# Create a test engine with NullPool for in-memory SQLite
-# NullPool is important for in-memory SQLite to ensure each session gets a fresh connection
-# and the database isn't shared across concurrent tests in a way that causes conflicts.
+# Create a test engine with StaticPool for in-memory SQLite
+# Every connection to ":memory:" opens a brand new database, so StaticPool hands out the
+# single connection the tables were created on; the fixtures below reset it per test.
 test_engine = create_async_engine(
     TEST_DATABASE_URL,
     echo=False, # Set to True to see SQL queries during tests
-    poolclass=NullPool,
+    poolclass=StaticPool,
     connect_args={"check_same_thread": False}, # Required for SQLite with FastAPI
 )
 
@@ -34,7 +44,7 @@ TestingSessionLocal = async_sessionmaker(
 )
 
 # --- Dependency Override for Database Session ---
-@pytest.fixture(name="session")
+@pytest_asyncio.fixture(name="session")
 async def session_fixture():
     """
     Provides an isolated, asynchronous database session for each test.
@@ -55,7 +65,7 @@ async def session_fixture():
 
 
 # --- Override FastAPI's get_async_session dependency ---
-@pytest.fixture(name="override_get_async_session")
+@pytest_asyncio.fixture(name="override_get_async_session")
 async def override_get_async_session_fixture(session: AsyncSession):
     """
     Fixture to override the get_async_session dependency in FastAPI.
@@ -64,14 +74,69 @@ async def override_get_async_session_fixture(session: AsyncSession):
     yield session
 
 # --- FastAPI Test Client Fixture ---
-@pytest.fixture(name="client")
-async def client_fixture(override_get_async_session: AsyncSession):
+# --- Job Queue Fixture ---
+@pytest_asyncio.fixture(name="job_queue")
+async def job_queue_fixture(tmp_path):
+    """A SQLite job queue in a per-test file, standing in for the Redis stream"""
+    queue = SQLiteJobQueue(str(tmp_path / "jobs.db"), visibility_timeout=60)
+    yield queue
+    await queue.close()
+
+
+# --- View Counter Fixture ---
+@pytest.fixture(name="view_counter")
+def view_counter_fixture():
+    """A view counter aggregating in memory instead of Redis"""
+    return ViewCounter(redis=None)
+
+
+# --- Skill Index Fixture ---
+@pytest.fixture(name="skill_index")
+def skill_index_fixture():
+    """A per-test skill index, lookups go to the database until a test builds it"""
+    return SkillResourceIndex()
+
+
+# --- Learning Path Graph Fixture ---
+@pytest.fixture(name="learning_path_graph")
+def learning_path_graph_fixture():
+    """A per-test learning path graph, loaded from the test database by the first path request"""
+    return LearningPathGraph()
+
+
+# --- Related Resources Fixture ---
+@pytest_asyncio.fixture(name="related_resources")
+async def related_resources_fixture():
+    """Per-test related resources, lookups go to the database until a test refreshes them"""
+    related = RelatedResources(k=5)
+    yield related
+    await related.stop()
+
+
+@pytest_asyncio.fixture(name="client")
+async def client_fixture(
+    override_get_async_session: AsyncSession,
+    job_queue: SQLiteJobQueue,
+    view_counter: ViewCounter,
+    skill_index: SkillResourceIndex,
+    learning_path_graph: LearningPathGraph,
+    related_resources: RelatedResources,
+):
     """
     Provides an asynchronous test client for the FastAPI application.
     Overrides the database dependency to use the test database.
     """
+    # Serve cached endpoints from a per-test in-memory backend instead of Redis
+    FastAPICache.init(InMemoryBackend(), prefix="fastapi-cache")
+
     # Override the get_async_session dependency
     app.dependency_overrides[get_async_session] = lambda: override_get_async_session
+    app.dependency_overrides[get_session_factory] = lambda: TestingSessionLocal
+    app.dependency_overrides[get_job_queue] = lambda: job_queue
+    app.dependency_overrides[get_view_counter] = lambda: view_counter
+    app.dependency_overrides[get_skill_index] = lambda: skill_index
+    app.dependency_overrides[get_learning_path_graph] = lambda: learning_path_graph
+    app.dependency_overrides[get_related_resources] = lambda: related_resources
 
     # Use AsyncClient for testing async FastAPI applications
     transport = ASGITransport(app=app)
@@ -80,9 +145,10 @@ async def client_fixture(override_get_async_session: AsyncSession):
 
     # Clean up dependency overrides after the test
     app.dependency_overrides.clear()
+    FastAPICache.reset()
+    InMemoryBackend._store.clear() # the in-memory store is shared by every backend instance
+    cache_tag_index.clear()
 
     # Note on FastAPICache:
-    # The 'lifespan' event in main.py will still attempt to initialize FastAPICache
-    # with a real Redis connection. For true unit tests that don't rely on Redis,
-    # you would typically mock or disable FastAPICache initialization during tests.
-    # For integration tests where Redis is running, this setup is generally fine.
\ No newline at end of file
+    # ASGITransport does not run the lifespan in main.py, so the Redis backed cache is never
+    # initialised here. The in-memory backend above keeps the @cache endpoints working without Redis.
\ No newline at end of file
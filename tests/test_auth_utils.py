@@ -0,0 +1,38 @@
+# tests/test_auth_utils.py
+
+import asyncio
+import threading
+
+import pytest
+
+from src.utils.auth_utils import PasswordHashingPool, PasswordHashingBusy, get_password_hash, verify_password
+
+
+@pytest.mark.asyncio
+async def test_password_hash_round_trip():
+    """Test hashing and verifying through the worker pool."""
+    hashed = await get_password_hash("s3cret")
+    assert await verify_password("s3cret", hashed) is True
+    assert await verify_password("wrong", hashed) is False
+
+
+@pytest.mark.asyncio
+async def test_hashing_pool_rejects_when_queue_full():
+    """Test that work beyond workers + queue is rejected instead of piling up."""
+    release = threading.Event()
+    pool = PasswordHashingPool(max_workers=1, max_queue=1)
+
+    running = asyncio.create_task(pool.run(release.wait))
+    queued = asyncio.create_task(pool.run(release.wait))
+    await asyncio.sleep(0.05)
+    assert pool.stats()["queue_depth"] == 1
+
+    with pytest.raises(PasswordHashingBusy):
+        await pool.run(release.wait)
+
+    release.set()
+    await asyncio.gather(running, queued)
+    stats = pool.stats()
+    assert stats["completed"] == 2
+    assert stats["rejected"] == 1
+    pool.shutdown()
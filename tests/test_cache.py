@@ -0,0 +1,225 @@
+# tests/test_cache.py
+
+import asyncio
+import json
+import time
+from datetime import datetime
+
+import fakeredis
+import pytest
+import pytest_asyncio
+from fastapi_cache import FastAPICache
+from fastapi_cache.backends.inmemory import InMemoryBackend
+from fastapi_cache.backends.redis import RedisBackend
+from pydantic import BaseModel
+
+from src.backend.cache import SingleFlight, TwoTierBackend, cached, cache_tag_index
+
+
+@pytest.fixture(name="cache_backend")
+def cache_backend_fixture():
+    """Provides an empty in-memory FastAPICache backend."""
+    FastAPICache.init(InMemoryBackend(), prefix="test-cache")
+    yield FastAPICache.get_backend()
+    FastAPICache.reset()
+    InMemoryBackend._store.clear()
+    cache_tag_index.clear()
+
+
+@pytest.mark.asyncio
+async def test_concurrent_misses_share_one_computation(cache_backend):
+    """Test that concurrent misses for one key run the endpoint only once."""
+    calls = 0
+
+    @cached(expire=60, key_builder=lambda kwargs: f"item:{kwargs['item_id']}")
+    async def get_item(item_id: int) -> dict:
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.05)
+        return {"id": item_id}
+
+    responses = await asyncio.gather(*(get_item(item_id=1) for _ in range(10)))
+    assert [json.loads(response.body) for response in responses] == [{"id": 1}] * 10
+    assert calls == 1
+
+
+@pytest.mark.asyncio
+async def test_followers_compute_when_the_leader_is_cancelled():
+    """Test that cancelling the first caller of a key hands the computation to a waiting caller."""
+    single_flight = SingleFlight(lock_timeout=1)
+    calls = 0
+
+    async def compute() -> int:
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.05)
+        return calls
+
+    leader = asyncio.create_task(single_flight.do("key", compute))
+    await asyncio.sleep(0)
+    followers = [asyncio.create_task(single_flight.do("key", compute)) for _ in range(3)]
+    await asyncio.sleep(0.01)
+    leader.cancel()
+
+    assert await asyncio.gather(*followers) == [2, 2, 2]
+    assert leader.cancelled()
+    assert not single_flight.in_flight("key")
+
+
+@pytest.mark.asyncio
+async def test_lock_is_only_released_by_its_holder():
+    """Test that a worker whose lock expired does not delete the lock another worker took over."""
+    single_flight = SingleFlight(lock_timeout=1)
+    backend = RedisBackend(fakeredis.FakeAsyncRedis())
+
+    token = await single_flight.acquire_lock(backend, "key")
+    assert token is not None
+    assert await single_flight.acquire_lock(backend, "key") is None
+
+    # the lock expires and another worker takes it
+    await backend.redis.delete("key:lock")
+    other_token = await single_flight.acquire_lock(backend, "key")
+    await single_flight.release_lock(backend, "key", token)
+    assert await backend.redis.get("key:lock") == other_token.encode()
+
+    await single_flight.release_lock(backend, "key", other_token)
+    assert await backend.redis.get("key:lock") is None
+
+
+@pytest.mark.asyncio
+async def test_stale_entry_is_served_while_one_caller_revalidates(cache_backend, monkeypatch):
+    """Test that an expired entry is refreshed by one caller while the others get the stale copy."""
+    version = 0
+
+    @cached(expire=1, key_builder=lambda kwargs: "versioned", stale_ttl=60)
+    async def get_versioned() -> dict:
+        nonlocal version
+        version += 1
+        await asyncio.sleep(0.05)
+        return {"version": version}
+
+    assert json.loads((await get_versioned()).body) == {"version": 1}
+
+    now = time.time()
+    monkeypatch.setattr(time, "time", lambda: now + 5)
+    results = [json.loads(response.body) for response in await asyncio.gather(*(get_versioned() for _ in range(5)))]
+
+    assert results.count({"version": 2}) == 1
+    assert results.count({"version": 1}) == 4
+    assert json.loads((await get_versioned()).body) == {"version": 2}
+
+
+@pytest.mark.asyncio
+async def test_hit_returns_the_stored_bytes(cache_backend):
+    """Test that a hit answers with the bytes serialized on the miss, without running or validating anything."""
+    class Item(BaseModel):
+        id: int
+        created_at: datetime
+
+    calls = 0
+
+    @cached(expire=60, key_builder=lambda kwargs: "model")
+    async def get_items() -> list[Item]:
+        nonlocal calls
+        calls += 1
+        return [Item(id=1, created_at=datetime(2025, 1, 2, 3, 4, 5))]
+
+    miss = await get_items()
+    hit = await get_items()
+
+    assert calls == 1
+    assert hit.body == miss.body == b'[{"id":1,"created_at":"2025-01-02T03:04:05"}]'
+    assert hit.media_type == "application/json"
+    assert hit.headers["etag"] == miss.headers["etag"]
+
+
+@pytest_asyncio.fixture(name="workers")
+async def workers_fixture():
+    """Provides two listening TwoTierBackends sharing one fake Redis, like two API workers."""
+    server = fakeredis.FakeServer()
+    workers = [TwoTierBackend(fakeredis.FakeAsyncRedis(server=server), maxsize=10, ttl=60) for _ in range(2)]
+    for worker in workers:
+        await worker.start()
+    await asyncio.sleep(0.05) # let the listeners subscribe
+    yield workers
+    for worker in workers:
+        await worker.stop()
+
+
+async def eventually(condition, timeout: float = 1.0) -> bool:
+    """Polls condition until it holds, for messages delivered by the eviction listener."""
+    deadline = time.monotonic() + timeout
+    while not condition():
+        if time.monotonic() > deadline:
+            return False
+        await asyncio.sleep(0.01)
+    return True
+
+
+@pytest.mark.asyncio
+async def test_two_tier_hit_is_answered_from_memory(workers):
+    """Test that a key read once is served by the L1 tier without going to Redis again."""
+    worker, _ = workers
+    await worker.set("test-cache:item", b"payload", expire=60)
+    await worker.redis.delete("test-cache:item") # only the L1 copy is left
+
+    assert await worker.get("test-cache:item") == b"payload"
+    assert worker.stats()["l1"]["hits"] == 1
+
+
+@pytest.mark.asyncio
+async def test_two_tier_entry_expires_from_memory(workers):
+    """Test that an L1 entry past its ttl is dropped and read from Redis again."""
+    worker, _ = workers
+    worker.local.ttl = 0.05
+    await worker.set("test-cache:item", b"old", expire=60)
+    await worker.redis.set("test-cache:item", b"new", ex=60)
+    assert await worker.get("test-cache:item") == b"old"
+
+    await asyncio.sleep(0.1)
+    assert await worker.get("test-cache:item") == b"new"
+
+
+@pytest.mark.asyncio
+async def test_two_tier_key_eviction_reaches_other_workers(workers):
+    """Test that clearing a key on one worker drops the L1 copy of every worker."""
+    this_worker, other_worker = workers
+    await this_worker.set("test-cache:item", b"payload", expire=60)
+    assert await other_worker.get("test-cache:item") == b"payload"
+
+    await this_worker.clear(key="test-cache:item")
+    assert this_worker.local.get("test-cache:item") is None
+    assert await eventually(lambda: other_worker.local.get("test-cache:item") is None)
+    assert await other_worker.get("test-cache:item") is None
+
+
+@pytest.mark.asyncio
+async def test_two_tier_namespace_clear_reaches_other_workers(workers):
+    """Test that clearing a namespace drops its keys from every worker and keeps the other keys."""
+    this_worker, other_worker = workers
+    for key in ("test-cache:resources:1", "test-cache:resources:2", "test-cache:skills:1"):
+        await this_worker.set(key, b"payload", expire=60)
+        assert await other_worker.get(key) == b"payload"
+
+    await this_worker.clear(namespace="test-cache:resources")
+    assert await eventually(lambda: len(other_worker.local) == 1)
+    assert other_worker.local.get("test-cache:skills:1") == b"payload"
+    assert await other_worker.get("test-cache:resources:1") is None
+
+
+@pytest.mark.asyncio
+async def test_tag_outlives_its_longest_lived_entry():
+    """Test that a short-lived entry sharing a tag does not cut the tag short for a long-lived one."""
+    backend = RedisBackend(fakeredis.FakeAsyncRedis())
+    FastAPICache.init(backend, prefix="test-cache")
+    try:
+        await backend.set("test-cache:long", b"payload", 3)
+        await cache_tag_index.add("test-cache:long", ["resource:1"], 3)
+        await backend.set("test-cache:short", b"payload", 1)
+        await cache_tag_index.add("test-cache:short", ["resource:1"], 1)
+
+        await asyncio.sleep(1.1)
+        assert await cache_tag_index.invalidate("resource:1") == 2
+        assert await backend.get("test-cache:long") is None
+    finally:
+        FastAPICache.reset()
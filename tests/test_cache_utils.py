@@ -0,0 +1,32 @@
+# tests/test_cache_utils.py
+
+import time
+
+from src.utils.cache_utils import TTLCache
+
+
+def test_ttl_cache_evicts_least_recently_used():
+    """Test that the oldest untouched entry is evicted once the cache is full."""
+    cache = TTLCache(maxsize=2, ttl=60)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    assert cache.get("a") == 1 # "a" is now the most recently used
+    cache.set("c", 3)
+
+    assert cache.get("b") is None
+    assert cache.get("a") == 1
+    assert cache.get("c") == 3
+
+
+def test_ttl_cache_expires_entries(monkeypatch):
+    """Test that entries disappear once their time to live has passed."""
+    now = time.monotonic()
+    monkeypatch.setattr(time, "monotonic", lambda: now)
+    cache = TTLCache(maxsize=10, ttl=5)
+    cache.set("short", "value", ttl=1)
+    cache.set("long", "value")
+
+    monkeypatch.setattr(time, "monotonic", lambda: now + 2)
+    assert cache.get("short") is None
+    assert cache.get("long") == "value"
+    assert cache.stats()["hits"] == 1
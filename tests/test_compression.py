@@ -0,0 +1,111 @@
+# tests/test_compression.py
+
+import json
+
+import pytest
+import pytest_asyncio
+from fastapi import FastAPI
+from fastapi.responses import StreamingResponse
+from fastapi_cache import FastAPICache
+from fastapi_cache.backends.inmemory import InMemoryBackend
+from httpx import ASGITransport, AsyncClient
+
+from src.backend import cache as cache_module
+from src.backend.cache import cached, cache_tag_index
+from src.backend.compression import CompressionMiddleware, choose_encoding
+
+ITEMS = [{"id": i, "title": f"Resource {i}"} for i in range(200)]
+
+
+@pytest.fixture(name="cache_backend")
+def cache_backend_fixture():
+    """Provides an empty in-memory FastAPICache backend."""
+    FastAPICache.init(InMemoryBackend(), prefix="test-compression")
+    yield FastAPICache.get_backend()
+    FastAPICache.reset()
+    InMemoryBackend._store.clear()
+    cache_tag_index.clear()
+
+
+@pytest_asyncio.fixture
+async def client(cache_backend):
+    app = FastAPI()
+    app.add_middleware(CompressionMiddleware, minimum_size=1024)
+
+    @app.get("/items")
+    async def get_items() -> list[dict]:
+        return ITEMS
+
+    @app.get("/small")
+    async def get_small() -> dict:
+        return {"status": "ok"}
+
+    @app.get("/stream")
+    async def stream():
+        return StreamingResponse((f"{json.dumps(item)}\n" for item in ITEMS), media_type="application/x-ndjson")
+
+    @app.get("/cached")
+    @cached(expire=60, key_builder=lambda kwargs: "items")
+    async def get_cached_items() -> list[dict]:
+        return ITEMS
+
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
+        yield client
+
+
+def test_choose_encoding_prefers_brotli():
+    assert choose_encoding("gzip, deflate, br") == "br"
+    assert choose_encoding("gzip, br;q=0") == "gzip"
+    assert choose_encoding("identity") is None
+
+
+@pytest.mark.asyncio
+async def test_large_responses_are_compressed(client):
+    response = await client.get("/items", headers={"Accept-Encoding": "br, gzip"})
+    assert response.headers["content-encoding"] == "br"
+    assert response.headers["vary"] == "Accept-Encoding"
+    assert response.json() == ITEMS # decoded by httpx
+
+    response = await client.get("/items", headers={"Accept-Encoding": "gzip"})
+    assert response.headers["content-encoding"] == "gzip"
+    assert int(response.headers["content-length"]) < len(json.dumps(ITEMS))
+
+
+@pytest.mark.asyncio
+async def test_small_and_unaccepted_responses_pass_through(client):
+    response = await client.get("/small", headers={"Accept-Encoding": "br, gzip"})
+    assert "content-encoding" not in response.headers
+
+    response = await client.get("/items", headers={"Accept-Encoding": "identity"})
+    assert "content-encoding" not in response.headers
+    assert response.json() == ITEMS
+
+
+@pytest.mark.asyncio
+async def test_streamed_responses_are_compressed_per_chunk(client):
+    response = await client.get("/stream", headers={"Accept-Encoding": "gzip"})
+    assert response.headers["content-encoding"] == "gzip"
+    assert "content-length" not in response.headers
+    assert [json.loads(line) for line in response.text.splitlines()] == ITEMS
+
+
+@pytest.mark.asyncio
+async def test_cached_responses_reuse_their_compressed_copy(client, monkeypatch):
+    """Test that a hot cached entry is compressed once per encoding and then served from the cache."""
+    calls = []
+    compress = cache_module.compress
+    monkeypatch.setattr(cache_module, "compress", lambda data, encoding: calls.append(encoding) or compress(data, encoding))
+
+    for _ in range(3):
+        response = await client.get("/cached", headers={"Accept-Encoding": "br"})
+        assert response.headers["content-encoding"] == "br"
+        assert response.headers["etag"].startswith('W/"')
+        assert response.json() == ITEMS
+    response = await client.get("/cached", headers={"Accept-Encoding": "gzip"})
+    assert response.headers["content-encoding"] == "gzip"
+    assert response.json() == ITEMS
+
+    assert calls == ["br", "gzip"]
+
+    response = await client.get("/cached", headers={"Accept-Encoding": "br", "If-None-Match": response.headers["etag"]})
+    assert response.status_code == 304
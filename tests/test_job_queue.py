@@ -0,0 +1,110 @@
+# tests/test_job_queue.py
+
+import asyncio
+import time
+
+import fakeredis
+import pytest
+
+from src.backend.job_queue import JobWorker, RedisStreamJobQueue, SQLiteJobQueue
+
+
+def make_worker(queue: SQLiteJobQueue, handlers: dict, max_attempts: int = 3) -> JobWorker:
+    return JobWorker(queue, handlers, concurrency=4, max_attempts=max_attempts, backoff=0, backoff_max=0, consumer="test", poll_interval=0.05)
+
+
+async def run_until_idle(worker: JobWorker, queue: SQLiteJobQueue, timeout: float = 5):
+    """Runs the worker until nothing is left ready or leased on the queue."""
+    stop = asyncio.Event()
+    task = asyncio.create_task(worker.run(stop))
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        await asyncio.sleep(0.05)
+        stats = await queue.stats()
+        if not stats["ready"] and not stats["leased"] and not stats["delayed"]:
+            break
+    stop.set()
+    await task
+
+
+@pytest.mark.asyncio
+async def test_worker_runs_and_acknowledges_jobs(job_queue):
+    """Test that a worker runs every enqueued job once and removes it from the queue."""
+    seen = []
+
+    async def record(value: int):
+        seen.append(value)
+
+    for value in range(10):
+        await job_queue.enqueue("record", value=value)
+    worker = make_worker(job_queue, {"record": record})
+    await run_until_idle(worker, job_queue)
+
+    assert sorted(seen) == list(range(10))
+    assert worker.completed == 10
+    assert await job_queue.stats() == {"backend": "sqlite", "ready": 0, "leased": 0, "delayed": 0, "dead": 0}
+
+
+@pytest.mark.asyncio
+async def test_failing_job_is_retried_then_dead_lettered(job_queue):
+    """Test that a job failing on every attempt ends up in the dead-letter queue after max_attempts."""
+    attempts = 0
+
+    async def fail():
+        nonlocal attempts
+        attempts += 1
+        raise RuntimeError("smtp down")
+
+    await job_queue.enqueue("fail")
+    worker = make_worker(job_queue, {"fail": fail}, max_attempts=3)
+    await run_until_idle(worker, job_queue)
+
+    assert attempts == 3
+    assert worker.retried == 2
+    assert worker.dead_lettered == 1
+    assert (await job_queue.stats())["dead"] == 1
+
+
+@pytest.mark.asyncio
+async def test_job_of_a_dead_worker_is_leased_again(tmp_path):
+    """Test that a job whose lease ran out is handed to the next worker."""
+    queue = SQLiteJobQueue(str(tmp_path / "jobs.db"), visibility_timeout=0.1)
+    await queue.enqueue("record", value=1)
+
+    (first,) = await queue.reserve("crashed", count=1, block=0)
+    assert await queue.reserve("other", count=1, block=0) == []
+    await asyncio.sleep(0.15)
+    (second,) = await queue.reserve("other", count=1, block=0)
+
+    assert second.id == first.id
+    assert second.attempts == 2
+    await queue.close()
+
+
+@pytest.mark.asyncio
+async def test_redis_job_reclaimed_from_dead_workers_counts_deliveries():
+    """Test that a job whose workers keep dying counts every delivery and is dead-lettered after max_attempts."""
+    queue = RedisStreamJobQueue(fakeredis.FakeAsyncRedis(), visibility_timeout=0)
+    await queue.enqueue("crash", value=1)
+
+    deliveries = [await queue.reserve(f"worker-{i}", count=1, block=0) for i in range(3)]
+    assert [job.attempts for (job,) in deliveries] == [1, 2, 3]
+    assert len({job.id for (job,) in deliveries}) == 1
+
+    async def crash(value: int):
+        raise AssertionError("the handler of an exhausted job must not run")
+
+    (job,) = await queue.reserve("worker-3", count=1, block=0)
+    worker = make_worker(queue, {"crash": crash}, max_attempts=3)
+    await worker.process(job)
+    assert worker.dead_lettered == 1
+    assert await queue.stats() == {"backend": "redis", "ready": 0, "leased": 0, "delayed": 0, "dead": 1}
+    await queue.close()
+
+
+def test_retry_delay_backs_off_exponentially_up_to_the_cap(job_queue):
+    """Test the retry delay doubles per attempt, stays jittered below the nominal value and is capped."""
+    worker = JobWorker(job_queue, {}, concurrency=1, max_attempts=10, backoff=1, backoff_max=30)
+    assert 0.5 <= worker.retry_delay(1) <= 1
+    assert 4 <= worker.retry_delay(4) <= 8
+    assert 15 <= worker.retry_delay(9) <= 30
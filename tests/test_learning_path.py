@@ -0,0 +1,142 @@
+# tests/test_learning_path.py
+
+import numpy as np
+import pytest
+from fastapi import status
+from httpx import AsyncClient
+from sqlalchemy import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.main import app
+from src.backend import learning_path
+from src.backend.learning_path import LearningPathGraph
+from src.backend.security import get_current_contributor_or_admin_user
+from src.db.models import LearningResource, Skills, User as UserModel, learning_resource_skill_association
+from src.schemas.user_schema import User, UserRole
+
+
+def build_graph(resources: dict[int, tuple[int, list[int]]]) -> LearningPathGraph:
+    """A loaded graph of {resource id: (difficulty, skill ids)}"""
+    graph = LearningPathGraph()
+    graph._install(
+        np.array(list(resources), dtype=np.int64),
+        np.array([difficulty for difficulty, _ in resources.values()], dtype=np.int64),
+        np.array([resource_id for resource_id, (_, skills) in resources.items() for _ in skills], dtype=np.int64),
+        np.array([skill_id for _, skills in resources.values() for skill_id in skills], dtype=np.int64),
+    )
+    graph.loaded = True
+    return graph
+
+
+def test_plan_covers_targets_with_fewest_and_easiest_resources():
+    """Test that a resource teaching more missing skills wins, then the easier one, and the path is ordered by difficulty."""
+    graph = build_graph({
+        1: (5, [1, 2, 3]),
+        2: (1, [1]),
+        3: (2, [4]),
+        4: (1, [4]),
+        5: (3, [2, 3]),
+    })
+    steps, uncovered = graph.plan(known_skill_ids={1}, target_skill_ids={1, 2, 3, 4, 9}, max_steps=10)
+
+    assert [(step.resource_id, step.skill_ids) for step in steps] == [(4, [4]), (5, [2, 3])]
+    assert uncovered == {9}
+
+    steps, uncovered = graph.plan(known_skill_ids=set(), target_skill_ids={1, 2, 3, 4}, max_steps=1)
+    assert [step.resource_id for step in steps] == [1]
+    assert uncovered == {4}
+
+
+def test_overlay_replaces_changed_rows_until_compacted(monkeypatch):
+    """Test that planning sees changed resources from the overlay and again after they are merged into the arrays."""
+    monkeypatch.setattr(learning_path, "OVERLAY_LIMIT", 1)
+    graph = build_graph({1: (1, [1]), 2: (2, [2])})
+    graph.alive[0] = False
+    graph._overlay = {1: (3, frozenset({2})), 3: (1, frozenset({1, 2}))}
+
+    steps, _ = graph.plan(set(), {1, 2}, max_steps=10)
+    assert [step.resource_id for step in steps] == [3]
+
+    graph._compact()
+    assert graph.ids.tolist() == [1, 2, 3]
+    assert graph.difficulty.tolist() == [3, 2, 1]
+    steps, _ = graph.plan(set(), {1, 2}, max_steps=10)
+    assert [step.resource_id for step in steps] == [3]
+    assert graph.stats()["resources"] == 3
+
+
+@pytest.mark.asyncio
+async def test_refresh_reloads_stale_resources(session: AsyncSession):
+    """Test that the graph loads on first use and reloads changed and deleted resources."""
+    session.add_all([Skills(id=1, title="Python"), Skills(id=2, title="SQL")])
+    session.add_all([LearningResource(id=i, title=f"Resource {i}", resource_type="article", difficulty=i) for i in (1, 2)])
+    await session.flush()
+    await session.execute(insert(learning_resource_skill_association), [
+        {"skill_id": 1, "learning_resource_id": 1},
+        {"skill_id": 2, "learning_resource_id": 2},
+    ])
+    await session.commit()
+
+    graph = LearningPathGraph()
+    await graph.refresh(session)
+    assert [step.resource_id for step in graph.plan(set(), {1, 2}, 10)[0]] == [1, 2]
+
+    await session.execute(insert(learning_resource_skill_association), [{"skill_id": 2, "learning_resource_id": 1}])
+    await session.delete(await session.get(LearningResource, 2))
+    await session.commit()
+    graph.mark_stale(1, 2)
+    await graph.refresh(session)
+
+    steps, uncovered = graph.plan(set(), {1, 2}, 10)
+    assert [(step.resource_id, step.skill_ids) for step in steps] == [(1, [1, 2])]
+    assert not uncovered
+
+
+@pytest.fixture
+def override_contributor_dependency():
+    """Overrides get_current_contributor_or_admin_user to return a contributor."""
+    user = User(id=1, email="contributor@example.com", name="Contributor", is_active=True, password="hashed_password", role=UserRole.contributor)
+    app.dependency_overrides[get_current_contributor_or_admin_user] = lambda: user
+    yield
+    app.dependency_overrides.pop(get_current_contributor_or_admin_user, None)
+
+
+@pytest.mark.asyncio
+async def test_learning_path_endpoint(client: AsyncClient, session: AsyncSession, override_contributor_dependency, learning_path_graph):
+    """Test the path from the skills of a user to target skills, and that it follows resource updates."""
+    session.add(UserModel(id=1, name="Contributor", email="contributor@example.com", hashed_password="x"))
+    await session.commit()
+    rows = [
+        {"title": "Intro", "url": "http://example.com/1", "resource_type": "article", "difficulty": 1, "skills": ["Python"]},
+        {"title": "Queries", "url": "http://example.com/2", "resource_type": "article", "difficulty": 2, "skills": ["Python", "SQL"]},
+        {"title": "Tuning", "url": "http://example.com/3", "resource_type": "course", "difficulty": 4, "skills": ["SQL", "Indexes"]},
+    ]
+    assert (await client.post("/resources/bulk", json=rows)).json()["created"] == 3
+    skills = {skill["title"]: skill["id"] for skill in (await client.get("/skills/")).json()}
+
+    # the bulk load created the skills for user 1, who therefore knows them all
+    response = await client.get("/user/me/learning_path", params={"user_id": 1, "target_skill_ids": [skills["SQL"]]})
+    assert response.status_code == status.HTTP_200_OK
+    assert response.json()["steps"] == []
+
+    session.add(UserModel(id=2, name="Learner", email="learner@example.com", hashed_password="x"))
+    await session.commit()
+
+    params = {"user_id": 2, "target_skill_ids": [skills["Python"], skills["SQL"], skills["Indexes"], 999]}
+    path = (await client.get("/user/me/learning_path", params=params)).json()
+    assert [(step["resource"]["title"], step["skill_ids"]) for step in path["steps"]] == [
+        ("Queries", sorted([skills["Python"], skills["SQL"]])),
+        ("Tuning", [skills["Indexes"]]),
+    ]
+    assert path["known_skill_ids"] == []
+    assert path["uncovered_skill_ids"] == [999]
+
+    tuning = path["steps"][1]["resource"]
+    update = {key: value for key, value in rows[2].items() if key != "skills"}
+    await client.put(f"/resources/{tuning['id']}/update", json={**update, "difficulty": 1})
+    # an easy Tuning now teaches SQL, leaving Python to the easier Intro
+    path = (await client.get("/user/me/learning_path", params=params)).json()
+    assert [step["resource"]["title"] for step in path["steps"]] == ["Intro", "Tuning"]
+    assert learning_path_graph.stats()["overlay"] == 1
+
+    assert (await client.get("/user/me/learning_path", params={"user_id": 999, "target_skill_ids": [1]})).status_code == status.HTTP_404_NOT_FOUND
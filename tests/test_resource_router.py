@@ -1,5 +1,8 @@
 # tests/test_routers/test_resources.py
 
+import hashlib
+from pathlib import Path
+
 import pytest
 from httpx import AsyncClient
 from sqlalchemy.ext.asyncio import AsyncSession
@@ -7,6 +10,9 @@ from fastapi import status
 
 # Import dependencies and schemas from your application
 from src.main import app
+from src.utils.image_utils import RESOURCE_IMAGES_DIR
+from tests.conftest import TestingSessionLocal
+from fastapi_cache import FastAPICache
 from src.backend.session import get_async_session
 from src.backend.security import get_current_contributor_or_admin_user, get_current_admin_user
 from src.schemas.user_schema import User, UserRole
@@ -72,7 +78,7 @@ async def test_get_all_resources_empty(client: AsyncClient):
     """Test getting all resources when none exist."""
     response = await client.get("/resources/")
     assert response.status_code == status.HTTP_200_OK
-    assert response.json() == []
+    assert response.json() == {"items": [], "next_cursor": None}
 
 @pytest.mark.asyncio
 async def test_create_resource_success(client: AsyncClient, session: AsyncSession, override_contributor_admin_dependency):
@@ -97,8 +103,73 @@ async def test_create_resource_success(client: AsyncClient, session: AsyncSessio
     # Test cache invalidation: A subsequent GET /resources/ should reflect the new resource
     response_get = await client.get("/resources/")
     assert response_get.status_code == status.HTTP_200_OK
-    assert len(response_get.json()) == 1
-    assert response_get.json()[0]["title"] == "New Article" # Ensure new resource is returned
+    assert len(response_get.json()["items"]) == 1
+    assert response_get.json()["items"][0]["title"] == "New Article" # Ensure new resource is returned
+
+@pytest.mark.asyncio
+async def test_get_resources_paginated(client: AsyncClient, session: AsyncSession):
+    """Test walking all resources page by page with next_cursor."""
+    service = LearningResourceService(session)
+    for i in range(5):
+        await service.create_new_resource(
+            LearningResourceCreate(
+                title=f"Paged Resource {i}",
+                url=f"http://example.com/paged/{i}",
+                resource_type=LearningResourceType.article,
+                difficulty=1
+            )
+        )
+
+    titles = []
+    cursor = None
+    pages = 0
+    while True:
+        params = {"limit": 2}
+        if cursor:
+            params["cursor"] = cursor
+        response = await client.get("/resources/", params=params)
+        assert response.status_code == status.HTTP_200_OK
+        page = response.json()
+        assert len(page["items"]) <= 2
+        titles.extend(item["title"] for item in page["items"])
+        pages += 1
+        cursor = page["next_cursor"]
+        if cursor is None:
+            break
+
+    assert pages == 3
+    assert titles == [f"Paged Resource {i}" for i in range(5)]
+
+
+@pytest.mark.asyncio
+async def test_get_resources_invalid_cursor(client: AsyncClient):
+    """Test that a malformed cursor is rejected."""
+    response = await client.get("/resources/", params={"cursor": "not-a-cursor"})
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+
+@pytest.mark.asyncio
+async def test_stream_resources(client: AsyncClient, session: AsyncSession):
+    """Test streaming every resource as NDJSON."""
+    import json
+
+    service = LearningResourceService(session)
+    for i in range(3):
+        await service.create_new_resource(
+            LearningResourceCreate(
+                title=f"Streamed Resource {i}",
+                url=f"http://example.com/streamed/{i}",
+                resource_type=LearningResourceType.video,
+                difficulty=2
+            )
+        )
+
+    response = await client.get("/resources/stream")
+    assert response.status_code == status.HTTP_200_OK
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    rows = [json.loads(line) for line in response.text.splitlines()]
+    assert [row["title"] for row in rows] == [f"Streamed Resource {i}" for i in range(3)]
+
 
 @pytest.mark.asyncio
 async def test_create_resource_unauthorized(client: AsyncClient):
@@ -184,7 +255,7 @@ async def test_update_resource_success(client: AsyncClient, session: AsyncSessio
 
     # Test cache invalidation: GET /resources/ and specific ID should reflect update
     response_get_all = await client.get("/resources/")
-    assert response_get_all.json()[0]["title"] == "Updated Title"
+    assert response_get_all.json()["items"][0]["title"] == "Updated Title"
     response_get_id = await client.get(f"/resources/{resource_id}")
     assert response_get_id.json()["title"] == "Updated Title"
 
@@ -214,7 +285,7 @@ async def test_delete_resource_success(client: AsyncClient, session: AsyncSessio
 
     # Test cache invalidation: GET /resources/ should not return the deleted resource
     response_get_all = await client.get("/resources/")
-    assert len(response_get_all.json()) == 0
+    assert len(response_get_all.json()["items"]) == 0
 
 
 @pytest.mark.asyncio
@@ -316,23 +387,41 @@ async def test_delete_skill_from_resource_success(client: AsyncClient, session:
 
 
 @pytest.mark.asyncio
-async def test_log_view_success(client: AsyncClient):
-    """Test logging a resource view."""
-    # For background tasks, we mostly test that the endpoint returns 200 OK
-    # and the task is added. Verifying the task itself would involve mocking
-    # the background task dispatcher or the log_resource_view function.
+async def test_log_view_success(client: AsyncClient, view_counter):
+    """Test logging a resource view only aggregates it, without writing to the database."""
     resource_id = 1
     user_id = TEST_CONTRIBUTOR_USER.id # Example user ID
     response = await client.post(f"/resources/{resource_id}/log_view", params={"user_id": user_id})
     assert response.status_code == status.HTTP_200_OK
     assert response.json() == {"message": "View logged"}
+    assert view_counter.stats()["recorded"] == 1
 
-    # More advanced testing would involve mocking `src.tasks.log_resource_view`
-    # to assert it was called with correct arguments.
-    # from unittest.mock import patch
-    # with patch('src.tasks.log_resource_view') as mock_log_view:
-    #    response = await client.post(f"/resources/{resource_id}/log_view", params={"user_id": user_id})
-    #    mock_log_view.assert_called_once_with(resource_id, user_id)
+
+@pytest.mark.asyncio
+async def test_view_counts_after_flush(client: AsyncClient, session: AsyncSession, view_counter):
+    """Test that flushed views are added up per resource and ranked by the most viewed endpoint."""
+    service = LearningResourceService(session)
+    resources = [
+        await service.create_new_resource(LearningResourceCreate(title=f"Viewed {i}", url=f"http://example.com/{i}", resource_type=LearningResourceType.article, difficulty=1))
+        for i in range(3)
+    ]
+    for resource, views in zip(resources, [2, 5, 0]):
+        for _ in range(views):
+            await client.post(f"/resources/{resource.id}/log_view", params={"user_id": 1})
+    await view_counter.flush(TestingSessionLocal)
+    # a second flush adds to the stored totals
+    await client.post(f"/resources/{resources[0].id}/log_view", params={"user_id": 1})
+    await view_counter.flush(TestingSessionLocal)
+
+    response = await client.get(f"/resources/{resources[0].id}/views")
+    assert response.status_code == status.HTTP_200_OK
+    assert response.json() == {"resource_id": resources[0].id, "title": "Viewed 0", "view_count": 3}
+    assert (await client.get(f"/resources/{resources[2].id}/views")).json()["view_count"] == 0
+    assert (await client.get("/resources/999/views")).status_code == status.HTTP_404_NOT_FOUND
+
+    response = await client.get("/resources/most_viewed", params={"limit": 5})
+    assert response.status_code == status.HTTP_200_OK
+    assert [(item["title"], item["view_count"]) for item in response.json()] == [("Viewed 1", 5), ("Viewed 0", 3)]
 
 
 @pytest.mark.asyncio
@@ -351,8 +440,8 @@ async def test_upload_resource_image_success(client: AsyncClient, session: Async
     )
     resource_id = resource.id
 
-    # Create a dummy image file for upload
-    image_content = b"fake image data"
+    # Create a dummy image file for upload, the content has to start with the PNG signature
+    image_content = b"\x89PNG\r\n\x1a\n" + b"fake image data"
     files = {"image_file": ("test_image.png", image_content, "image/png")}
 
     response = await client.post(f"/resources/{resource_id}/upload_image", files=files)
@@ -360,6 +449,7 @@ async def test_upload_resource_image_success(client: AsyncClient, session: Async
     assert "Image uploaded successfully" in response.json()["message"]
     assert "image_url" in response.json()
     assert response.json()["content_type"] == "image/png"
+    assert response.json()["sha256"] == hashlib.sha256(image_content).hexdigest()
 
     # Verify the file was actually written to the static directory (optional, but good for full integration)
     from pathlib import Path
@@ -395,4 +485,492 @@ async def test_upload_resource_image_invalid_type(client: AsyncClient, session:
 
     response = await client.post(f"/resources/{resource_id}/upload_image", files=files)
     assert response.status_code == status.HTTP_400_BAD_REQUEST
-    assert response.json()["detail"] == "Only image files are allowed."
\ No newline at end of file
+    assert response.json()["detail"] == "Only image files are allowed."
+
+@pytest.mark.asyncio
+async def test_upload_resource_image_checks_content_not_declared_type(client: AsyncClient, session: AsyncSession):
+    """Test that a file declared as an image but not starting with an image signature is rejected and not kept."""
+    resource = await LearningResourceService(session).create_new_resource(
+        LearningResourceCreate(title="Disguised", url="http://example.com/disguised", resource_type=LearningResourceType.article, difficulty=1)
+    )
+    files_before = set(RESOURCE_IMAGES_DIR.glob("*")) if RESOURCE_IMAGES_DIR.exists() else set()
+
+    files = {"image_file": ("script.png", b"#!/bin/sh\necho not an image", "image/png")}
+    response = await client.post(f"/resources/{resource.id}/upload_image", files=files)
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+    assert set(RESOURCE_IMAGES_DIR.glob("*")) == files_before
+
+
+@pytest.mark.asyncio
+async def test_put_resource_image_streams_body_with_size_limit(client: AsyncClient, session: AsyncSession, monkeypatch):
+    """Test the raw body upload stores the image, and rejects one past the size limit."""
+    from src.backend.config import config
+
+    resource = await LearningResourceService(session).create_new_resource(
+        LearningResourceCreate(title="Streamed", url="http://example.com/streamed", resource_type=LearningResourceType.article, difficulty=1)
+    )
+    image_content = b"\xff\xd8\xff\xe0" + b"\x00" * 4096
+    monkeypatch.setattr(config, "image_upload_max_bytes", 4096)
+
+    async def body():
+        # chunked, so only the streaming check can catch it
+        for start in range(0, len(image_content), 1024):
+            yield image_content[start:start + 1024]
+
+    response = await client.put(f"/resources/{resource.id}/image", content=body(), headers={"Content-Type": "image/jpeg"})
+    assert response.status_code == 413
+
+    monkeypatch.setattr(config, "image_upload_max_bytes", 1024 * 1024)
+    response = await client.put(f"/resources/{resource.id}/image", content=image_content, headers={"Content-Type": "image/jpeg"})
+    assert response.status_code == status.HTTP_200_OK
+    assert response.json()["content_type"] == "image/jpeg"
+    assert response.json()["file_size"] == len(image_content)
+
+    stored = RESOURCE_IMAGES_DIR / response.json()["filename"]
+    assert stored.read_bytes() == image_content
+    assert (await client.get(f"/resources/{resource.id}/views")).status_code == status.HTTP_200_OK
+    stored.unlink()
+
+
+@pytest.mark.asyncio
+async def test_identical_images_share_one_blob_until_unreferenced(client: AsyncClient, session: AsyncSession, override_contributor_admin_dependency):
+    """Test that identical uploads are stored once and the file is collected when its last resource lets go."""
+    service = LearningResourceService(session)
+    first, second = [
+        await service.create_new_resource(
+            LearningResourceCreate(title=title, url=f"http://example.com/{title}", resource_type=LearningResourceType.article, difficulty=1)
+        )
+        for title in ("first", "second")
+    ]
+    image_content = b"GIF89a" + b"shared pixels"
+    other_content = b"GIF89a" + b"other pixels"
+    blob = RESOURCE_IMAGES_DIR / f"{hashlib.sha256(image_content).hexdigest()}.gif"
+    other_blob = RESOURCE_IMAGES_DIR / f"{hashlib.sha256(other_content).hexdigest()}.gif"
+
+    urls = []
+    for resource in (first, second):
+        response = await client.put(f"/resources/{resource.id}/image", content=image_content, headers={"Content-Type": "image/gif"})
+        assert response.status_code == status.HTTP_200_OK
+        urls.append(response.json()["image_url"])
+    assert urls[0] == urls[1] == f"/static/resource_images/{blob.name}"
+    assert blob.exists()
+    assert not list(RESOURCE_IMAGES_DIR.glob(".*.part"))
+
+    # replacing one image keeps the blob alive for the other resource
+    response = await client.put(f"/resources/{first.id}/image", content=other_content, headers={"Content-Type": "image/gif"})
+    assert response.status_code == status.HTTP_200_OK
+    assert blob.exists() and other_blob.exists()
+
+    assert (await client.delete(f"/resources/{second.id}/delete")).status_code == status.HTTP_200_OK
+    assert not blob.exists()
+
+    # uploading the image a resource already has does not add a reference
+    await client.put(f"/resources/{first.id}/image", content=other_content, headers={"Content-Type": "image/gif"})
+    assert (await client.delete(f"/resources/{first.id}/delete")).status_code == status.HTTP_200_OK
+    assert not other_blob.exists()
+
+
+@pytest.mark.asyncio
+async def test_failed_image_upload_rolls_back_its_blob(client: AsyncClient, session: AsyncSession, override_contributor_admin_dependency, monkeypatch):
+    """Test that an upload failing after its file was moved in place deletes a new blob and keeps a shared one."""
+    from sqlalchemy import select
+    from src.db.models import ImageBlob, LearningResource
+    from src.services.image_service import ImageBlobService
+
+    service = LearningResourceService(session)
+    first, second = [
+        await service.create_new_resource(
+            LearningResourceCreate(title=title, url=f"http://example.com/{title}", resource_type=LearningResourceType.article, difficulty=1)
+        )
+        for title in ("kept", "failed")
+    ]
+    # the request shares the session, its rollback expires these objects
+    first_id, second_id = first.id, second.id
+    shared_content = b"GIF89a" + b"kept pixels"
+    new_content = b"GIF89a" + b"failed pixels"
+    shared_blob = RESOURCE_IMAGES_DIR / f"{hashlib.sha256(shared_content).hexdigest()}.gif"
+    new_blob = RESOURCE_IMAGES_DIR / f"{hashlib.sha256(new_content).hexdigest()}.gif"
+    response = await client.put(f"/resources/{first_id}/image", content=shared_content, headers={"Content-Type": "image/gif"})
+    assert response.status_code == status.HTTP_200_OK
+
+    async def failing_release(self, url):
+        raise RuntimeError("database went away")
+    monkeypatch.setattr(ImageBlobService, "release", failing_release)
+
+    for content in (new_content, shared_content):
+        response = await client.put(f"/resources/{second_id}/image", content=content, headers={"Content-Type": "image/gif"})
+        assert response.status_code == status.HTTP_500_INTERNAL_SERVER_ERROR
+    assert not new_blob.exists()
+    assert shared_blob.exists()
+    assert not list(RESOURCE_IMAGES_DIR.glob(".*.part"))
+
+    async with TestingSessionLocal() as check:
+        blobs = dict((await check.execute(select(ImageBlob.url, ImageBlob.ref_count))).all())
+        resource_image = (await check.get(LearningResource, second_id)).image_path
+    assert blobs == {f"/static/resource_images/{shared_blob.name}": 1}
+    assert resource_image is None
+
+    monkeypatch.undo()
+    assert (await client.delete(f"/resources/{first_id}/delete")).status_code == status.HTTP_200_OK
+    assert not shared_blob.exists()
+
+
+@pytest.mark.asyncio
+async def test_uploaded_image_gets_thumbnail_variants(client: AsyncClient, session: AsyncSession, override_contributor_admin_dependency):
+    """Test that an upload renders WebP and original-format thumbnails, exposed on the resource and collected with it."""
+    import io
+    from PIL import Image
+
+    resource = await LearningResourceService(session).create_new_resource(
+        LearningResourceCreate(title="Pictured", url="http://example.com/pictured", resource_type=LearningResourceType.article, difficulty=1)
+    )
+    buffer = io.BytesIO()
+    Image.new("RGB", (800, 400), color=(200, 30, 30)).save(buffer, format="PNG")
+
+    response = await client.put(f"/resources/{resource.id}/image", content=buffer.getvalue(), headers={"Content-Type": "image/png"})
+    assert response.status_code == status.HTTP_200_OK
+
+    variants = (await client.get(f"/resources/{resource.id}")).json()["image_variants"]
+    assert {(variant["width"], variant["format"]) for variant in variants} == {(160, "webp"), (160, "png"), (480, "webp"), (480, "png")}
+    paths = {variant["format"]: Path("static") / Path(variant["url"]).relative_to("/static") for variant in variants if variant["width"] == 160}
+    with Image.open(paths["webp"]) as thumbnail:
+        assert thumbnail.format == "WEBP"
+        assert thumbnail.size == (160, 80)
+
+    assert (await client.delete(f"/resources/{resource.id}/delete")).status_code == status.HTTP_200_OK
+    assert not any(path.exists() for path in paths.values())
+
+
+@pytest.mark.asyncio
+async def test_update_resource_evicts_only_its_cache_entries(client: AsyncClient, session: AsyncSession, override_contributor_admin_dependency):
+    """Test that a write evicts the cached entries of the changed resource and keeps the others."""
+    from fastapi_cache import FastAPICache
+
+    service = LearningResourceService(session)
+    changed, untouched = [
+        await service.create_new_resource(
+            LearningResourceCreate(
+                title=title,
+                url=f"http://example.com/{title}",
+                resource_type=LearningResourceType.article,
+                difficulty=1
+            )
+        )
+        for title in ("changed", "untouched")
+    ]
+    # first page holds only "changed", the tail page only "untouched"
+    first_page = await client.get("/resources/", params={"limit": 1})
+    await client.get(f"/resources/{changed.id}")
+    await client.get(f"/resources/{untouched.id}")
+
+    backend = FastAPICache.get_backend()
+    first_page_key = "fastapi-cache:resources:list:limit=1:cursor="
+    tail_page_key = f"fastapi-cache:resources:list:limit=1:cursor={first_page.json()['next_cursor']}"
+    await client.get("/resources/", params={"limit": 1, "cursor": first_page.json()["next_cursor"]})
+    assert await backend.get(first_page_key) is not None
+    assert await backend.get(tail_page_key) is not None
+
+    response = await client.put(f"/resources/{changed.id}/update", json={
+        "title": "changed again",
+        "url": "http://example.com/changed",
+        "resource_type": "article",
+        "difficulty": 2
+    })
+    assert response.status_code == status.HTTP_200_OK
+
+    assert await backend.get(f"fastapi-cache:resources:resource_id={changed.id}") is None
+    assert await backend.get(first_page_key) is None
+    assert await backend.get(f"fastapi-cache:resources:resource_id={untouched.id}") is not None
+    assert await backend.get(tail_page_key) is not None
+    assert (await client.get(f"/resources/{changed.id}")).json()["title"] == "changed again"
+
+
+@pytest.mark.asyncio
+async def test_get_resource_conditional_requests(client: AsyncClient, session: AsyncSession, override_contributor_admin_dependency):
+    """Test that a resource answers If-None-Match and If-Modified-Since with 304 until it changes."""
+    resource = await LearningResourceService(session).create_new_resource(
+        LearningResourceCreate(title="Polled", url="http://example.com/polled", resource_type=LearningResourceType.article, difficulty=1)
+    )
+    first = await client.get(f"/resources/{resource.id}")
+    assert first.status_code == status.HTTP_200_OK
+    etag, last_modified = first.headers["etag"], first.headers["last-modified"]
+
+    # served from the cache entry and from a recomputed one alike
+    for _ in range(2):
+        response = await client.get(f"/resources/{resource.id}", headers={"If-None-Match": etag})
+        assert response.status_code == status.HTTP_304_NOT_MODIFIED
+        assert response.content == b""
+        assert response.headers["etag"] == etag
+        FastAPICache.get_backend()._store.clear()
+    response = await client.get(f"/resources/{resource.id}", headers={"If-Modified-Since": last_modified})
+    assert response.status_code == status.HTTP_304_NOT_MODIFIED
+
+    await client.put(f"/resources/{resource.id}/update", json={
+        "title": "Polled again", "url": "http://example.com/polled", "resource_type": "article", "difficulty": 1
+    })
+    response = await client.get(f"/resources/{resource.id}", headers={"If-None-Match": etag})
+    assert response.status_code == status.HTTP_200_OK
+    assert response.headers["etag"] != etag
+    assert response.json()["title"] == "Polled again"
+
+
+@pytest.mark.asyncio
+async def test_bulk_create_resources_json(client: AsyncClient, session: AsyncSession, override_contributor_admin_dependency):
+    """Test bulk creation from a JSON array, with skills and a rejected row."""
+    rows = [
+        {"title": f"Bulk {i}", "url": f"http://example.com/bulk/{i}", "resource_type": "article", "difficulty": 2, "skills": ["Python", f"Topic {i % 2}"]}
+        for i in range(5)
+    ]
+    rows.insert(2, {"title": "Broken", "url": "http://example.com/broken", "resource_type": "podcast", "difficulty": 9})
+
+    response = await client.post("/resources/bulk", params={"batch_size": 2}, json=rows)
+    assert response.status_code == status.HTTP_201_CREATED
+    result = response.json()
+    assert result["created"] == 5
+    assert result["failed"] == 1
+    assert result["errors"][0]["index"] == 2
+
+    resources = await LearningResourceService(session).get_all_resources()
+    assert len(resources) == 5
+    assert {skill.title for skill in resources[0].skills} == {"Python", "Topic 0"}
+    # skills are shared by title, not duplicated per resource
+    assert len({skill.id for resource in resources for skill in resource.skills}) == 3
+
+
+@pytest.mark.asyncio
+async def test_bulk_create_resources_ndjson(client: AsyncClient, override_contributor_admin_dependency):
+    """Test bulk creation from an NDJSON stream with an unparsable line."""
+    import json
+
+    lines = [json.dumps({"title": f"Line {i}", "url": "http://example.com/line", "resource_type": "video", "difficulty": 1}) for i in range(3)]
+    lines.insert(1, "{not json")
+    response = await client.post(
+        "/resources/bulk",
+        content="\n".join(lines).encode(),
+        headers={"Content-Type": "application/x-ndjson"},
+    )
+    assert response.status_code == status.HTTP_201_CREATED
+    assert response.json()["created"] == 3
+    assert response.json()["errors"][0]["index"] == 1
+
+    listing = await client.get("/resources/")
+    assert [item["title"] for item in listing.json()["items"]] == ["Line 0", "Line 1", "Line 2"]
+
+
+@pytest.mark.asyncio
+async def test_search_resources_ranks_and_filters(client: AsyncClient, session: AsyncSession):
+    """Test full-text search with title matches ranked first, prefix matching and filters."""
+    service = LearningResourceService(session)
+    resources = [
+        ("Cooking basics", "A gentle introduction to python snakes in the kitchen", LearningResourceType.video, 1),
+        ("Python for beginners", "Learn programming step by step", LearningResourceType.article, 1),
+        ("Advanced Python", "Decorators, generators and metaclasses", LearningResourceType.course, 4),
+    ]
+    for title, description, resource_type, difficulty in resources:
+        await service.create_new_resource(
+            LearningResourceCreate(title=title, description=description, url="http://example.com/search", resource_type=resource_type, difficulty=difficulty)
+        )
+
+    response = await client.get("/resources/search", params={"q": "python"})
+    assert response.status_code == status.HTTP_200_OK
+    titles = [item["title"] for item in response.json()["items"]]
+    assert set(titles[:2]) == {"Python for beginners", "Advanced Python"}
+    assert titles[2] == "Cooking basics"
+
+    # words also match longer words they start
+    response = await client.get("/resources/search", params={"q": "metacl"})
+    assert [item["title"] for item in response.json()["items"]] == ["Advanced Python"]
+
+    response = await client.get("/resources/search", params={"q": "python", "difficulty": 4})
+    assert [item["title"] for item in response.json()["items"]] == ["Advanced Python"]
+    response = await client.get("/resources/search", params={"q": "python", "resource_type": "video"})
+    assert [item["title"] for item in response.json()["items"]] == ["Cooking basics"]
+
+    response = await client.get("/resources/search", params={"q": "python", "limit": 2})
+    assert len(response.json()["items"]) == 2
+    assert response.json()["next_offset"] == 2
+    response = await client.get("/resources/search", params={"q": "python", "limit": 2, "offset": 2})
+    assert [item["title"] for item in response.json()["items"]] == ["Cooking basics"]
+    assert response.json()["next_offset"] is None
+
+
+@pytest.mark.asyncio
+async def test_search_index_follows_updates_and_deletes(client: AsyncClient, session: AsyncSession, override_contributor_admin_dependency):
+    """Test that the search index is kept current as resources change."""
+    service = LearningResourceService(session)
+    resource = await service.create_new_resource(
+        LearningResourceCreate(title="Rust ownership", url="http://example.com/rust", resource_type=LearningResourceType.article, difficulty=3)
+    )
+    await service.update_resource(
+        resource.id,
+        LearningResourceCreate(title="Borrow checker guide", url="http://example.com/rust", resource_type=LearningResourceType.article, difficulty=3),
+    )
+
+    response = await client.get("/resources/search", params={"q": "ownership"})
+    assert response.json()["items"] == []
+    response = await client.get("/resources/search", params={"q": "borrow checker"})
+    assert [item["id"] for item in response.json()["items"]] == [resource.id]
+
+    await service.delete_resource(resource.id)
+    response = await client.get("/resources/search", params={"q": "borrow"})
+    assert response.json()["items"] == []
+
+    # punctuation only queries match nothing instead of failing
+    response = await client.get("/resources/search", params={"q": "\"*)"})
+    assert response.status_code == status.HTTP_200_OK
+    assert response.json()["items"] == []
+
+
+@pytest.mark.asyncio
+async def test_get_resources_filtered_and_sorted(client: AsyncClient, session: AsyncSession):
+    """Test filters and sort orders of the listing, paged with cursors that carry the sort key."""
+    service = LearningResourceService(session)
+    for i, (resource_type, difficulty) in enumerate([
+        (LearningResourceType.article, 3), (LearningResourceType.video, 1), (LearningResourceType.article, 5),
+        (LearningResourceType.course, 3), (LearningResourceType.article, 1),
+    ]):
+        await service.create_new_resource(
+            LearningResourceCreate(title=f"Sorted {i}", url="http://example.com/sorted", resource_type=resource_type, difficulty=difficulty)
+        )
+
+    async def walk(**params) -> list[str]:
+        titles, cursor = [], None
+        while True:
+            response = await client.get("/resources/", params={**params, "limit": 2, **({"cursor": cursor} if cursor else {})})
+            assert response.status_code == status.HTTP_200_OK
+            titles.extend(item["title"] for item in response.json()["items"])
+            cursor = response.json()["next_cursor"]
+            if cursor is None:
+                return titles
+
+    assert await walk(resource_type="article") == ["Sorted 0", "Sorted 2", "Sorted 4"]
+    assert await walk(sort="-created_at") == [f"Sorted {i}" for i in reversed(range(5))]
+    assert await walk(sort="difficulty") == ["Sorted 1", "Sorted 4", "Sorted 0", "Sorted 3", "Sorted 2"]
+    assert await walk(sort="-difficulty", resource_type="article") == ["Sorted 2", "Sorted 0", "Sorted 4"]
+    assert await walk(difficulty=3) == ["Sorted 0", "Sorted 3"]
+
+    # a cursor of the created_at order cannot continue a difficulty order
+    cursor = (await client.get("/resources/", params={"limit": 1})).json()["next_cursor"]
+    response = await client.get("/resources/", params={"sort": "difficulty", "cursor": cursor})
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+
+@pytest.mark.asyncio
+async def test_filtered_listing_is_invalidated_by_updates(client: AsyncClient, session: AsyncSession, override_contributor_admin_dependency):
+    """Test that a cached filtered listing picks up a resource whose difficulty changed."""
+    service = LearningResourceService(session)
+    resource = await service.create_new_resource(
+        LearningResourceCreate(title="Moving", url="http://example.com/moving", resource_type=LearningResourceType.book, difficulty=2)
+    )
+    response = await client.get("/resources/", params={"difficulty": 4})
+    assert response.json()["items"] == []
+
+    response = await client.put(
+        f"/resources/{resource.id}/update",
+        json={"title": "Moving", "url": "http://example.com/moving", "resource_type": "book", "difficulty": 4},
+    )
+    assert response.status_code == status.HTTP_200_OK
+    response = await client.get("/resources/", params={"difficulty": 4})
+    assert [item["title"] for item in response.json()["items"]] == ["Moving"]
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("precomputed", [False, True])
+async def test_related_resources(client: AsyncClient, override_contributor_admin_dependency, related_resources, precomputed):
+    """Test that related resources rank by shared skills the same from the database and from the precomputed neighbours."""
+    rows = [
+        {"title": "Base", "url": "http://example.com/base", "resource_type": "article", "difficulty": 1, "skills": ["Python", "SQL", "Docker"]},
+        {"title": "Twin", "url": "http://example.com/twin", "resource_type": "article", "difficulty": 1, "skills": ["Python", "SQL", "Docker"]},
+        {"title": "Half", "url": "http://example.com/half", "resource_type": "video", "difficulty": 2, "skills": ["Python", "Rust"]},
+        {"title": "Near", "url": "http://example.com/near", "resource_type": "course", "difficulty": 3, "skills": ["SQL", "Docker"]},
+        {"title": "Apart", "url": "http://example.com/apart", "resource_type": "book", "difficulty": 4, "skills": ["Go"]},
+    ]
+    assert (await client.post("/resources/bulk", json=rows)).json()["created"] == 5
+    ids = {item["title"]: item["id"] for item in (await client.get("/resources/")).json()["items"]}
+    if precomputed:
+        await related_resources.refresh(TestingSessionLocal)
+
+    response = await client.get(f"/resources/{ids['Base']}/related")
+    assert response.status_code == status.HTTP_200_OK
+    related = [(item["resource"]["title"], round(item["similarity"], 2)) for item in response.json()]
+    assert related == [("Twin", 1.0), ("Near", 0.67), ("Half", 0.25)]
+    assert related_resources.lookups == (1 if precomputed else 0)
+
+    response = await client.get(f"/resources/{ids['Half']}/related", params={"limit": 1})
+    assert [item["resource"]["title"] for item in response.json()] == ["Base"]
+    assert (await client.get(f"/resources/{ids['Apart']}/related")).json() == []
+    assert (await client.get("/resources/999/related")).status_code == status.HTTP_404_NOT_FOUND
+
+
+@pytest.mark.asyncio
+async def test_set_resource_skills(client: AsyncClient, session: AsyncSession, override_contributor_admin_dependency, skill_index):
+    """Test attaching and detaching skills in bulk by id and title, and that cached reads and the skill index follow."""
+    resource = await LearningResourceService(session).create_new_resource(
+        LearningResourceCreate(title="Tagged", url="http://example.com/tagged", resource_type=LearningResourceType.article, difficulty=1)
+    )
+    await client.post("/skills/create", json={"title": "Python"})
+    python_id = (await client.get("/skills/")).json()[0]["id"]
+    await skill_index.rebuild(TestingSessionLocal)
+    assert (await client.get(f"/resources/{resource.id}")).json()["skills"] == []
+
+    response = await client.put(f"/resources/{resource.id}/skills", json={"skill_ids": [python_id], "titles": ["SQL", "Python", "Docker"]})
+    assert response.status_code == status.HTTP_200_OK
+    result = response.json()
+    assert sorted(skill["title"] for skill in result["skills"]) == ["Docker", "Python", "SQL"]
+    assert len(result["added"]) == 3 and len(result["created"]) == 2 and result["removed"] == []
+    assert sorted(skill["title"] for skill in (await client.get(f"/resources/{resource.id}")).json()["skills"]) == ["Docker", "Python", "SQL"]
+    assert [item["title"] for item in (await client.get(f"/skills/{python_id}/resources")).json()["items"]] == ["Tagged"]
+
+    # the same set again changes nothing, a smaller set detaches the rest
+    response = await client.put(f"/resources/{resource.id}/skills", json={"titles": ["SQL", "Python", "Docker"]})
+    assert response.json()["added"] == [] and response.json()["removed"] == []
+    response = await client.put(f"/resources/{resource.id}/skills", json={"titles": ["SQL"]})
+    assert len(response.json()["removed"]) == 2
+    assert [skill["title"] for skill in (await client.get(f"/resources/{resource.id}")).json()["skills"]] == ["SQL"]
+    assert (await client.get(f"/skills/{python_id}/resources")).json()["items"] == []
+    assert skill_index.lookups == 2
+
+    response = await client.put(f"/resources/{resource.id}/skills", json={"skill_ids": [999]})
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+    response = await client.put("/resources/999/skills", json={"titles": ["SQL"]})
+    assert response.status_code == status.HTTP_404_NOT_FOUND
+
+
+@pytest.mark.asyncio
+async def test_concurrent_skill_updates_share_new_titles(tmp_path):
+    """Test that transactions creating the same new skill titles at once end up with one row per title."""
+    import asyncio
+    from sqlalchemy import select
+    from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+    from src.db.database import Base
+    from src.db.models import Skills
+    from src.schemas.skills_schema import ResourceSkillsUpdate
+
+    # a database file, so both transactions get their own connection
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'skills.db'}", connect_args={"timeout": 5})
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    session_factory = async_sessionmaker(engine, expire_on_commit=False)
+    try:
+        async with session_factory() as session:
+            resources = [
+                await LearningResourceService(session).create_new_resource(
+                    LearningResourceCreate(title=title, url=f"http://example.com/{title}", resource_type=LearningResourceType.article, difficulty=1)
+                )
+                for title in ("left", "right")
+            ]
+
+        async def set_skills(resource_id: int):
+            async with session_factory() as session:
+                return await LearningResourceService(session).set_resource_skills(resource_id, ResourceSkillsUpdate(titles=["Rust", "Go"]), None)
+
+        results = await asyncio.gather(*(set_skills(resource.id) for resource in resources))
+
+        async with session_factory() as session:
+            rows = (await session.execute(select(Skills.title, Skills.id))).all()
+        assert sorted(title for title, _ in rows) == ["Go", "Rust"]
+        skills = dict(rows)
+        assert all(sorted(skill.id for skill in result.skills) == sorted(skills.values()) for result in results)
+        assert sorted(skill_id for result in results for skill_id in result.created) == sorted(skills.values())
+    finally:
+        await engine.dispose()
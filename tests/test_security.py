@@ -0,0 +1,85 @@
+# tests/test_security.py
+
+import asyncio
+
+import fakeredis
+import pytest
+from fastapi_cache import FastAPICache
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.backend.cache import TwoTierBackend
+from src.backend.config import config
+from src.backend.security import PRINCIPAL_EVICTION_FIELD, create_access_token, get_current_user, invalidate_principal, principal_cache
+from src.db.models import User
+
+
+@pytest.fixture
+def jwt_settings(monkeypatch):
+    """Provides signing settings and an empty principal cache."""
+    monkeypatch.setattr(config, "secret_key", "test-secret-key-long-enough-for-hs256")
+    monkeypatch.setattr(config, "algorithm", "HS256")
+    principal_cache.clear()
+    yield
+    principal_cache.clear()
+
+
+@pytest.mark.asyncio
+async def test_get_current_user_is_cached(session: AsyncSession, jwt_settings):
+    """Test that a repeated token is resolved without touching the database."""
+    session.add(User(name="Cached", email="cached@example.com", hashed_password="x", is_active=True, role="learner"))
+    await session.commit()
+    token = create_access_token({"sub": "cached@example.com", "role": "learner"})
+
+    user = await get_current_user(token, session)
+    assert user.email == "cached@example.com"
+
+    # no session at all: only the cache can answer
+    cached_user = await get_current_user(token, None)
+    assert cached_user == user
+
+
+@pytest.mark.asyncio
+async def test_invalidate_principal_forces_reload(session: AsyncSession, jwt_settings):
+    """Test that invalidating a user makes the next call read the database again."""
+    db_user = User(name="Promoted", email="promoted@example.com", hashed_password="x", is_active=True, role="learner")
+    session.add(db_user)
+    await session.commit()
+    token = create_access_token({"sub": "promoted@example.com", "role": "learner"})
+
+    assert (await get_current_user(token, session)).role.value == "learner"
+
+    db_user.role = "contributor"
+    await session.commit()
+    assert (await get_current_user(token, session)).role.value == "learner"
+
+    assert await invalidate_principal("promoted@example.com") == 1
+    assert (await get_current_user(token, session)).role.value == "contributor"
+
+
+@pytest.mark.asyncio
+async def test_invalidate_principal_reaches_other_workers(session: AsyncSession, jwt_settings):
+    """Test that invalidating a user is broadcast on the cache eviction channel to every worker."""
+    session.add(User(name="Demoted", email="demoted@example.com", hashed_password="x", is_active=True, role="admin"))
+    await session.commit()
+    token = create_access_token({"sub": "demoted@example.com", "role": "admin"})
+    await get_current_user(token, session)
+
+    server = fakeredis.FakeServer()
+    this_worker = TwoTierBackend(fakeredis.FakeAsyncRedis(server=server), maxsize=10, ttl=60)
+    other_worker = TwoTierBackend(fakeredis.FakeAsyncRedis(server=server), maxsize=10, ttl=60)
+    received = []
+    other_worker.on_eviction(PRINCIPAL_EVICTION_FIELD, received.extend)
+    await other_worker.start()
+    FastAPICache.init(this_worker, prefix="test-security")
+    try:
+        await asyncio.sleep(0.05) # let the listener subscribe
+        assert await invalidate_principal("demoted@example.com") == 1
+        for _ in range(50):
+            if received:
+                break
+            await asyncio.sleep(0.01)
+        assert received == ["demoted@example.com"]
+    finally:
+        FastAPICache.reset()
+        await other_worker.stop()
+
@@ -0,0 +1,20 @@
+# tests/test_session.py
+
+from src.backend.config import DatabaseConfig
+from src.backend.session import InstrumentedQueuePool, engine_options
+
+
+def test_engine_options_for_asyncpg():
+    """Test that pool sizing and the statement cache reach the Postgres engine."""
+    database = DatabaseConfig(dsn="postgresql+asyncpg://user:password@db:5432/app", pool_size=20, max_overflow=5, statement_cache_size=0)
+    options = engine_options(database)
+
+    assert options["poolclass"] is InstrumentedQueuePool
+    assert options["pool_size"] == 20
+    assert options["max_overflow"] == 5
+    assert options["connect_args"] == {"statement_cache_size": 0, "prepared_statement_cache_size": 0}
+
+
+def test_engine_options_for_sqlite():
+    """Test that SQLite keeps its default single connection pool."""
+    assert engine_options(DatabaseConfig(dsn="sqlite+aiosqlite:///:memory:")) == {}
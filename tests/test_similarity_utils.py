@@ -0,0 +1,23 @@
+# tests/test_similarity_utils.py
+
+import numpy as np
+
+from src.utils import similarity_utils
+from src.utils.similarity_utils import related_top_k
+
+
+def test_related_top_k_ranks_by_jaccard_similarity(monkeypatch):
+    """Test top k neighbours, their tie breaks, padding and that chunking does not change the result."""
+    associations = [(1, 10), (1, 11), (2, 10), (2, 11), (3, 10), (4, 10), (4, 11), (4, 12), (5, 99), (1, 10)]
+    resource_ids = np.array([resource_id for resource_id, _ in associations])
+    skill_ids = np.array([skill_id for _, skill_id in associations])
+
+    ids, neighbours, scores = related_top_k(resource_ids, skill_ids, 2)
+    assert ids.tolist() == [1, 2, 3, 4, 5]
+    assert neighbours.tolist() == [[2, 4], [1, 4], [1, 2], [1, 2], [-1, -1]]
+    assert np.allclose(scores, [[1, 2 / 3], [1, 2 / 3], [0.5, 0.5], [2 / 3, 2 / 3], [0, 0]])
+
+    monkeypatch.setattr(similarity_utils, "SIMILARITY_CHUNK_SIZE", 2)
+    chunked = related_top_k(resource_ids, skill_ids, 2)
+    assert chunked[1].tolist() == neighbours.tolist()
+    assert np.allclose(chunked[2], scores)
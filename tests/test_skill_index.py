@@ -0,0 +1,102 @@
+# tests/test_skill_index.py
+
+import asyncio
+
+import pytest
+from sqlalchemy import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.backend.skill_index import SkillResourceIndex
+from src.db.models import LearningResource, Skills, learning_resource_skill_association
+from tests.conftest import TestingSessionLocal
+
+
+def test_lookup_needs_a_built_index():
+    """Test that an index that was never built leaves lookups to the database."""
+    index = SkillResourceIndex()
+    index.add(1, 10)
+    assert index.lookup([1], None, 10) is None
+
+
+def test_lookup_intersects_sorted_postings():
+    """Test intersections, the position after a cursor and the page limit."""
+    index = SkillResourceIndex()
+    index.loaded = True
+    for resource_id in (9, 3, 5, 7, 1):
+        index.add(1, resource_id)
+    for resource_id in (7, 1, 5, 2):
+        index.add(2, resource_id)
+    index.add(2, 5) # adding twice keeps one entry
+
+    assert index.lookup([1], None, 10) == [1, 3, 5, 7, 9]
+    assert index.lookup([1, 2], None, 10) == [1, 5, 7]
+    assert index.lookup([2, 1, 2], 1, 1) == [5]
+    assert index.lookup([1, 3], None, 10) == []
+
+    index.remove(1, 5)
+    index.drop_resource(7)
+    assert index.lookup([1, 2], None, 10) == [1]
+    index.drop_skill(2)
+    assert index.lookup([2], None, 10) == []
+
+
+@pytest.mark.asyncio
+async def test_rebuild_replays_changes_made_meanwhile(session: AsyncSession):
+    """Test that a rebuild loads the association table and keeps changes made while it ran."""
+    session.add_all([Skills(id=1, title="Python"), Skills(id=2, title="SQL")])
+    session.add_all([LearningResource(id=i, title=f"Resource {i}", resource_type="article") for i in (1, 2, 3)])
+    await session.flush()
+    await session.execute(insert(learning_resource_skill_association), [
+        {"skill_id": 1, "learning_resource_id": 1},
+        {"skill_id": 1, "learning_resource_id": 2},
+        {"skill_id": 2, "learning_resource_id": 2},
+    ])
+    await session.commit()
+
+    index = SkillResourceIndex()
+
+    def session_factory():
+        # changes made by requests while the association table is being read
+        index.add(2, 3)
+        index.remove(1, 1)
+        return TestingSessionLocal()
+
+    await index.rebuild(session_factory)
+    assert index.lookup([1], None, 10) == [2]
+    assert index.lookup([2], None, 10) == [2, 3]
+    assert index.stats()["associations"] == 3
+
+
+@pytest.mark.asyncio
+async def test_overlapping_rebuilds_keep_changes_made_meanwhile(session: AsyncSession):
+    """Test that a rebuild started during another one neither drops nor misses the changes made in between."""
+    session.add_all([Skills(id=1, title="Python"), Skills(id=2, title="SQL")])
+    session.add_all([LearningResource(id=i, title=f"Resource {i}", resource_type="article") for i in (1, 2, 3)])
+    await session.flush()
+    await session.execute(insert(learning_resource_skill_association), [
+        {"skill_id": 1, "learning_resource_id": 1},
+        {"skill_id": 1, "learning_resource_id": 2},
+    ])
+    await session.commit()
+
+    index = SkillResourceIndex()
+    periodic = asyncio.create_task(index.rebuild(TestingSessionLocal))
+    await asyncio.sleep(0) # the periodic rebuild is reading the association table
+
+    # a write committed and applied while the periodic rebuild runs
+    async with TestingSessionLocal() as other:
+        await other.execute(insert(learning_resource_skill_association), [{"skill_id": 2, "learning_resource_id": 3}])
+        await other.commit()
+    index.add(2, 3)
+
+    def bulk_session_factory():
+        # a change made by a request while the second rebuild reads
+        index.remove(1, 1)
+        return TestingSessionLocal()
+
+    bulk = asyncio.create_task(index.rebuild(bulk_session_factory))
+    await asyncio.gather(periodic, bulk)
+
+    assert index.lookup([1], None, 10) == [2]
+    assert index.lookup([2], None, 10) == [3]
+    assert index.stats()["rebuilds"] == 2
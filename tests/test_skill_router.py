@@ -0,0 +1,136 @@
+# tests/test_skill_router.py
+
+import pytest
+from fastapi import status
+from httpx import AsyncClient
+
+from src.main import app
+from src.backend.security import get_current_contributor_or_admin_user
+from src.backend.skill_index import get_skill_index
+from src.schemas.user_schema import User, UserRole
+
+
+@pytest.fixture
+def override_contributor_dependency():
+    """Overrides get_current_contributor_or_admin_user to return a contributor."""
+    user = User(id=1, email="contributor@example.com", name="Contributor", is_active=True, password="hashed_password", role=UserRole.contributor)
+    app.dependency_overrides[get_current_contributor_or_admin_user] = lambda: user
+    yield
+    app.dependency_overrides.pop(get_current_contributor_or_admin_user, None)
+
+
+@pytest.mark.asyncio
+async def test_skill_list_etag_changes_with_new_skill(client: AsyncClient, override_contributor_dependency):
+    """Test that the skill list is revalidated with its ETag and changes once a skill is created."""
+    await client.post("/skills/create", json={"title": "Python"})
+    first = await client.get("/skills/")
+    assert first.status_code == status.HTTP_200_OK
+    etag = first.headers["etag"]
+
+    response = await client.get("/skills/", headers={"If-None-Match": etag})
+    assert response.status_code == status.HTTP_304_NOT_MODIFIED
+
+    await client.post("/skills/create", json={"title": "SQL"})
+    response = await client.get("/skills/", headers={"If-None-Match": etag})
+    assert response.status_code == status.HTTP_200_OK
+    assert [skill["title"] for skill in response.json()] == ["Python", "SQL"]
+
+
+@pytest.mark.asyncio
+async def test_create_skill_rejects_duplicate_title(client: AsyncClient, override_contributor_dependency):
+    """Test that a title can only be created once."""
+    assert (await client.post("/skills/create", json={"title": "Python"})).status_code == status.HTTP_201_CREATED
+    response = await client.post("/skills/create", json={"title": "Python"})
+    assert response.status_code == status.HTTP_409_CONFLICT
+    assert [skill["title"] for skill in (await client.get("/skills/")).json()] == ["Python"]
+
+
+@pytest.mark.asyncio
+async def test_get_skill_not_modified_until_renamed(client: AsyncClient, override_contributor_dependency):
+    """Test conditional requests on a single skill, and that a missing skill is a 404."""
+    await client.post("/skills/create", json={"title": "Python"})
+    skill_id = (await client.get("/skills/")).json()[0]["id"]
+    first = await client.get(f"/skills/{skill_id}")
+    assert "last-modified" in first.headers
+
+    response = await client.get(f"/skills/{skill_id}", headers={"If-None-Match": first.headers["etag"]})
+    assert response.status_code == status.HTTP_304_NOT_MODIFIED
+
+    await client.put(f"/skills/{skill_id}/update", json={"title": "Python 3"})
+    response = await client.get(f"/skills/{skill_id}", headers={"If-None-Match": first.headers["etag"]})
+    assert response.status_code == status.HTTP_200_OK
+    assert response.json()["title"] == "Python 3"
+
+    assert (await client.get("/skills/999")).status_code == status.HTTP_404_NOT_FOUND
+
+
+async def seed_skill_resources(client: AsyncClient) -> dict[str, int]:
+    """Creates six resources teaching Python, every second one SQL and every third one Docker."""
+    rows = [
+        {
+            "title": f"Resource {i}",
+            "url": f"http://example.com/{i}",
+            "resource_type": "article",
+            "difficulty": 1,
+            "skills": ["Python", *(["SQL"] if i % 2 == 0 else []), *(["Docker"] if i % 3 == 0 else [])],
+        }
+        for i in range(6)
+    ]
+    response = await client.post("/resources/bulk", json=rows)
+    assert response.json()["created"] == 6
+    return {skill["title"]: skill["id"] for skill in (await client.get("/skills/")).json()}
+
+
+async def collect_titles(client: AsyncClient, url: str, params: dict) -> list[str]:
+    titles, cursor = [], None
+    while True:
+        page = (await client.get(url, params={**params, "limit": 2, **({"cursor": cursor} if cursor else {})})).json()
+        titles += [resource["title"] for resource in page["items"]]
+        cursor = page["next_cursor"]
+        if cursor is None:
+            return titles
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("use_index", [False, True])
+async def test_skill_resources_from_database_and_index(client: AsyncClient, override_contributor_dependency, skill_index, use_index):
+    """Test the resources of one skill and of several skills, page by page, with and without the in-memory index."""
+    skills = await seed_skill_resources(client)
+    # the bulk load rebuilt the index in the background
+    assert skill_index.loaded
+    if not use_index:
+        app.dependency_overrides[get_skill_index] = lambda: None
+
+    assert await collect_titles(client, f"/skills/{skills['SQL']}/resources", {}) == ["Resource 0", "Resource 2", "Resource 4"]
+    assert await collect_titles(client, "/skills/resources", {"skill_ids": [skills["Python"], skills["SQL"], skills["Docker"]]}) == ["Resource 0"]
+    assert await collect_titles(client, "/skills/resources", {"skill_ids": [skills["Docker"], skills["Python"]]}) == ["Resource 0", "Resource 3"]
+    assert skill_index.lookups == (4 if use_index else 0)
+
+
+@pytest.mark.asyncio
+async def test_skill_index_follows_deletes(client: AsyncClient, override_contributor_dependency, skill_index):
+    """Test that deleting a resource or a skill removes it from the in-memory index right away."""
+    skills = await seed_skill_resources(client)
+    first = (await client.get(f"/skills/{skills['Docker']}/resources")).json()["items"][0]
+
+    await client.delete(f"/resources/{first['id']}/delete")
+    assert await collect_titles(client, f"/skills/{skills['Docker']}/resources", {}) == ["Resource 3"]
+
+    await client.delete(f"/skills/{skills['Docker']}/delete")
+    response = await client.get(f"/skills/{skills['Docker']}/resources")
+    assert response.status_code == status.HTTP_404_NOT_FOUND
+    assert skill_index.stats()["skills"] == 2
+
+
+@pytest.mark.asyncio
+async def test_skill_resources_errors(client: AsyncClient, override_contributor_dependency):
+    """Test that a missing skill is a 404, a skill without resources an empty page and a bad cursor a 400."""
+    assert (await client.get("/skills/999/resources")).status_code == status.HTTP_404_NOT_FOUND
+
+    await client.post("/skills/create", json={"title": "Python"})
+    skill_id = (await client.get("/skills/")).json()[0]["id"]
+    response = await client.get(f"/skills/{skill_id}/resources")
+    assert response.json() == {"items": [], "next_cursor": None}
+
+    assert (await client.get(f"/skills/{skill_id}/resources", params={"cursor": "not-a-cursor"})).status_code == status.HTTP_400_BAD_REQUEST
+    assert (await client.get("/skills/resources")).status_code == 422
@@ -0,0 +1,88 @@
+# tests/test_static_files.py
+
+import gzip
+import hashlib
+
+import brotli
+import pytest
+import pytest_asyncio
+from httpx import ASGITransport, AsyncClient
+from starlette.applications import Starlette
+from starlette.routing import Mount
+
+from src.backend.compression import accepted_encodings
+from src.backend.static_files import IMMUTABLE_CACHE_CONTROL, CachedStaticFiles, precompress_directory
+
+IMAGE = bytes(range(256)) * 40
+STYLESHEET = b"body { color: #333; margin: 0 auto; }\n" * 200
+
+
+@pytest.fixture
+def static_dir(tmp_path):
+    blob = tmp_path / f"{hashlib.sha256(IMAGE).hexdigest()}.png"
+    blob.write_bytes(IMAGE)
+    (tmp_path / "logo.png").write_bytes(IMAGE)
+    (tmp_path / "site.css").write_bytes(STYLESHEET)
+    return tmp_path
+
+
+@pytest_asyncio.fixture
+async def static_client(static_dir):
+    app = Starlette(routes=[Mount("/static", CachedStaticFiles(directory=static_dir, max_age=60))])
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
+        yield client
+
+
+def test_accepted_encodings_ignores_refused_codings():
+    assert accepted_encodings("gzip;q=0.8, br, identity;q=0") == {"gzip", "br"}
+    assert accepted_encodings(None) == set()
+
+
+@pytest.mark.asyncio
+async def test_content_hashed_files_are_immutable(static_client, static_dir):
+    """Test that files named by their hash are cached for a year and others for max_age."""
+    blob_name = f"{hashlib.sha256(IMAGE).hexdigest()}.png"
+    response = await static_client.get(f"/static/{blob_name}")
+    assert response.status_code == 200
+    assert response.headers["cache-control"] == IMMUTABLE_CACHE_CONTROL
+
+    response = await static_client.get("/static/logo.png")
+    assert response.headers["cache-control"] == "public, max-age=60"
+
+
+@pytest.mark.asyncio
+async def test_range_request_returns_partial_content(static_client):
+    response = await static_client.get("/static/logo.png", headers={"Range": "bytes=100-199"})
+    assert response.status_code == 206
+    assert response.content == IMAGE[100:200]
+    assert response.headers["content-range"] == f"bytes 100-199/{len(IMAGE)}"
+
+
+@pytest.mark.asyncio
+async def test_revalidation_returns_not_modified(static_client):
+    response = await static_client.get("/static/logo.png")
+    response = await static_client.get("/static/logo.png", headers={"If-None-Match": response.headers["etag"]})
+    assert response.status_code == 304
+    assert response.headers["cache-control"] == "public, max-age=60"
+
+
+@pytest.mark.asyncio
+async def test_precompressed_sibling_is_served(static_client, static_dir):
+    """Test that the .br and .gz siblings are picked by Accept-Encoding and keep the original type."""
+    assert precompress_directory(static_dir) == 2
+    assert precompress_directory(static_dir) == 0 # siblings are up to date
+
+    response = await static_client.get("/static/site.css", headers={"Accept-Encoding": "gzip, br"})
+    assert response.headers["content-encoding"] == "br"
+    assert response.headers["content-type"].startswith("text/css")
+    assert response.headers["vary"] == "Accept-Encoding"
+    assert int(response.headers["content-length"]) == (static_dir / "site.css.br").stat().st_size
+    assert brotli.decompress((static_dir / "site.css.br").read_bytes()) == STYLESHEET
+
+    response = await static_client.get("/static/site.css", headers={"Accept-Encoding": "gzip"})
+    assert response.headers["content-encoding"] == "gzip"
+    assert int(response.headers["content-length"]) == len(gzip.compress(STYLESHEET, compresslevel=9, mtime=0))
+
+    response = await static_client.get("/static/site.css", headers={"Accept-Encoding": "identity"})
+    assert "content-encoding" not in response.headers
+    assert response.content == STYLESHEET